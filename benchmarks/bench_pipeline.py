@@ -0,0 +1,206 @@
+"""
+Mesure du pipeline (nettoyage, base, histogrammes, carte) sur des données synthétiques.
+
+Chaque échelle est exécutée dans un processus séparé, avec ses données dans un dossier
+temporaire (variables VELIB_DATA_DIR / VELIB_ASSETS_DIR) : le dossier data/ du projet
+n'est pas modifié et aucun accès réseau n'est fait.
+
+Exemples :
+    python -m benchmarks.bench_pipeline --scales 1 10 100 --snapshots 5
+    python -m benchmarks.bench_pipeline --compare avant.json apres.json
+"""
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows : pas de mémoire résidente maximale
+    resource = None
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STEPS = ["clean_velib_csv", "create_velib_database", "create_histograms", "Map_Int"]
+
+
+def _maxrss_mo():
+    if resource is None:
+        return None
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    diviseur = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / diviseur
+
+
+def measure(fonction):
+    """
+    Exécute fonction en mesurant sa durée et son pic d'allocations Python/NumPy (tracemalloc).
+
+    Returns:
+        dict: secondes, pic_memoire_mo, rss_max_mo (pic de mémoire résidente du processus)
+    """
+    tracemalloc.start()
+    debut = time.perf_counter()
+    try:
+        # Les étapes du pipeline sont bavardes : leur sortie est ignorée
+        with redirect_stdout(io.StringIO()):
+            fonction()
+        duree = time.perf_counter() - debut
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"secondes": duree, "pic_memoire_mo": pic / 1024 / 1024, "rss_max_mo": _maxrss_mo()}
+
+
+def run_scale(echelle: int, nb_snapshots: int) -> dict:
+    """
+    Exécuté dans le processus fils : VELIB_DATA_DIR et VELIB_ASSETS_DIR sont déjà positionnés.
+
+    Les nb_snapshots instantanés sont nettoyés puis importés un par un (historique croissant) ;
+    histogrammes et carte sont ensuite générés une fois sur la base complète.
+    """
+    from benchmarks.synthetic import SyntheticNetwork, write_raw_csv, snapshot_times
+    from config import rawdata_path, assets_dir
+    from src.utils.CleanData_CSV import clean_velib_csv
+    from src.utils.Create_DataBase import create_velib_database
+    from src.utils.Histogramme import create_histograms
+    from src.utils.Map import Map_Int
+
+    os.makedirs(assets_dir, exist_ok=True)
+    reseau = SyntheticNetwork(echelle)
+    etapes = {nom: [] for nom in STEPS}
+
+    for horodatage in snapshot_times(nb_snapshots):
+        write_raw_csv(reseau.snapshot(horodatage), rawdata_path)
+        etapes["clean_velib_csv"].append(measure(clean_velib_csv))
+        etapes["create_velib_database"].append(measure(create_velib_database))
+
+    etapes["create_histograms"].append(measure(create_histograms))
+    etapes["Map_Int"].append(measure(Map_Int))
+
+    return {"echelle": echelle, "stations": reseau.nb_stations, "snapshots": nb_snapshots, "etapes": etapes}
+
+
+def _run_worker(echelle: int, nb_snapshots: int) -> dict:
+    """Lance run_scale dans un processus neuf, sur un dossier de données temporaire."""
+    with tempfile.TemporaryDirectory(prefix="velib_bench_") as tmp_dir:
+        env = dict(os.environ)
+        env["VELIB_DATA_DIR"] = os.path.join(tmp_dir, "data")
+        env["VELIB_ASSETS_DIR"] = os.path.join(tmp_dir, "assets")
+        sortie = os.path.join(tmp_dir, "resultat.json")
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_pipeline",
+             "--worker", str(echelle), "--snapshots", str(nb_snapshots), "--worker-output", sortie],
+            cwd=PROJECT_ROOT, env=env, check=True,
+        )
+        with open(sortie, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(resultat: dict) -> dict:
+    """Durée totale / moyenne et pic mémoire de chaque étape pour une échelle."""
+    resume = {}
+    for nom, mesures in resultat["etapes"].items():
+        secondes = [m["secondes"] for m in mesures]
+        resume[nom] = {
+            "secondes_total": sum(secondes),
+            "secondes_moyenne": sum(secondes) / len(secondes),
+            "secondes_dernier": secondes[-1],
+            "pic_memoire_mo": max(m["pic_memoire_mo"] for m in mesures),
+        }
+    return resume
+
+
+def print_summary(resultats: list) -> None:
+    print(f"{'échelle':>8} {'stations':>9} {'étape':<22} {'moyenne (s)':>12} {'dernier (s)':>12} {'pic (Mo)':>10}")
+    for resultat in resultats:
+        for nom, r in resultat["resume"].items():
+            print(f"{resultat['echelle']:>7}× {resultat['stations']:>9} {nom:<22} "
+                  f"{r['secondes_moyenne']:>12.3f} {r['secondes_dernier']:>12.3f} {r['pic_memoire_mo']:>10.1f}")
+
+
+def compare(avant_path: str, apres_path: str) -> None:
+    """Affiche le rapport (après / avant) des durées et pics mémoire de deux fichiers de résultats."""
+    with open(avant_path, encoding="utf-8") as f:
+        avant = {r["echelle"]: r for r in json.load(f)["resultats"]}
+    with open(apres_path, encoding="utf-8") as f:
+        apres = {r["echelle"]: r for r in json.load(f)["resultats"]}
+
+    print(f"{'échelle':>8} {'étape':<22} {'durée':>8} {'mémoire':>8}")
+    for echelle in sorted(set(avant) & set(apres)):
+        for nom in STEPS:
+            a = avant[echelle]["resume"].get(nom)
+            b = apres[echelle]["resume"].get(nom)
+            if a is None or b is None:
+                continue
+            ratio_temps = b["secondes_moyenne"] / a["secondes_moyenne"] if a["secondes_moyenne"] else float("nan")
+            ratio_memoire = b["pic_memoire_mo"] / a["pic_memoire_mo"] if a["pic_memoire_mo"] else float("nan")
+            print(f"{echelle:>7}× {nom:<22} {ratio_temps:>7.2f}x {ratio_memoire:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline Vélib sur données synthétiques (hors ligne)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="multiplicateurs du nombre de stations (1 = ~1 500 stations)")
+    parser.add_argument("--snapshots", type=int, default=3, help="nombre d'instantanés importés successivement")
+    parser.add_argument("--output", default=None, help="fichier JSON de résultats (par défaut dans benchmarks/results/)")
+    parser.add_argument("--compare", nargs=2, metavar=("AVANT", "APRES"), help="compare deux fichiers de résultats")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--worker-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.worker is not None:
+        with open(args.worker_output, "w", encoding="utf-8") as f:
+            json.dump(run_scale(args.worker, args.snapshots), f)
+        return
+
+    resultats = []
+    for echelle in args.scales:
+        print(f"Échelle {echelle}× : {args.snapshots} instantané(s)...")
+        resultat = _run_worker(echelle, args.snapshots)
+        resultat["resume"] = summarize(resultat)
+        resultats.append(resultat)
+
+    commit = _git_commit()
+    rapport = {
+        "commit": commit,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plateforme": platform.platform(),
+        "resultats": resultats,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}_{commit or 'inconnu'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, indent=2)
+
+    print_summary(resultats)
+    print(f"Résultats enregistrés dans : {output}")
+
+
+if __name__ == "__main__":
+    main()
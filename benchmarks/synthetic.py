@@ -0,0 +1,103 @@
+import os
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+
+# Nombre de stations du réseau réel (échelle 1×)
+STATIONS_REFERENCE = 1500
+NB_COMMUNES = 70
+
+# Emprise approximative du réseau Vélib (latitude, longitude)
+LAT_MIN, LAT_MAX = 48.75, 48.95
+LON_MIN, LON_MAX = 2.20, 2.50
+
+# Colonnes du CSV data.gouv.fr, dans l'ordre du fichier
+RAW_COLUMNS = [
+    "Identifiant station", "Nom station", "Station en fonctionnement", "Capacité de la station",
+    "Nombre bornettes libres", "Nombre total vélos disponibles", "Vélos mécaniques disponibles",
+    "Vélos électriques disponibles", "Borne de paiement disponible", "Retour vélib possible",
+    "Actualisation de la donnée", "Coordonnées géographiques", "Nom communes équipées",
+    "Code INSEE communes équipées", "station_opening_hours",
+]
+
+
+def _oui_non(valeurs: np.ndarray) -> np.ndarray:
+    return np.where(valeurs, "OUI", "NON")
+
+
+class SyntheticNetwork:
+    """
+    Réseau Vélib fictif produisant des instantanés au format du CSV data.gouv.fr
+    (séparateur « ; », booléens OUI/NON, dates ISO 8601, coordonnées « lat, lon »).
+
+    Les stations (identifiant, nom, capacité, position, commune) sont fixes ;
+    les disponibilités évoluent d'un instantané à l'autre. Le tirage est déterministe.
+
+    Args:
+        echelle (int): Multiplicateur du nombre de stations (1 = réseau réel, ~1 500 stations)
+        graine (int): Graine du générateur aléatoire
+    """
+
+    def __init__(self, echelle: int = 1, graine: int = 0):
+        self.rng = np.random.default_rng(graine)
+        n = STATIONS_REFERENCE * echelle
+        self.nb_stations = n
+
+        codes_insee = np.array([f"{75000 + i:05d}" for i in range(1, NB_COMMUNES + 1)])
+        communes = self.rng.integers(0, NB_COMMUNES, n)
+        self.stations = pd.DataFrame({
+            "Identifiant station": np.arange(1, n + 1).astype(str),
+            "Nom station": [f"Station {i}" for i in range(1, n + 1)],
+            "Capacité de la station": self.rng.integers(10, 70, n),
+            "latitude": self.rng.uniform(LAT_MIN, LAT_MAX, n),
+            "longitude": self.rng.uniform(LON_MIN, LON_MAX, n),
+            "Nom communes équipées": np.char.add("Commune ", communes.astype(str)),
+            "Code INSEE communes équipées": codes_insee[communes],
+        })
+        self._velos = (self.stations["Capacité de la station"].to_numpy() * self.rng.uniform(0, 1, n)).astype(int)
+
+    def snapshot(self, horodatage: datetime) -> pd.DataFrame:
+        """Instantané du réseau à horodatage (chaque station actualisée dans les 5 minutes précédentes)."""
+        n = self.nb_stations
+        capacite = self.stations["Capacité de la station"].to_numpy()
+        # Marche aléatoire bornée par la capacité
+        self._velos = np.clip(self._velos + self.rng.integers(-3, 4, n), 0, capacite)
+        electriques = (self._velos * self.rng.uniform(0, 1, n)).astype(int)
+        en_fonctionnement = self.rng.uniform(0, 1, n) > 0.02
+        decalages = self.rng.integers(0, 300, n)
+
+        df = pd.DataFrame({
+            "Identifiant station": self.stations["Identifiant station"],
+            "Nom station": self.stations["Nom station"],
+            "Station en fonctionnement": _oui_non(en_fonctionnement),
+            "Capacité de la station": capacite,
+            "Nombre bornettes libres": capacite - self._velos,
+            "Nombre total vélos disponibles": self._velos,
+            "Vélos mécaniques disponibles": self._velos - electriques,
+            "Vélos électriques disponibles": electriques,
+            "Borne de paiement disponible": _oui_non(self.rng.uniform(0, 1, n) > 0.1),
+            "Retour vélib possible": _oui_non(en_fonctionnement),
+            "Actualisation de la donnée": [
+                (horodatage - timedelta(seconds=int(d))).isoformat() for d in decalages
+            ],
+            "Coordonnées géographiques": (
+                self.stations["latitude"].map("{:.6f}".format) + ", "
+                + self.stations["longitude"].map("{:.6f}".format)
+            ),
+            "Nom communes équipées": self.stations["Nom communes équipées"],
+            "Code INSEE communes équipées": self.stations["Code INSEE communes équipées"],
+            "station_opening_hours": None,
+        })
+        return df[RAW_COLUMNS]
+
+
+def write_raw_csv(df: pd.DataFrame, path: str) -> None:
+    """Écrit un instantané comme le fichier téléchargé (UTF-8 avec BOM, séparateur « ; »)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, sep=";", index=False, encoding="utf-8-sig")
+
+
+def snapshot_times(nb_snapshots: int, intervalle: timedelta = timedelta(hours=1),
+                   fin: datetime = datetime(2025, 11, 15, 9, 0, tzinfo=timezone.utc)):
+    """Horodatages de nb_snapshots instantanés successifs se terminant à fin."""
+    return [fin - intervalle * (nb_snapshots - 1 - i) for i in range(nb_snapshots)]
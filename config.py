@@ -2,13 +2,37 @@
 import os
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__)))
-rawdata_path = os.path.join(project_root, "data", "rawdata", "velib_disponibilite.csv")
-cleandata_dir = os.path.join(project_root, "data", "cleandata")
+# Dossiers des données et des fichiers générés (redirigeables par variable d'environnement, cf. benchmarks)
+data_dir = os.environ.get("VELIB_DATA_DIR", os.path.join(project_root, "data"))
+assets_dir = os.environ.get("VELIB_ASSETS_DIR", os.path.join(project_root, "assets"))
+rawdata_path = os.path.join(data_dir, "rawdata", "velib_disponibilite.csv")
+cleandata_dir = os.path.join(data_dir, "cleandata")
 os.makedirs(cleandata_dir, exist_ok=True)
 cleandata_path = os.path.join(cleandata_dir, "velib_disponibilite_clean.csv")
-db_dir = os.path.join(project_root, "data", "database")
+rejectdata_path = os.path.join(cleandata_dir, "velib_disponibilite_rejets.csv")
+cleandata_parquet_path = os.path.join(cleandata_dir, "velib_disponibilite_clean.parquet")
+cleandata_arrow_path = os.path.join(cleandata_dir, "velib_disponibilite_clean.arrow")
+# Format du fichier nettoyé : "csv", ou "parquet" / "arrow" (colonnes typées, nécessite pyarrow)
+clean_format = "csv"
+db_dir = os.path.join(data_dir, "database")
 os.makedirs(db_dir, exist_ok=True)
 db_path = os.path.join(db_dir, "velib.db")
+map_path = os.path.join(assets_dir, "velib_occupation_map.html")
+# Carte et graphiques publiés sous un nom contenant leur empreinte, précompressés (gzip / brotli)
+static_dir = os.path.join(data_dir, "static")
+# Empreintes des entrées de chaque étape du pipeline (étapes ignorées si inchangées)
+pipeline_state_path = os.path.join(data_dir, "pipeline_state.json")
+
+# Intervalle (en secondes) entre deux rafraîchissements automatiques des données
+refresh_interval = 60 * 60
+# Délai (en secondes) entre deux vérifications de la version des données par le cache de figures
+cache_ttl = 30
+# Nombre de processus générant la carte et les graphiques (None : nombre de processeurs)
+asset_workers = None
+# Instrumentation (durées des étapes et des callbacks, comptages) exposée sur /metrics
+metrics_enabled = True
+# Nuage capacité / vélos disponibles : "marqueurs" (taille selon le nombre de relevés) ou "heatmap"
+scatter_mode = "marqueurs"
 
 
 chemin_home = "/"
@@ -20,3 +44,7 @@ chemin_capacite_station = "/capacite-station"
 chemin_taux_occupation_moyen = "/taux-occupation"
 chemin_station_non_fonctionnelles = "/stations-non-fonctionnelles"
 chemin_capacite_vs_disponibles = "/capacite-vs-disponibles"
+chemin_evolution_occupation = "/evolution-occupation"
+chemin_stations_proches = "/stations-proches"
+chemin_carte_interactive = "/carte-interactive"
+chemin_communes = "/communes"
@@ -1,57 +1,125 @@
 # main.py
+import os
+import importlib
+import argparse
 from dash import Dash, html, dcc, Input, Output
+from flask import Response
 import dash
 
-from config import chemin_home,chemin_carte_position,chemin_velos_disponibles,chemin_velos_electriques,chemin_velos_mecaniques,chemin_capacite_station,chemin_taux_occupation_moyen,chemin_station_non_fonctionnelles,chemin_capacite_vs_disponibles
-
-
-from src.utils.get_data import download_velib_csv
-from src.utils.CleanData_CSV import clean_velib_csv
-from src.utils.Create_DataBase import create_velib_database
-from src.utils.Histogramme import create_histograms 
-from src.utils.Map import Map_Int
-from src.pages import carte_position, home
-from src.pages import velos_disponibles
-from src.pages import velos_electriques
-from src.pages import velos_mecaniques
-from src.pages import capacite_station
-from src.pages import taux_occupation_moyen
-from src.pages import station_non_fonctionnelles
-from src.pages import capacite_vs_velos_disponibles
+from config import refresh_interval, rawdata_path, db_path, assets_dir, map_path, metrics_enabled, static_dir
+from config import chemin_home,chemin_carte_position,chemin_velos_disponibles,chemin_velos_electriques,chemin_velos_mecaniques,chemin_capacite_station,chemin_taux_occupation_moyen,chemin_station_non_fonctionnelles,chemin_capacite_vs_disponibles,chemin_evolution_occupation,chemin_stations_proches,chemin_carte_interactive,chemin_communes
+
+# Les modules du pipeline (pandas, folium, pydantic...) et des pages ne sont importés
+# qu'au premier rafraîchissement / à la première visite, pour un démarrage rapide du serveur.
 from src.components.navbar import create_navbar
+from src.components.refresh_status import create_refresh_status
+from src.utils.scheduler import RefreshScheduler, pipeline_status
+from src.utils.build_cache import BuildCache, project_sources
+from src.utils.db import database_version
+from src.utils.metrics import registry, timed_callback, PIPELINE_STEPS_SKIPPED
+from src.utils.static_assets import register_static_route, manifest_path
+from src.utils.spatial import register_spatial_routes
+from src.pages import stations_proches, carte_interactive
+
+# Pages du dashboard : module importé à la première visite de la route
+PAGES = {
+    chemin_home: "src.pages.home",
+    chemin_carte_position: "src.pages.carte_position",
+    chemin_velos_disponibles: "src.pages.velos_disponibles",
+    chemin_velos_electriques: "src.pages.velos_electriques",
+    chemin_velos_mecaniques: "src.pages.velos_mecaniques",
+    chemin_capacite_station: "src.pages.capacite_station",
+    chemin_taux_occupation_moyen: "src.pages.taux_occupation_moyen",
+    chemin_station_non_fonctionnelles: "src.pages.station_non_fonctionnelles",
+    chemin_capacite_vs_disponibles: "src.pages.capacite_vs_velos_disponibles",
+    chemin_evolution_occupation: "src.pages.evolution_occupation",
+    chemin_stations_proches: "src.pages.stations_proches",
+    chemin_carte_interactive: "src.pages.carte_interactive",
+    chemin_communes: "src.pages.communes",
+}
+
+def run_step(cache, nom, fonction, inputs, outputs, versions=()):
+    """
+    Exécute une étape du pipeline, sauf si ses entrées n'ont pas changé : données, et code du
+    module de l'étape et de tous les modules du projet qu'il importe (règles de validation...).
+    """
+    empreinte = cache.fingerprint(inputs + project_sources(fonction.__module__), versions)
+    if cache.is_fresh(nom, empreinte, outputs):
+        print(f"Entrées inchangées, étape « {nom} » ignorée.")
+        PIPELINE_STEPS_SKIPPED.inc(etape=nom)
+        return
+    with pipeline_status.step(nom):
+        fonction()
+    cache.record(nom, empreinte)
+
+def init_data(force=False):
+    """
+    Initialise les données nécessaires au dashboard
 
-def init_data():
-    """Initialise les données nécessaires au dashboard"""
-    print("\n=== 1. Téléchargement du CSV Vélib ===")
-    print("--------------------------------------")
-    download_velib_csv()
+    Args:
+        force (bool): relance toutes les étapes même si leurs entrées n'ont pas changé
+    """
+    from src.utils.get_data import download_velib_csv
+    from src.utils.CleanData_CSV import clean_velib_csv
+    from src.utils.Create_DataBase import create_velib_database
+    from src.utils.Histogramme import HISTOGRAM_FILES
+    from src.utils.columnar import clean_output_path
+    from src.utils.generate_assets import generate_assets
+    from src.utils.data_cache import figure_cache, snapshot_cache
+    from src.utils.static_assets import publish_assets
 
-    print("\n=== 2. Nettoyage et validation du CSV ===")
-    print("----------------------------------------")
-    clean_velib_csv()
+    cache = BuildCache(force=force)
+    pipeline_status.start_run()
+    try:
+        print("\n=== 1. Téléchargement du CSV Vélib ===")
+        print("--------------------------------------")
+        with pipeline_status.step("Téléchargement"):
+            download_velib_csv(conditional=not force)
 
-    print("\n=== 3. Création de la base de données ===")
-    print("----------------------------------------")
-    create_velib_database()
+        print("\n=== 2. Nettoyage et validation du CSV ===")
+        print("----------------------------------------")
+        run_step(cache, "Nettoyage", clean_velib_csv,
+                 inputs=[rawdata_path], outputs=[clean_output_path()])
 
-    print("\n=== 4. Création des histogrammes ===")
-    print("----------------------------------------")
-    create_histograms()
+        print("\n=== 3. Création de la base de données ===")
+        print("----------------------------------------")
+        run_step(cache, "Base de données", create_velib_database,
+                 inputs=[clean_output_path()], outputs=[db_path])
 
-    print("\n=== 5. Création de la Map ===")
-    print("----------------------------------------")
-    Map_Int()
+        print("\n=== 4. Création des histogrammes et de la Map (en parallèle) ===")
+        print("----------------------------------------")
+        run_step(cache, "Graphiques et carte", generate_assets,
+                 # Version lue dans la base, pas ses fichiers : le journal WAL est recréé par les lecteurs
+                 inputs=[], versions=[database_version()],
+                 outputs=[os.path.join(assets_dir, f) for f in HISTOGRAM_FILES] + [map_path])
 
+        print("\n=== 5. Publication des fichiers compressés ===")
+        print("----------------------------------------")
+        run_step(cache, "Publication", publish_assets,
+                 inputs=[map_path] + [os.path.join(assets_dir, f) for f in HISTOGRAM_FILES],
+                 outputs=[manifest_path(static_dir)])
+    except Exception as e:
+        pipeline_status.finish_run(erreur=str(e))
+        raise
+
+    pipeline_status.finish_run()
+    figure_cache.invalidate()
+    snapshot_cache.invalidate()
     print("\n=== Pipeline de données terminé avec succès ! ===\n")
 
-app = Dash(__name__, use_pages=False)
+# plotly.js copié dans assets/vendor pour les graphiques HTML : les pages Dash ont déjà le leur
+# Les composants des pages n'existent qu'une fois la page affichée : callbacks validés à l'exécution
+app = Dash(__name__, use_pages=False, assets_ignore=r"^plotly-.*\.js$", suppress_callback_exceptions=True)
 app.title = "Paris_velib_Dashboard"
 
 # Layout principal avec navigation
 app.layout = html.Div([
     dcc.Location(id="url"),
     html.Div(id="navbar-container"),
-    html.Div(id="page-content")
+    html.Div(id="page-content"),
+    html.Div(id="refresh-status"),
+    # Relecture périodique de l'état du rafraîchissement (toutes les minutes)
+    dcc.Interval(id="refresh-status-interval", interval=60 * 1000)
 ])
 
 # Callback pour gérer la navigation
@@ -59,39 +127,71 @@ app.layout = html.Div([
     Output("navbar-container", "children"),
     Input("url", "pathname")
 )
+@timed_callback("update_navbar")
 def update_navbar(pathname):
     if pathname == "/":
         return create_navbar("home")
     else:
         return create_navbar("other")
 
+@app.callback(
+    Output("refresh-status", "children"),
+    Input("url", "pathname"),
+    Input("refresh-status-interval", "n_intervals")
+)
+@timed_callback("update_refresh_status")
+def update_refresh_status(pathname, n_intervals):
+    return create_refresh_status(pipeline_status.snapshot())
+
 @app.callback(
     Output("page-content", "children"),
     Input("url", "pathname")
 )
+@timed_callback("display_page")
 def display_page(pathname):
-    if pathname == chemin_home:
-        return home.layout
-    elif pathname == chemin_carte_position:
-        return carte_position.layout
-    elif pathname == chemin_velos_disponibles:
-        return velos_disponibles.layout
-    elif pathname == chemin_velos_electriques:
-        return velos_electriques.layout
-    elif pathname == chemin_velos_mecaniques:
-        return velos_mecaniques.layout
-    elif pathname == chemin_capacite_station:
-        return capacite_station.layout
-    elif pathname == chemin_taux_occupation_moyen:
-        return taux_occupation_moyen.layout
-    elif pathname == chemin_station_non_fonctionnelles:
-        return station_non_fonctionnelles.layout
-    elif pathname == chemin_capacite_vs_disponibles:
-        return capacite_vs_velos_disponibles.layout
-    else:
+    module_name = PAGES.get(pathname)
+    if module_name is None:
         return html.Div([html.H1("Page non trouvée")])
+    layout = importlib.import_module(module_name).layout
+    # Les pages de graphiques construisent leur layout à chaque visite (figures à jour)
+    return layout() if callable(layout) else layout
+
+# Callbacks des pages interactives (enregistrés avant le premier affichage)
+stations_proches.register_callbacks(app)
+carte_interactive.register_callbacks(app)
+
+# Carte et graphiques publiés : précompressés, noms à empreinte et cache long
+register_static_route(app.server)
+
+# Requêtes spatiales (zone d'une vue de carte, stations les plus proches) en JSON
+register_spatial_routes(app.server)
+
+@app.server.route("/metrics")
+def metrics():
+    """Métriques du pipeline et du serveur au format texte Prometheus."""
+    if not metrics_enabled:
+        return Response("Métriques désactivées (metrics_enabled dans config.py).\n", status=404, mimetype="text/plain")
+    return Response(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
 
 if __name__ == "__main__":
-    # Initialisation des données
-    init_data()
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description="Dashboard des Vélib en Région parisienne")
+    parser.add_argument("--force", action="store_true",
+                        help="relance toutes les étapes du pipeline même si leurs entrées n'ont pas changé")
+    parser.add_argument("--serve-only", action="store_true",
+                        help="sert les données déjà construites, sans lancer ni planifier le pipeline")
+    parser.add_argument("--pipeline-only", action="store_true",
+                        help="exécute le pipeline une fois puis s'arrête (serveur de production : voir wsgi.py)")
+    args = parser.parse_args()
+
+    if args.pipeline_only:
+        init_data(force=args.force)
+        raise SystemExit(0)
+
+    debug = True
+    if not args.serve_only:
+        # Initialisation des données
+        init_data(force=args.force)
+        # Avec le rechargement automatique (debug), seul le processus qui sert l'application planifie les rafraîchissements
+        if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+            RefreshScheduler(init_data, refresh_interval).start()
+    app.run(debug=debug)
@@ -0,0 +1,20 @@
+from dash import html
+
+def create_refresh_status(status: dict):
+    """Bandeau indiquant la dernière mise à jour des données et la durée de chaque étape."""
+    if status["derniere_maj"] is None:
+        texte = "Données en cours de préparation..." if status["en_cours"] else "Données non encore actualisées."
+    else:
+        texte = f"Dernière mise à jour des données : {status['derniere_maj']:%d/%m/%Y %H:%M:%S}"
+        if status["en_cours"]:
+            texte += " (actualisation en cours...)"
+
+    durees = " | ".join(f"{etape} : {duree:.1f} s" for etape, duree in status["durees"].items())
+
+    children = [html.Span(texte)]
+    if durees:
+        children.append(html.Span(durees, style={"display": "block", "fontSize": "12px", "color": "#666"}))
+    if status["erreur"]:
+        children.append(html.Span(f"Dernier rafraîchissement en échec : {status['erreur']}", style={"display": "block", "color": "#c0392b"}))
+
+    return html.Div(children, style={"textAlign": "center", "fontSize": "14px", "color": "#333", "margin": "10px 0"})
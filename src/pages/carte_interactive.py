@@ -0,0 +1,132 @@
+import math
+import sqlite3
+from dash import html, dcc, Input, Output, State, no_update
+from src.components.footer import create_footer
+from src.utils.metrics import timed_callback
+from src.utils.spatial import viewport_stations, TILE_SIZE
+
+# Vue initiale : Paris et la petite couronne
+CENTRE_DEFAUT = {"lat": 48.8566, "lon": 2.3522}
+ZOOM_DEFAUT = 11
+# Taille approximative du graphique (pixels), pour calculer l'emprise quand Plotly ne la fournit pas
+LARGEUR_PX, HAUTEUR_PX = 1200, 650
+
+# Même dégradé que la carte Folium : vert (vide) -> jaune -> rouge (pleine)
+COLORSCALE = [[0, "green"], [0.5, "yellow"], [1, "red"]]
+
+
+def _bbox_from_centre(centre: dict, zoom: float):
+    """Emprise (sud, ouest, nord, est) d'une vue Web Mercator de LARGEUR_PX x HAUTEUR_PX pixels."""
+    degres_par_px = 360 / (TILE_SIZE * 2 ** zoom)
+    demi_lon = LARGEUR_PX / 2 * degres_par_px
+    demi_lat = HAUTEUR_PX / 2 * degres_par_px * math.cos(math.radians(centre["lat"]))
+    return centre["lat"] - demi_lat, centre["lon"] - demi_lon, centre["lat"] + demi_lat, centre["lon"] + demi_lon
+
+
+def _viewport(relayout: dict, vue: dict):
+    """
+    Nouvelle vue (centre, zoom, emprise) à partir d'un événement relayoutData de la carte,
+    ou None si l'événement ne concerne pas la position de la carte.
+    """
+    if not relayout or not any(cle.startswith("map.") for cle in relayout):
+        return None
+    centre = relayout.get("map.center", vue["centre"])
+    zoom = relayout.get("map.zoom", vue["zoom"])
+    coins = (relayout.get("map._derived") or {}).get("coordinates")
+    if coins:
+        lons, lats = [c[0] for c in coins], [c[1] for c in coins]
+        bbox = (min(lats), min(lons), max(lats), max(lons))
+    else:
+        bbox = _bbox_from_centre(centre, zoom)
+    return {"centre": centre, "zoom": zoom, "bbox": bbox}
+
+
+def _figure(points: dict, vue: dict) -> dict:
+    """
+    Figure Plotly (dictionnaire : Plotly n'est pas importé côté serveur) des points de la vue.
+    Les points sans taux d'occupation (capacité nulle) forment une trace grise à part.
+    """
+    if points["mode"] == "groupes":
+        tailles = [min(8 + 4 * math.sqrt(nb), 40) for nb in points["nb"]]
+        textes = [f"{nb} station(s)<br>{velos} vélos / {capacite} bornettes"
+                  for nb, velos, capacite in zip(points["nb"], points["velos"], points["capacite"])]
+    else:
+        tailles = [10] * len(points["lat"])
+        textes = [f"{nom}<br>{velos} vélos / {capacite} bornettes"
+                  for nom, velos, capacite in zip(points["nom"], points["velos"], points["capacite"])]
+
+    def trace(indices, hovertemplate, marker):
+        return {
+            "type": "scattermap",
+            "lat": [points["lat"][i] for i in indices],
+            "lon": [points["lon"][i] for i in indices],
+            "text": [textes[i] for i in indices],
+            "hovertemplate": hovertemplate,
+            "marker": {"size": [tailles[i] for i in indices], "opacity": 0.8, **marker},
+        }
+
+    connus = [i for i, taux in enumerate(points["taux"]) if taux is not None]
+    inconnus = [i for i, taux in enumerate(points["taux"]) if taux is None]
+    data = [trace(connus, "%{text}<br>Taux d'occupation : %{marker.color:.1f} %<extra></extra>", {
+        "color": [points["taux"][i] for i in connus],
+        "colorscale": COLORSCALE, "cmin": 0, "cmax": 100,
+        "colorbar": {"title": {"text": "Taux d'occupation (%)"}},
+    })]
+    if inconnus:
+        data.append(trace(inconnus, "%{text}<br>Taux d'occupation : n/d<extra></extra>", {"color": "grey"}))
+
+    return {
+        "data": data,
+        "layout": {
+            "map": {"style": "open-street-map", "center": vue["centre"], "zoom": vue["zoom"]},
+            # Conserve la position choisie par l'utilisateur quand les points sont remplacés
+            "uirevision": "carte",
+            "showlegend": False,
+            "margin": {"l": 0, "r": 0, "t": 0, "b": 0},
+            "height": HAUTEUR_PX,
+        },
+    }
+
+
+def layout():
+    return html.Div([
+        html.H1("Carte interactive des stations Vélib", style={"textAlign": "center"}),
+        html.P("Seules les stations visibles sont chargées ; elles sont regroupées aux faibles niveaux de zoom.",
+               style={"textAlign": "center"}),
+
+        html.Div([
+            dcc.Graph(id="carte-interactive", config={"scrollZoom": True}, style={"height": f"{HAUTEUR_PX}px"}),
+            html.Div(id="carte-interactive-info", style={"textAlign": "center", "fontSize": "12px", "color": "#666"}),
+        ], style={"padding": "20px"}),
+
+        dcc.Store(id="carte-interactive-vue",
+                  data={"centre": CENTRE_DEFAUT, "zoom": ZOOM_DEFAUT, "bbox": _bbox_from_centre(CENTRE_DEFAUT, ZOOM_DEFAUT)}),
+
+        create_footer()
+    ])
+
+
+def register_callbacks(app):
+    """Callbacks de la page, enregistrés au démarrage (la page elle-même est chargée à la première visite)."""
+    @app.callback(
+        Output("carte-interactive-vue", "data"),
+        Input("carte-interactive", "relayoutData"),
+        State("carte-interactive-vue", "data"),
+    )
+    def update_vue(relayout, vue):
+        nouvelle_vue = _viewport(relayout, vue)
+        return nouvelle_vue if nouvelle_vue is not None else no_update
+
+    @app.callback(
+        Output("carte-interactive", "figure"),
+        Output("carte-interactive-info", "children"),
+        Input("carte-interactive-vue", "data"),
+    )
+    @timed_callback("update_carte_interactive")
+    def update_carte_interactive(vue):
+        try:
+            points = viewport_stations(*vue["bbox"], zoom=vue["zoom"])
+        except (FileNotFoundError, sqlite3.Error) as e:
+            return {"data": [], "layout": {}}, f"Données indisponibles : {e}"
+        info = f"{len(points['lat'])} point(s) affiché(s), {sum(points['nb'])} station(s) dans la vue"
+        return _figure(points, vue), info
@@ -0,0 +1,69 @@
+import sqlite3
+from dash import html, dcc
+from pandas.errors import DatabaseError
+from src.components.footer import create_footer
+from src.utils.Create_DataBase import read_commune_aggregates
+from src.utils.db import get_read_connection
+
+COLONNES = {
+    "nom_commune": "Commune",
+    "nb_stations": "Stations",
+    "nb_non_fonctionnelles": "Hors service",
+    "capacite_station": "Capacité",
+    "velos_mecaniques": "Vélos mécaniques",
+    "velos_electriques": "Vélos électriques",
+    "taux_occupation": "Taux d'occupation (%)",
+}
+
+
+def _figure(df) -> dict:
+    """Vélos mécaniques et électriques disponibles par commune (barres empilées)."""
+    df = df.sort_values("velos_disponibles", ascending=False)
+    return {
+        "data": [
+            {"type": "bar", "name": "Vélos mécaniques", "x": df["nom_commune"].tolist(), "y": df["velos_mecaniques"].tolist()},
+            {"type": "bar", "name": "Vélos électriques", "x": df["nom_commune"].tolist(), "y": df["velos_electriques"].tolist()},
+        ],
+        "layout": {
+            "title": {"text": "Vélos disponibles par commune"},
+            "barmode": "stack",
+            "xaxis": {"tickangle": -45},
+            "yaxis": {"title": {"text": "Vélos disponibles"}},
+            "margin": {"b": 150},
+        },
+    }
+
+
+def _table(df):
+    lignes = [
+        html.Tr([html.Td("N/A" if valeur is None or valeur != valeur else (f"{valeur:.1f}" if col == "taux_occupation" else valeur))
+                 for col, valeur in ligne.items()])
+        for ligne in df[list(COLONNES)].to_dict("records")
+    ]
+    return html.Table(
+        [html.Thead(html.Tr([html.Th(titre, style={"padding": "5px 15px"}) for titre in COLONNES.values()])), html.Tbody(lignes)],
+        style={"margin": "0 auto"},
+    )
+
+
+def layout():
+    try:
+        df = read_commune_aggregates(get_read_connection())
+    except (FileNotFoundError, sqlite3.Error, DatabaseError):
+        df = None
+
+    if df is None or df.empty:
+        contenu = [html.H3("Les agrégats par commune n'ont pas encore été générés.", style={"color": "red", "textAlign": "center"})]
+    else:
+        contenu = [
+            dcc.Graph(figure=_figure(df), style={"width": "100%", "height": "600px"}, config={"displaylogo": False}),
+            _table(df),
+        ]
+
+    return html.Div([
+        html.H1("Les vélib par commune", style={"textAlign": "center"}),
+
+        html.Div(contenu, style={"padding": "20px"}),
+
+        create_footer()
+    ])
@@ -0,0 +1,18 @@
+from dash import html
+from src.components.footer import create_footer
+from src.utils.load_figure import load_figure
+
+
+def layout():
+    return html.Div([
+        html.H1("Évolution de l'occupation des stations vélib en Région parisienne", style={"textAlign": "center"}),
+    
+        html.Div([
+        
+            load_figure("line_occupation_horaire", height="500px"),
+            load_figure("line_stations_vides_pleines", height="500px"),
+
+        ], style={"padding": "20px"}),
+
+        create_footer()
+    ])
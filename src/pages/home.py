@@ -1,6 +1,6 @@
 from dash import html
 from src.components.footer import create_footer
-from config import chemin_home,chemin_carte_position,chemin_velos_disponibles,chemin_velos_electriques,chemin_velos_mecaniques,chemin_capacite_station,chemin_taux_occupation_moyen,chemin_station_non_fonctionnelles,chemin_capacite_vs_disponibles
+from config import chemin_home,chemin_carte_position,chemin_velos_disponibles,chemin_velos_electriques,chemin_velos_mecaniques,chemin_capacite_station,chemin_taux_occupation_moyen,chemin_station_non_fonctionnelles,chemin_capacite_vs_disponibles,chemin_evolution_occupation,chemin_stations_proches,chemin_carte_interactive,chemin_communes
 
 
 layout = html.Div([
@@ -11,6 +11,10 @@ layout = html.Div([
             html.Button("Carte Position", style={"padding": "15px 25px","margin": "10px","fontSize": "18px","borderRadius": "12px","border": "none","backgroundColor": "#0074D9","color": "white","cursor": "pointer","transition": "0.3s",}),
             href=chemin_carte_position
         ),
+        html.A(
+            html.Button("Carte interactive", style={"padding": "15px 25px","margin": "10px","fontSize": "18px","borderRadius": "12px","border": "none","backgroundColor": "#0074D9","color": "white","cursor": "pointer","transition": "0.3s",}),
+            href=chemin_carte_interactive
+        ),
         html.A(
             html.Button("Histogramme des vélib disponnibles", style={"padding": "15px 25px","margin": "10px","fontSize": "18px","borderRadius": "12px","border": "none","backgroundColor": "#0074D9","color": "white","cursor": "pointer","transition": "0.3s",}),
             href=chemin_velos_disponibles
@@ -43,6 +47,18 @@ layout = html.Div([
             html.Button("Capacité vs Vélos Disponible", style={"padding": "15px 25px","margin": "10px","fontSize": "18px","borderRadius": "12px","border": "none","backgroundColor": "#0074D9","color": "white","cursor": "pointer","transition": "0.3s",}),
             href=chemin_capacite_vs_disponibles
         ),
+        html.A(
+            html.Button("Évolution de l'occupation", style={"padding": "15px 25px","margin": "10px","fontSize": "18px","borderRadius": "12px","border": "none","backgroundColor": "#0074D9","color": "white","cursor": "pointer","transition": "0.3s",}),
+            href=chemin_evolution_occupation
+        ),
+        html.A(
+            html.Button("Stations les plus proches", style={"padding": "15px 25px","margin": "10px","fontSize": "18px","borderRadius": "12px","border": "none","backgroundColor": "#0074D9","color": "white","cursor": "pointer","transition": "0.3s",}),
+            href=chemin_stations_proches
+        ),
+        html.A(
+            html.Button("Vélib par commune", style={"padding": "15px 25px","margin": "10px","fontSize": "18px","borderRadius": "12px","border": "none","backgroundColor": "#0074D9","color": "white","cursor": "pointer","transition": "0.3s",}),
+            href=chemin_communes
+        ),
     ], style={"display": "flex", "flexGrow": 1, "justify-content": "center"}),
 
     create_footer()
@@ -1,16 +1,49 @@
 from dash import html
 from src.components.footer import create_footer
-from src.utils.load_html import load_html_asset
+from src.utils.data_cache import snapshot_cache
+from src.utils.load_figure import load_figure
 
 
-layout = html.Div([
-    html.H1("", style={"textAlign": "center"}),
+def liste_non_fonctionnelles():
+    """Tableau des stations hors service, filtrées dans le store en mémoire (sans requête SQL)."""
+    store = snapshot_cache.get_snapshot()
+    if store is None:
+        return html.P("Les données des stations n'ont pas encore été générées.", style={"textAlign": "center"})
+
+    indices = store.non_fonctionnelles()
+    if len(indices) == 0:
+        return html.P("Toutes les stations sont en fonctionnement.", style={"textAlign": "center"})
+
+    data = store.data
+    lignes = [
+        html.Tr([
+            html.Td(store.noms[i]),
+            html.Td(store.noms_communes[data["commune"][i]] if data["commune"][i] >= 0 else "N/A"),
+            html.Td(int(data["capacite_station"][i])),
+            html.Td(int(data["velos_disponibles"][i])),
+        ])
+        for i in indices
+    ]
+    entetes = ["Station", "Commune", "Capacité", "Vélos disponibles"]
+    return html.Div([
+        html.H3(f"{len(indices)} station(s) non fonctionnelle(s)", style={"textAlign": "center"}),
+        html.Table(
+            [html.Thead(html.Tr([html.Th(e, style={"padding": "5px 15px"}) for e in entetes])), html.Tbody(lignes)],
+            style={"margin": "0 auto"},
+        ),
+    ])
+
+
+def layout():
+    return html.Div([
+        html.H1("", style={"textAlign": "center"}),
     
-    html.Div([
+        html.Div([
         
-        load_html_asset("bar_stations_non_fonctionnelles.html", height="500px"),
+            load_figure("bar_stations_non_fonctionnelles", height="500px"),
+            liste_non_fonctionnelles(),
         
-    ], style={"padding": "20px"}),
+        ], style={"padding": "20px"}),
 
-    create_footer()
-])
\ No newline at end of file
+        create_footer()
+    ])
@@ -0,0 +1,68 @@
+import sqlite3
+from dash import html, dcc, Input, Output
+from src.components.footer import create_footer
+from src.utils.metrics import timed_callback
+from src.utils.spatial import nearest_stations, MAX_NEAREST
+
+# Point de départ par défaut : Hôtel de Ville de Paris
+LATITUDE_DEFAUT = 48.8566
+LONGITUDE_DEFAUT = 2.3522
+
+CHAMP_STYLE = {"margin": "0 10px", "padding": "5px", "width": "120px"}
+
+
+def _champ(label, id, value, **kwargs):
+    return html.Label([label, dcc.Input(id=id, type="number", value=value, debounce=True, style=CHAMP_STYLE, **kwargs)])
+
+
+layout = html.Div([
+    html.H1("Stations les plus proches", style={"textAlign": "center"}),
+
+    html.Div([
+        _champ("Latitude", "proches-lat", LATITUDE_DEFAUT, step=0.0001),
+        _champ("Longitude", "proches-lon", LONGITUDE_DEFAUT, step=0.0001),
+        _champ("Nombre de stations", "proches-n", 5, min=1, max=MAX_NEAREST, step=1),
+        _champ("Vélos électriques (min.)", "proches-min-electriques", 1, min=0, step=1),
+    ], style={"display": "flex", "justifyContent": "center", "flexWrap": "wrap", "padding": "20px"}),
+
+    html.Div(id="proches-resultats", style={"display": "flex", "justifyContent": "center", "padding": "20px"}),
+
+    create_footer()
+])
+
+
+def _table(stations):
+    entetes = ["Station", "Distance (m)", "Vélos électriques", "Vélos mécaniques", "Bornettes libres"]
+    lignes = [
+        html.Tr([
+            html.Td(station["nom_station"]),
+            html.Td(station["distance_m"]),
+            html.Td(station["velos_electriques"]),
+            html.Td(station["velos_mecaniques"]),
+            html.Td(station["bornettes_libres"]),
+        ])
+        for station in stations
+    ]
+    return html.Table([html.Thead(html.Tr([html.Th(e, style={"padding": "5px 15px"}) for e in entetes])), html.Tbody(lignes)])
+
+
+def register_callbacks(app):
+    """Callback de la page, enregistré au démarrage (la page elle-même est chargée à la première visite)."""
+    @app.callback(
+        Output("proches-resultats", "children"),
+        Input("proches-lat", "value"),
+        Input("proches-lon", "value"),
+        Input("proches-n", "value"),
+        Input("proches-min-electriques", "value"),
+    )
+    @timed_callback("update_stations_proches")
+    def update_stations_proches(lat, lon, n, min_electriques):
+        if lat is None or lon is None:
+            return html.P("Saisissez une latitude et une longitude.")
+        try:
+            stations = nearest_stations(lat, lon, n=max(1, min(int(n or 5), MAX_NEAREST)), min_electriques=int(min_electriques or 0))
+        except (FileNotFoundError, sqlite3.Error) as e:
+            return html.P(f"Données indisponibles : {e}", style={"color": "#c0392b"})
+        if not stations:
+            return html.P("Aucune station ne correspond à ces critères.")
+        return _table(stations)
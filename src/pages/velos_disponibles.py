@@ -1,16 +1,17 @@
 from dash import html
 from src.components.footer import create_footer
-from src.utils.load_html import load_html_asset
+from src.utils.load_figure import load_figure
 
 
-layout = html.Div([
-    html.H1("Histogramme des velos disponible en Région parisienne", style={"textAlign": "center"}),
+def layout():
+    return html.Div([
+        html.H1("Histogramme des velos disponible en Région parisienne", style={"textAlign": "center"}),
     
-    html.Div([
+        html.Div([
         
-        load_html_asset("hist_velos_disponibles.html", height="500px"),
+            load_figure("hist_velos_disponibles", height="500px"),
 
-    ], style={"padding": "20px"}),
+        ], style={"padding": "20px"}),
 
-    create_footer()
-])
\ No newline at end of file
+        create_footer()
+    ])
\ No newline at end of file
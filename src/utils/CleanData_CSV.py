@@ -1,8 +1,22 @@
 import os
+import argparse
+from typing import Iterator
 import pandas as pd
-from pydantic import ValidationError
-from src.utils.velib_station import VelibStation
-from config import rawdata_path, cleandata_path
+from src.utils.velib_validation import validate_velib_frame, validate_velib_rows
+from src.utils.columnar import clean_output_path, write_clean_columnar
+from src.utils.atomic_write import atomic_path
+from src.utils.db import connect, checkpoint
+from src.utils.Create_DataBase import create_schema, ingest_snapshot, split_coordinates
+from src.utils.metrics import CLEAN_ROWS, CLEAN_REJECTS
+from config import rawdata_path, rejectdata_path, clean_format, cleandata_path as csv_clean_path, db_path
+
+# Taille par défaut des blocs lus en mode par blocs (lignes)
+CHUNK_ROWS = 100_000
+RAW_DTYPES = {
+    'Identifiant station': str,
+    'Code INSEE communes équipées': str
+}
+OPTIONAL_COLUMNS = ['station_opening_hours', 'Nom communes équipées', 'Code INSEE communes équipées']
 
 def remove_empty_columns(df):
     """
@@ -30,9 +44,46 @@ def remove_empty_columns(df):
     
     return df, []
 
-def clean_velib_csv():
-    
+def read_raw_velib_csv(path: str = rawdata_path) -> pd.DataFrame:
+    """
+    Lit le CSV brut data.gouv.fr et prépare les colonnes optionnelles pour la validation.
+
+    Args:
+        path (str): Chemin du fichier CSV brut
+    """
+    df = pd.read_csv(path, sep=';', dtype=RAW_DTYPES)
+    return _prepare_optional_columns(df)
+
+def _prepare_optional_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Remplacer les NaN par None pour les colonnes optionnelles
+    for col in OPTIONAL_COLUMNS:
+        if col not in df.columns:
+            continue
+        df[col] = df[col].where(pd.notna(df[col]), None)
+        # Convertir les valeurs NaN en None
+        df[col] = df[col].astype(object).replace({pd.NA: None, pd.NaT: None, float('nan'): None})
+    return df
+
+def iter_raw_velib_csv(path: str = rawdata_path, chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Lit le CSV brut par blocs de chunksize lignes (mémoire bornée quelle que soit la taille du fichier).
+    L'index des blocs se poursuit d'un bloc à l'autre : les numéros de ligne des rejets restent ceux du fichier.
+    """
+    with pd.read_csv(path, sep=';', dtype=RAW_DTYPES, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield _prepare_optional_columns(chunk)
+
+def clean_velib_csv(mode: str = "vectorise", fmt: str = clean_format):
+    """
+    Nettoie et valide le CSV brut, puis écrit le fichier nettoyé.
+
+    Args:
+        mode (str): "vectorise" (validation colonne par colonne, par défaut)
+            ou "pydantic" (un modèle VelibStation par ligne, plus lent)
+        fmt (str): format du fichier nettoyé, "csv" ou "parquet" / "arrow" (colonnes typées)
+    """
     print(f"Fichier source : {rawdata_path}")
+    cleandata_path = clean_output_path(fmt)
     
     # Suppression de l'ancien fichier clean s'il existe
     if os.path.exists(cleandata_path):
@@ -40,54 +91,124 @@ def clean_velib_csv():
         print(f"Ancien fichier nettoyé supprimé : {cleandata_path}")
 
     # --- Lecture du fichier  ---
-    df = pd.read_csv(rawdata_path, sep=';', dtype={
-        'Identifiant station': str,
-        'Code INSEE communes équipées': str
-    })
-    # Remplacer les NaN par None pour les colonnes optionnelles
-    optional_columns = ['station_opening_hours', 'Nom communes équipées', 'Code INSEE communes équipées']
-    for col in optional_columns:
-        df[col] = df[col].where(pd.notna(df[col]), None)
-        # Convertir les valeurs NaN en None
-        df[col] = df[col].astype(object).replace({pd.NA: None, pd.NaT: None, float('nan'): None})
+    df = read_raw_velib_csv(rawdata_path)
     
     # Supprimer les colonnes entièrement vides
     df, removed_columns = remove_empty_columns(df)
 
-    valid_rows = []
-    invalid_count = 0
-
     # --- Validation et filtrage des lignes ---
-    for idx, row in df.iterrows():
-        try:
-            # Validation avec Pydantic
-            record = VelibStation(**row.to_dict())
-            valid_rows.append(record.model_dump(by_alias=True))
-        except ValidationError as e:
-            print(f"Erreur de validation à la ligne {idx+1}:")
-            print(str(e))
-            invalid_count += 1
-        except Exception as e:
-            print(f"Erreur inattendue à la ligne {idx+1}:")
-            print(str(e))
-            invalid_count += 1
+    if mode == "pydantic":
+        clean_df, rejects_df = validate_velib_rows(df)
+    elif mode == "vectorise":
+        clean_df, rejects_df = validate_velib_frame(df)
+    else:
+        raise ValueError(f"Mode de validation inconnu : {mode}")
+
+    CLEAN_ROWS.set(len(df), etat="lues")
+    CLEAN_ROWS.set(len(clean_df), etat="conservees")
+    CLEAN_ROWS.set(len(df) - len(clean_df), etat="rejetees")
+    for champ, nombre in rejects_df["champ"].value_counts().items():
+        CLEAN_REJECTS.inc(nombre, champ=champ)
+
+    for rejet in rejects_df.itertuples(index=False):
+        print(f"Erreur de validation à la ligne {rejet.ligne} ({rejet.champ}) : {rejet.erreur}")
+
+    # Les rejets détaillés sont conservés à côté du fichier nettoyé
+    if os.path.exists(rejectdata_path):
+        os.remove(rejectdata_path)
+    if not rejects_df.empty:
+        rejects_df.to_csv(rejectdata_path, index=False)
+        print(f"Rejets enregistrés : {rejectdata_path}")
 
     # --- Sauvegarde dans le répertoire cleandata ---
-    if valid_rows:
-        # Création du DataFrame nettoyé
-        clean_df = pd.DataFrame(valid_rows)
-        
+    if not clean_df.empty:
         # Détection et suppression automatique des colonnes vides
         clean_df, removed_columns = remove_empty_columns(clean_df)
         if removed_columns:
             print("Colonnes automatiquement supprimées car vides :", ", ".join(removed_columns))
         
         # Sauvegarde du fichier
-        clean_df.to_csv(cleandata_path, index=False)
+        if fmt == "csv":
+            clean_df.to_csv(cleandata_path, index=False)
+        else:
+            write_clean_columnar(clean_df, cleandata_path, fmt)
         print(f"Fichier nettoyé : {cleandata_path}")
-        print(f"Lignes traitées : {len(df)} → {len(valid_rows)} conservées")
+        print(f"Lignes traitées : {len(df)} → {len(clean_df)} conservées")
     else:
         print("Aucune donnée valide trouvée, aucun fichier créé.")
 
+def clean_velib_csv_chunked(path: str = rawdata_path, chunksize: int = CHUNK_ROWS, target: str = "csv") -> dict:
+    """
+    Nettoie un CSV brut volumineux (archive de plusieurs instantanés) bloc par bloc.
+
+    Chaque bloc est validé puis ajouté au CSV nettoyé, ou importé directement dans la base
+    SQLite (une transaction par bloc) : seul un bloc est en mémoire à la fois.
+    Les colonnes vides ne sont pas supprimées, pour garder les mêmes colonnes dans tous les blocs.
+
+    Args:
+        path (str): CSV brut (format data.gouv.fr)
+        chunksize (int): Nombre de lignes par bloc
+        target (str): "csv" (fichier nettoyé, remplacé une fois complet) ou "sqlite" (import dans velib.db)
+
+    Returns:
+        dict: nombre de lignes lues, conservées et rejetées
+    """
+    if target not in ("csv", "sqlite"):
+        raise ValueError(f"Destination inconnue pour le nettoyage par blocs : {target}")
+    print(f"Fichier source (par blocs de {chunksize} lignes) : {path}")
+
+    totaux = {"lues": 0, "conservees": 0, "rejetees": 0}
+    if os.path.exists(rejectdata_path):
+        os.remove(rejectdata_path)
+
+    def traiter(ecrire_bloc):
+        for numero, chunk in enumerate(iter_raw_velib_csv(path, chunksize), start=1):
+            clean_df, rejects_df = validate_velib_frame(chunk)
+            if not rejects_df.empty:
+                rejects_df.to_csv(rejectdata_path, mode="a", index=False, header=not os.path.exists(rejectdata_path))
+            if not clean_df.empty:
+                # En-tête avec le premier bloc écrit (pas forcément le premier bloc lu, s'il est entièrement rejeté)
+                ecrire_bloc(clean_df, totaux["conservees"] == 0)
+
+            totaux["lues"] += len(chunk)
+            totaux["conservees"] += len(clean_df)
+            totaux["rejetees"] += len(chunk) - len(clean_df)
+            CLEAN_ROWS.set(totaux["lues"], etat="lues")
+            CLEAN_ROWS.set(totaux["conservees"], etat="conservees")
+            CLEAN_ROWS.set(totaux["rejetees"], etat="rejetees")
+            for champ, nombre in rejects_df["champ"].value_counts().items():
+                CLEAN_REJECTS.inc(nombre, champ=champ)
+            print(f"Bloc {numero} : {len(chunk)} lignes, {len(clean_df)} conservées, "
+                  f"{len(chunk) - len(clean_df)} rejetées (total : {totaux['lues']} lues)")
+
+    if target == "csv":
+        # Fichier temporaire complété bloc par bloc, publié une fois entièrement écrit
+        with atomic_path(csv_clean_path) as tmp_path:
+            traiter(lambda clean_df, premier: clean_df.to_csv(tmp_path, mode="w" if premier else "a",
+                                                               index=False, header=premier))
+        print(f"Fichier nettoyé : {csv_clean_path}")
+    else:
+        conn = connect(db_path)
+        try:
+            create_schema(conn)
+            traiter(lambda clean_df, premier: ingest_snapshot(conn, split_coordinates(clean_df)))
+            checkpoint(conn)
+        finally:
+            conn.close()
+        print(f"Base de données à jour : {db_path}")
+
+    print(f"Lignes traitées : {totaux['lues']} → {totaux['conservees']} conservées")
+    return totaux
+
 if __name__ == "__main__":
-    clean_velib_csv()
+    parser = argparse.ArgumentParser(description="Nettoyage du CSV Vélib")
+    parser.add_argument("--chunked", metavar="CSV", help="nettoie ce CSV (archive) par blocs au lieu du fichier téléchargé")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="nombre de lignes par bloc")
+    parser.add_argument("--target", choices=["csv", "sqlite"], default="csv",
+                        help="destination des blocs nettoyés : CSV nettoyé ou base SQLite")
+    args = parser.parse_args()
+
+    if args.chunked:
+        clean_velib_csv_chunked(args.chunked, args.chunksize, args.target)
+    else:
+        clean_velib_csv()
@@ -1,145 +1,600 @@
 import os
+import tempfile
 import pandas as pd
 import sqlite3
-from datetime import datetime
-from config import cleandata_path, db_path
+from src.utils.db import connect, checkpoint, replace_database
+from src.utils.columnar import clean_output_path, read_clean_columnar
+from src.utils.metrics import DB_ROWS_INSERTED
+from src.utils.snapshot_diff import diff_snapshot
+from config import db_path
 
-def create_velib_database():
+# Colonnes agrégées (min / somme / max) dans les tables d'occupation
+ROLLUP_METRICS = ["velos_disponibles", "velos_electriques", "velos_mecaniques"]
 
-    # Suppression de l'ancienne base de données si elle existe
-    if os.path.exists(db_path):
-        os.remove(db_path)
-        print(f"Ancienne base de données supprimée : {db_path}")
+# Tables d'agrégats et format (strftime, en UTC) de leur période
+ROLLUPS = {
+    "occupation_horaire": "%Y-%m-%d %H:00",
+    "occupation_journaliere": "%Y-%m-%d",
+}
 
-    # Lecture du fichier CSV nettoyé
-    print(f"Lecture du fichier CSV : {cleandata_path}")
-    df = pd.read_csv(cleandata_path)
+ROLLUP_COLUMNS = "\n".join(
+    ["    nb_releves INTEGER NOT NULL,"]
+    + [f"    {col}_{agg} INTEGER NOT NULL," for col in ROLLUP_METRICS for agg in ("min", "somme", "max")]
+    + ["    nb_vide INTEGER NOT NULL,", "    nb_pleine INTEGER NOT NULL,"]
+)
 
-    # Création de la connexion à la base de données
-    print("Création de la base de données...")
-    conn = sqlite3.connect(db_path)
+# Schéma de la base : référentiels (communes, stations) et séries temporelles (etats, disponibilites).
+# Les séries temporelles ne reçoivent que les relevés où l'état d'une station a changé (voir changements).
+# Les index uniques (station, date) dédupliquent les instantanés déjà importés.
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS communes (
+    code_insee TEXT PRIMARY KEY,
+    nom_commune TEXT NOT NULL
+);
 
-    try:
-        # Séparation des coordonnées géographiques
-        df[['latitude', 'longitude']] = df['Coordonnées géographiques'].str.strip('()').str.split(',', expand=True).astype(float)
-        
-        # 1. Création et remplissage de la table communes
-        print("Création de la table communes...")
-        conn.execute("""
-        CREATE TABLE communes (
-            code_insee TEXT PRIMARY KEY,
-            nom_commune TEXT NOT NULL
-        )
-        """)
-        
-        # Extraction des communes uniques
-        communes_df = df[['Code INSEE communes équipées', 'Nom communes équipées']].dropna().drop_duplicates()
-        communes_df.to_sql('communes', conn, if_exists='replace', index=False, 
-                          dtype={'code_insee': 'TEXT PRIMARY KEY', 
-                                'nom_commune': 'TEXT'})
-
-        # 2. Création de la table stations
-        print("Création de la table stations...")
-        conn.execute("""
-        CREATE TABLE stations (
-            identifiant_station TEXT PRIMARY KEY,
-            nom_station TEXT NOT NULL,
-            latitude REAL NOT NULL,
-            longitude REAL NOT NULL,
-            capacite_station INTEGER NOT NULL,
-            code_insee TEXT,
-            FOREIGN KEY (code_insee) REFERENCES communes(code_insee)
-        )
+CREATE TABLE IF NOT EXISTS stations (
+    identifiant_station TEXT PRIMARY KEY,
+    nom_station TEXT NOT NULL,
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    capacite_station INTEGER NOT NULL,
+    code_insee TEXT,
+    FOREIGN KEY (code_insee) REFERENCES communes(code_insee)
+);
+
+CREATE TABLE IF NOT EXISTS etats (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    identifiant_station TEXT NOT NULL,
+    actualisation_donnee TIMESTAMP NOT NULL,
+    station_en_fonctionnement INTEGER NOT NULL,
+    borne_paiement INTEGER NOT NULL,
+    retour_possible INTEGER NOT NULL,
+    FOREIGN KEY (identifiant_station) REFERENCES stations(identifiant_station)
+);
+
+CREATE TABLE IF NOT EXISTS disponibilites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    identifiant_station TEXT NOT NULL,
+    actualisation_donnee TIMESTAMP NOT NULL,
+    bornettes_libres INTEGER NOT NULL,
+    velos_disponibles INTEGER NOT NULL,
+    velos_mecaniques INTEGER NOT NULL,
+    velos_electriques INTEGER NOT NULL,
+    FOREIGN KEY (identifiant_station) REFERENCES stations(identifiant_station)
+);
+
+-- Journal des changements : une ligne par relevé ajouté à etats / disponibilites,
+-- avec les colonnes modifiées depuis le relevé précédent de la station.
+CREATE TABLE IF NOT EXISTS changements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    identifiant_station TEXT NOT NULL,
+    actualisation_donnee TIMESTAMP NOT NULL,
+    champs TEXT NOT NULL,
+    FOREIGN KEY (identifiant_station) REFERENCES stations(identifiant_station)
+);
+
+-- Dernier état connu de chaque station, mis à jour à chaque import.
+-- Table organisée par sa clé primaire (WITHOUT ROWID) : la recherche par station
+-- lit directement toutes les colonnes, sans passer par l'historique.
+CREATE TABLE IF NOT EXISTS latest_disponibilites (
+    identifiant_station TEXT PRIMARY KEY,
+    actualisation_donnee TIMESTAMP NOT NULL,
+    bornettes_libres INTEGER NOT NULL,
+    velos_disponibles INTEGER NOT NULL,
+    velos_mecaniques INTEGER NOT NULL,
+    velos_electriques INTEGER NOT NULL,
+    station_en_fonctionnement INTEGER NOT NULL,
+    borne_paiement INTEGER NOT NULL,
+    retour_possible INTEGER NOT NULL,
+    FOREIGN KEY (identifiant_station) REFERENCES stations(identifiant_station)
+) WITHOUT ROWID;
+
+-- Agrégats par station et par heure / par jour, mis à jour à chaque import.
+-- Les sommes et nombres de relevés permettent de recalculer les moyennes de façon incrémentale.
+CREATE TABLE IF NOT EXISTS occupation_horaire (
+    identifiant_station TEXT NOT NULL,
+    periode TEXT NOT NULL,
+{ROLLUP_COLUMNS}
+    PRIMARY KEY (identifiant_station, periode)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS occupation_journaliere (
+    identifiant_station TEXT NOT NULL,
+    periode TEXT NOT NULL,
+{ROLLUP_COLUMNS}
+    PRIMARY KEY (identifiant_station, periode)
+) WITHOUT ROWID;
+
+-- Nombre de relevés par valeur (vélos disponibles, électriques, mécaniques) et par couple
+-- (capacité, vélos disponibles), mis à jour à chaque import : histogrammes des graphiques.
+CREATE TABLE IF NOT EXISTS distribution_releves (
+    colonne TEXT NOT NULL,
+    valeur INTEGER NOT NULL,
+    nb_releves INTEGER NOT NULL,
+    PRIMARY KEY (colonne, valeur)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS distribution_capacite_velos (
+    capacite_station INTEGER NOT NULL,
+    velos_disponibles INTEGER NOT NULL,
+    nb_releves INTEGER NOT NULL,
+    PRIMARY KEY (capacite_station, velos_disponibles)
+) WITHOUT ROWID;
+
+-- Totaux par commune du dernier état des stations, recalculés à chaque import
+-- (quelques dizaines de lignes lues par la page des communes).
+CREATE TABLE IF NOT EXISTS agregats_communes (
+    code_insee TEXT PRIMARY KEY,
+    nb_stations INTEGER NOT NULL,
+    nb_non_fonctionnelles INTEGER NOT NULL,
+    capacite_station INTEGER NOT NULL,
+    bornettes_libres INTEGER NOT NULL,
+    velos_disponibles INTEGER NOT NULL,
+    velos_mecaniques INTEGER NOT NULL,
+    velos_electriques INTEGER NOT NULL,
+    actualisation_donnee TIMESTAMP,
+    FOREIGN KEY (code_insee) REFERENCES communes(code_insee)
+) WITHOUT ROWID;
+
+-- Index spatial (R-tree) des positions des stations, identifiées par le rowid de stations.
+-- Tenu à jour par des triggers à chaque ajout ou déplacement de station.
+CREATE VIRTUAL TABLE IF NOT EXISTS stations_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+
+CREATE TRIGGER IF NOT EXISTS stations_rtree_insert AFTER INSERT ON stations BEGIN
+    INSERT OR REPLACE INTO stations_rtree VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude);
+END;
+
+CREATE TRIGGER IF NOT EXISTS stations_rtree_update AFTER UPDATE OF latitude, longitude ON stations
+WHEN old.latitude IS NOT new.latitude OR old.longitude IS NOT new.longitude BEGIN
+    INSERT OR REPLACE INTO stations_rtree VALUES (new.rowid, new.latitude, new.latitude, new.longitude, new.longitude);
+END;
+
+CREATE TRIGGER IF NOT EXISTS stations_rtree_delete AFTER DELETE ON stations BEGIN
+    DELETE FROM stations_rtree WHERE id = old.rowid;
+END;
+
+CREATE INDEX IF NOT EXISTS idx_stations_commune ON stations(code_insee);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_etats_station_date ON etats(identifiant_station, actualisation_donnee);
+CREATE INDEX IF NOT EXISTS idx_etats_date ON etats(actualisation_donnee);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_disponibilites_station_date ON disponibilites(identifiant_station, actualisation_donnee);
+CREATE INDEX IF NOT EXISTS idx_disponibilites_date ON disponibilites(actualisation_donnee);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_changements_station_date ON changements(identifiant_station, actualisation_donnee);
+CREATE INDEX IF NOT EXISTS idx_changements_date ON changements(actualisation_donnee);
+CREATE INDEX IF NOT EXISTS idx_occupation_horaire_periode ON occupation_horaire(periode);
+CREATE INDEX IF NOT EXISTS idx_occupation_journaliere_periode ON occupation_journaliere(periode);
+"""
+
+
+TABLES = ["agregats_communes", "stations_rtree", "distribution_capacite_velos", "distribution_releves", "occupation_journaliere", "occupation_horaire", "latest_disponibilites", "changements", "disponibilites", "etats", "stations", "communes"]
+
+LATEST_COLUMNS = [
+    "identifiant_station", "actualisation_donnee", "bornettes_libres", "velos_disponibles",
+    "velos_mecaniques", "velos_electriques", "station_en_fonctionnement", "borne_paiement", "retour_possible",
+]
+
+# Mise à jour du dernier état : une ligne plus ancienne que l'état connu est ignorée
+UPSERT_LATEST = f"""
+    INSERT INTO latest_disponibilites ({", ".join(LATEST_COLUMNS)})
+    VALUES ({", ".join("?" * len(LATEST_COLUMNS))})
+    ON CONFLICT(identifiant_station) DO UPDATE SET
+        {", ".join(f"{col} = excluded.{col}" for col in LATEST_COLUMNS[1:])}
+    WHERE julianday(excluded.actualisation_donnee) >= julianday(latest_disponibilites.actualisation_donnee)
+"""
+
+# Table temporaire des relevés nouveaux d'un import (modifiés ou non), source des agrégats
+RELEVES_TABLE = "temp.releves_nouveaux"
+RELEVES_COLUMNS = LATEST_COLUMNS[:6]
+
+
+def _rollup_sql(table: str, format_periode: str, source: str = RELEVES_TABLE) -> str:
+    """
+    Ajoute aux agrégats de table tous les relevés de source.
+
+    Une station est vide sans vélo disponible, pleine sans bornette libre.
+    """
+    colonnes = ["identifiant_station", "periode", "nb_releves"]
+    selection = [
+        "d.identifiant_station",
+        f"strftime('{format_periode}', d.actualisation_donnee)",
+        "COUNT(*)",
+    ]
+    mises_a_jour = ["nb_releves = nb_releves + excluded.nb_releves"]
+    for col in ROLLUP_METRICS:
+        colonnes += [f"{col}_min", f"{col}_somme", f"{col}_max"]
+        selection += [f"MIN(d.{col})", f"SUM(d.{col})", f"MAX(d.{col})"]
+        mises_a_jour += [
+            f"{col}_min = MIN({col}_min, excluded.{col}_min)",
+            f"{col}_somme = {col}_somme + excluded.{col}_somme",
+            f"{col}_max = MAX({col}_max, excluded.{col}_max)",
+        ]
+    colonnes += ["nb_vide", "nb_pleine"]
+    selection += ["SUM(d.velos_disponibles = 0)", "SUM(d.bornettes_libres = 0)"]
+    mises_a_jour += ["nb_vide = nb_vide + excluded.nb_vide", "nb_pleine = nb_pleine + excluded.nb_pleine"]
+    return f"""
+        INSERT INTO {table} ({", ".join(colonnes)})
+        SELECT {", ".join(selection)}
+        FROM {source} AS d
+        GROUP BY 1, 2
+        ON CONFLICT(identifiant_station, periode) DO UPDATE SET
+            {", ".join(mises_a_jour)}
+    """
+
+
+UPDATE_ROLLUPS = {table: _rollup_sql(table, fmt) for table, fmt in ROLLUPS.items()}
+
+
+def _distribution_sql(source: str = RELEVES_TABLE) -> list:
+    """
+    Ajoute aux tables de distribution tous les relevés de source : nombre de relevés par valeur
+    de chaque colonne de ROLLUP_METRICS, et par couple (capacité actuelle de la station, vélos disponibles).
+    """
+    requetes = [
+        f"""
+        INSERT INTO distribution_releves (colonne, valeur, nb_releves)
+        SELECT '{col}', d.{col}, COUNT(*)
+        FROM {source} AS d
+        WHERE d.{col} IS NOT NULL
+        GROUP BY 2
+        ON CONFLICT(colonne, valeur) DO UPDATE SET nb_releves = nb_releves + excluded.nb_releves
+        """
+        for col in ROLLUP_METRICS
+    ]
+    requetes.append(f"""
+        INSERT INTO distribution_capacite_velos (capacite_station, velos_disponibles, nb_releves)
+        SELECT s.capacite_station, d.velos_disponibles, COUNT(*)
+        FROM {source} AS d
+        JOIN stations AS s ON s.identifiant_station = d.identifiant_station
+        WHERE s.capacite_station > 0 AND d.velos_disponibles IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT(capacite_station, velos_disponibles) DO UPDATE SET nb_releves = nb_releves + excluded.nb_releves
+    """)
+    return requetes
+
+
+UPDATE_DISTRIBUTIONS = _distribution_sql()
+
+# Totaux par commune recalculés depuis le dernier état (regroupement par l'index idx_stations_commune)
+REFRESH_COMMUNES = """
+    INSERT INTO agregats_communes (code_insee, nb_stations, nb_non_fonctionnelles, capacite_station,
+        bornettes_libres, velos_disponibles, velos_mecaniques, velos_electriques, actualisation_donnee)
+    SELECT s.code_insee, COUNT(*), SUM(l.station_en_fonctionnement = 0), SUM(s.capacite_station),
+        SUM(l.bornettes_libres), SUM(l.velos_disponibles), SUM(l.velos_mecaniques), SUM(l.velos_electriques),
+        MAX(l.actualisation_donnee)
+    FROM stations AS s
+    JOIN latest_disponibilites AS l ON l.identifiant_station = s.identifiant_station
+    WHERE s.code_insee IS NOT NULL
+    GROUP BY s.code_insee
+"""
+
+
+def _rows(df: pd.DataFrame) -> list:
+    """Convertit un DataFrame en tuples de types Python natifs (NaN -> NULL) pour sqlite3."""
+    return list(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None))
+
+
+def _is_legacy_schema(conn: sqlite3.Connection) -> bool:
+    """
+    Détecte une base créée par l'ancienne version (tables remplacées par to_sql,
+    sans clés primaires ni index uniques) : elle ne peut pas recevoir d'ajouts incrémentaux.
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if not tables.intersection(TABLES):
+        return False
+    colonnes_communes = {row[1] for row in conn.execute("PRAGMA table_info(communes)")}
+    index = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    return "code_insee" not in colonnes_communes or "idx_disponibilites_station_date" not in index
+
+
+def _backfill_latest(conn: sqlite3.Connection) -> None:
+    """Remplit latest_disponibilites à partir de l'historique (bases créées avant cette table)."""
+    if conn.execute("SELECT 1 FROM latest_disponibilites LIMIT 1").fetchone():
+        return
+    with conn:
+        conn.execute(f"""
+            INSERT INTO latest_disponibilites ({", ".join(LATEST_COLUMNS)})
+            SELECT d.identifiant_station, d.actualisation_donnee, d.bornettes_libres, d.velos_disponibles,
+                   d.velos_mecaniques, d.velos_electriques, e.station_en_fonctionnement,
+                   e.borne_paiement, e.retour_possible
+            FROM disponibilites AS d
+            JOIN etats AS e
+                ON e.identifiant_station = d.identifiant_station
+                AND e.actualisation_donnee = d.actualisation_donnee
+            WHERE d.id = (
+                SELECT d2.id FROM disponibilites AS d2
+                WHERE d2.identifiant_station = d.identifiant_station
+                ORDER BY julianday(d2.actualisation_donnee) DESC
+                LIMIT 1
+            )
         """)
 
-        # 3. Création de la table etats
-        print("Création de la table etats...")
-        conn.execute("""
-        CREATE TABLE etats (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            identifiant_station TEXT NOT NULL,
-            actualisation_donnee TIMESTAMP NOT NULL,
-            station_en_fonctionnement INTEGER NOT NULL,
-            borne_paiement INTEGER NOT NULL,
-            retour_possible INTEGER NOT NULL,
-            FOREIGN KEY (identifiant_station) REFERENCES stations(identifiant_station)
+
+def _update_rollups(conn: sqlite3.Connection, releves: pd.DataFrame) -> None:
+    """
+    Reporte dans les tables d'occupation et de distribution tous les nouveaux relevés de l'import,
+    qu'ils aient changé ou non : moyennes et histogrammes restent ceux des instantanés complets,
+    pas des seuls changements.
+    """
+    conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS releves_nouveaux (
+            identifiant_station TEXT, actualisation_donnee TIMESTAMP, bornettes_libres INTEGER,
+            velos_disponibles INTEGER, velos_mecaniques INTEGER, velos_electriques INTEGER
         )
-        """)
+    """)
+    conn.executemany(
+        f"INSERT INTO {RELEVES_TABLE} VALUES ({', '.join('?' * len(RELEVES_COLUMNS))})",
+        _rows(releves[RELEVES_COLUMNS]),
+    )
+    for requete in list(UPDATE_ROLLUPS.values()) + UPDATE_DISTRIBUTIONS:
+        conn.execute(requete)
+    conn.execute(f"DELETE FROM {RELEVES_TABLE}")
+
+
+def _backfill_rollups(conn: sqlite3.Connection) -> None:
+    """Calcule les tables d'occupation depuis tout l'historique (bases créées avant ces tables)."""
+    if conn.execute("SELECT 1 FROM occupation_horaire LIMIT 1").fetchone():
+        return
+    with conn:
+        for table, fmt in ROLLUPS.items():
+            conn.execute(_rollup_sql(table, fmt, source="disponibilites"))
+
 
-        # 4. Création de la table disponibilites
-        print("Création de la table disponibilites...")
+def _backfill_distributions(conn: sqlite3.Connection) -> None:
+    """Calcule les tables de distribution depuis tout l'historique (bases créées avant ces tables)."""
+    if conn.execute("SELECT 1 FROM distribution_releves LIMIT 1").fetchone():
+        return
+    with conn:
+        for requete in _distribution_sql(source="disponibilites"):
+            conn.execute(requete)
+
+
+def _update_commune_aggregates(conn: sqlite3.Connection) -> None:
+    """Recalcule agregats_communes (une ligne par commune, à partir d'environ 1 500 stations)."""
+    conn.execute("DELETE FROM agregats_communes")
+    conn.execute(REFRESH_COMMUNES)
+
+
+def _backfill_commune_aggregates(conn: sqlite3.Connection) -> None:
+    """Calcule agregats_communes pour les bases créées avant cette table."""
+    if conn.execute("SELECT 1 FROM agregats_communes LIMIT 1").fetchone():
+        return
+    with conn:
+        _update_commune_aggregates(conn)
+
+
+def _backfill_rtree(conn: sqlite3.Connection) -> None:
+    """Remplit l'index spatial à partir des stations existantes (bases créées avant cet index)."""
+    if conn.execute("SELECT 1 FROM stations_rtree LIMIT 1").fetchone():
+        return
+    with conn:
         conn.execute("""
-        CREATE TABLE disponibilites (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            identifiant_station TEXT NOT NULL,
-            actualisation_donnee TIMESTAMP NOT NULL,
-            bornettes_libres INTEGER NOT NULL,
-            velos_disponibles INTEGER NOT NULL,
-            velos_mecaniques INTEGER NOT NULL,
-            velos_electriques INTEGER NOT NULL,
-            FOREIGN KEY (identifiant_station) REFERENCES stations(identifiant_station)
-        )
+            INSERT INTO stations_rtree (id, min_lat, max_lat, min_lon, max_lon)
+            SELECT rowid, latitude, latitude, longitude, longitude FROM stations
         """)
 
-        # Préparation et insertion des données dans la table stations
-        stations_data = df[[
-            'Identifiant station', 'Nom station', 'latitude', 'longitude',
-            'Capacité de la station', 'Code INSEE communes équipées'
-        ]].drop_duplicates()
-        
-        stations_data.columns = [
-            'identifiant_station', 'nom_station', 'latitude', 'longitude',
-            'capacite_station', 'code_insee'
-        ]
-        
-        stations_data.to_sql('stations', conn, if_exists='replace', index=False)
-
-        # Préparation et insertion des données dans la table etats
-        etats_data = df[[
-            'Identifiant station', 'Actualisation de la donnée',
-            'Station en fonctionnement', 'Borne de paiement disponible', 'Retour vélib possible'
-        ]]
-        
-        etats_data.columns = [
-            'identifiant_station', 'actualisation_donnee',
-            'station_en_fonctionnement', 'borne_paiement', 'retour_possible'
-        ]
-        
-        # Conversion des booléens en entiers
-        bool_columns = ['station_en_fonctionnement', 'borne_paiement', 'retour_possible']
-        for col in bool_columns:
-            etats_data[col] = etats_data[col].astype(int)
-            
-        etats_data.to_sql('etats', conn, if_exists='replace', index=False)
-
-        # Préparation et insertion des données dans la table disponibilites
-        disponibilites_data = df[[
-            'Identifiant station', 'Actualisation de la donnée',
-            'Nombre bornettes libres', 'Nombre total vélos disponibles',
-            'Vélos mécaniques disponibles', 'Vélos électriques disponibles'
-        ]]
-        
-        disponibilites_data.columns = [
-            'identifiant_station', 'actualisation_donnee',
-            'bornettes_libres', 'velos_disponibles',
-            'velos_mecaniques', 'velos_electriques'
-        ]
-        
-        disponibilites_data.to_sql('disponibilites', conn, if_exists='replace', index=False)
-
-        # Création des index pour optimiser les performances
-        print("Création des index...")
-        conn.execute("CREATE INDEX idx_stations_commune ON stations(code_insee)")
-        conn.execute("CREATE INDEX idx_etats_station ON etats(identifiant_station)")
-        conn.execute("CREATE INDEX idx_etats_date ON etats(actualisation_donnee)")
-        conn.execute("CREATE INDEX idx_disponibilites_station ON disponibilites(identifiant_station)")
-        conn.execute("CREATE INDEX idx_disponibilites_date ON disponibilites(actualisation_donnee)")
-
-        print(f"Base de données créée avec succès : {db_path}")
-        print(f"Nombre de stations importées : {len(stations_data)}")
-        print(f"Nombre de communes : {len(communes_df)}")
-        print(f"Nombre d'états enregistrés : {len(etats_data)}")
-        print(f"Nombre de disponibilités enregistrées : {len(disponibilites_data)}")
+
+def create_schema(conn: sqlite3.Connection) -> None:
+    """Crée les tables et index manquants (les anciennes bases sans historique sont recréées)."""
+    if _is_legacy_schema(conn):
+        print("Ancien schéma détecté : les tables sont recréées.")
+        for table in TABLES:
+            conn.execute(f"DROP TABLE IF EXISTS {table}")
+    conn.executescript(SCHEMA)
+    _backfill_latest(conn)
+    _backfill_rollups(conn)
+    _backfill_distributions(conn)
+    _backfill_rtree(conn)
+    _backfill_commune_aggregates(conn)
+
+
+def read_latest_state(conn: sqlite3.Connection) -> pd.DataFrame:
+    """
+    État courant de chaque station (une ligne par station), quelle que soit la taille de l'historique.
+    """
+    return pd.read_sql_query("""
+        SELECT
+            s.identifiant_station,
+            s.nom_station,
+            s.latitude,
+            s.longitude,
+            s.capacite_station,
+            s.code_insee,
+            l.actualisation_donnee,
+            l.bornettes_libres,
+            l.velos_disponibles,
+            l.velos_mecaniques,
+            l.velos_electriques,
+            l.station_en_fonctionnement,
+            l.borne_paiement,
+            l.retour_possible
+        FROM latest_disponibilites AS l
+        JOIN stations AS s ON s.identifiant_station = l.identifiant_station
+    """, conn)
+
+
+def read_commune_aggregates(conn: sqlite3.Connection) -> pd.DataFrame:
+    """
+    Totaux par commune (table agregats_communes) avec le nom de la commune
+    et le taux d'occupation (vélos disponibles / capacité, en %).
+    """
+    return pd.read_sql_query("""
+        SELECT
+            a.code_insee,
+            COALESCE(c.nom_commune, a.code_insee) AS nom_commune,
+            a.nb_stations,
+            a.nb_non_fonctionnelles,
+            a.capacite_station,
+            a.bornettes_libres,
+            a.velos_disponibles,
+            a.velos_mecaniques,
+            a.velos_electriques,
+            CASE WHEN a.capacite_station > 0
+                THEN MIN(a.velos_disponibles * 100.0 / a.capacite_station, 100) END AS taux_occupation,
+            a.actualisation_donnee
+        FROM agregats_communes AS a
+        LEFT JOIN communes AS c ON c.code_insee = a.code_insee
+        ORDER BY a.capacite_station DESC
+    """, conn)
+
+
+def read_occupation_series(conn: sqlite3.Connection, table: str = "occupation_horaire") -> pd.DataFrame:
+    """
+    Évolution de l'occupation sur l'ensemble du réseau, une ligne par période,
+    lue depuis une table d'agrégats (quelques milliers de lignes au plus).
+
+    Colonnes : periode, moyennes par station des vélos disponibles / électriques /
+    mécaniques, et part des relevés où la station est vide ou pleine (en %).
+    """
+    if table not in ROLLUPS:
+        raise ValueError(f"Table d'agrégats inconnue : {table}")
+    moyennes = ",\n".join(
+        f"            SUM({col}_somme) * 1.0 / SUM(nb_releves) AS {col}" for col in ROLLUP_METRICS
+    )
+    return pd.read_sql_query(f"""
+        SELECT
+            periode,
+{moyennes},
+            SUM(nb_vide) * 100.0 / SUM(nb_releves) AS part_vide,
+            SUM(nb_pleine) * 100.0 / SUM(nb_releves) AS part_pleine
+        FROM {table}
+        GROUP BY periode
+        ORDER BY periode
+    """, conn)
+
+
+def split_coordinates(df: pd.DataFrame) -> pd.DataFrame:
+    """Ajoute les colonnes latitude et longitude à partir de « Coordonnées géographiques » ("(lat, lon)")."""
+    df[['latitude', 'longitude']] = df['Coordonnées géographiques'].astype(str).str.strip('()').str.split(',', expand=True).astype(float)
+    return df
+
+
+def read_clean_data(path: str) -> pd.DataFrame:
+    """
+    Lit le fichier nettoyé. Les fichiers Parquet/Arrow sont déjà typés (latitude
+    et longitude séparées) ; le CSV est analysé et ses coordonnées découpées.
+    """
+    if not path.endswith(".csv"):
+        return read_clean_columnar(path)
+
+    df = pd.read_csv(path, dtype={
+        'Identifiant station': str,
+        'Code INSEE communes équipées': str
+    })
+    return split_coordinates(df)
+
+
+def ingest_snapshot(conn: sqlite3.Connection, df: pd.DataFrame) -> dict:
+    """
+    Importe un instantané nettoyé dans une seule transaction.
+
+    Les communes et stations sont mises à jour (upsert). Les relevés plus récents que le dernier
+    état connu de leur station sont tous reportés dans les agrégats horaires et journaliers
+    et dans les distributions ;
+    seuls ceux dont l'état a changé sont ajoutés aux tables etats et disponibilites et au journal
+    changements. Les totaux par commune sont recalculés.
+
+    Returns:
+        dict: nombre de lignes traitées ou ajoutées par table
+    """
+    # Extraction des communes uniques
+    if 'Code INSEE communes équipées' in df.columns and 'Nom communes équipées' in df.columns:
+        communes_df = df[['Code INSEE communes équipées', 'Nom communes équipées']].dropna().drop_duplicates(
+            subset='Code INSEE communes équipées', keep='last')
+    else:
+        communes_df = pd.DataFrame(columns=['Code INSEE communes équipées', 'Nom communes équipées'])
+
+    # Préparation des stations (la dernière ligne d'une station l'emporte)
+    stations_data = df.reindex(columns=[
+        'Identifiant station', 'Nom station', 'latitude', 'longitude',
+        'Capacité de la station', 'Code INSEE communes équipées'
+    ]).drop_duplicates(subset='Identifiant station', keep='last')
+
+    # Dates typées (Parquet/Arrow) : même texte que dans le CSV nettoyé
+    if pd.api.types.is_datetime64_any_dtype(df['Actualisation de la donnée']):
+        df = df.assign(**{'Actualisation de la donnée': df['Actualisation de la donnée'].astype(str)})
+
+    # Relevés de l'instantané, colonnes dans l'ordre de latest_disponibilites
+    releves = df[[
+        'Identifiant station', 'Actualisation de la donnée',
+        'Nombre bornettes libres', 'Nombre total vélos disponibles',
+        'Vélos mécaniques disponibles', 'Vélos électriques disponibles',
+        'Station en fonctionnement', 'Borne de paiement disponible', 'Retour vélib possible'
+    ]].set_axis(LATEST_COLUMNS, axis=1)
+    # Conversion des booléens en entiers
+    releves = releves.astype({col: int for col in LATEST_COLUMNS[6:]})
+
+    with conn:
+        conn.executemany("""
+            INSERT INTO communes (code_insee, nom_commune) VALUES (?, ?)
+            ON CONFLICT(code_insee) DO UPDATE SET nom_commune = excluded.nom_commune
+        """, _rows(communes_df))
+
+        conn.executemany("""
+            INSERT INTO stations (identifiant_station, nom_station, latitude, longitude, capacite_station, code_insee)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(identifiant_station) DO UPDATE SET
+                nom_station = excluded.nom_station,
+                latitude = excluded.latitude,
+                longitude = excluded.longitude,
+                capacite_station = excluded.capacite_station,
+                code_insee = excluded.code_insee
+        """, _rows(stations_data))
+
+        # Capture des changements : comparaison avec le dernier état connu de chaque station
+        precedents = pd.read_sql_query(f"SELECT {', '.join(LATEST_COLUMNS)} FROM latest_disponibilites", conn)
+        nouveaux = diff_snapshot(releves, precedents)
+        changements = nouveaux[nouveaux["champs"] != ""]
+
+        etats_ajoutes = conn.executemany("""
+            INSERT OR IGNORE INTO etats (identifiant_station, actualisation_donnee,
+                station_en_fonctionnement, borne_paiement, retour_possible)
+            VALUES (?, ?, ?, ?, ?)
+        """, _rows(changements[LATEST_COLUMNS[:2] + LATEST_COLUMNS[6:]])).rowcount
+
+        disponibilites_ajoutees = conn.executemany("""
+            INSERT OR IGNORE INTO disponibilites (identifiant_station, actualisation_donnee,
+                bornettes_libres, velos_disponibles, velos_mecaniques, velos_electriques)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, _rows(changements[LATEST_COLUMNS[:6]])).rowcount
+
+        changements_ajoutes = conn.executemany("""
+            INSERT OR IGNORE INTO changements (identifiant_station, actualisation_donnee, champs)
+            VALUES (?, ?, ?)
+        """, _rows(changements[["identifiant_station", "actualisation_donnee", "champs"]])).rowcount
+
+        # Dernier relevé de chaque station (nouveaux est trié par station et par date)
+        latest_data = nouveaux.drop_duplicates(subset="identifiant_station", keep="last")
+        conn.executemany(UPSERT_LATEST, _rows(latest_data[LATEST_COLUMNS]))
+        # Tous les nouveaux relevés, modifiés ou non, sont agrégés
+        _update_rollups(conn, nouveaux)
+        _update_commune_aggregates(conn)
+
+    return {
+        "communes": len(communes_df),
+        "stations": len(stations_data),
+        "releves": len(nouveaux),
+        "etats": etats_ajoutes,
+        "disponibilites": disponibilites_ajoutees,
+        "changements": changements_ajoutes,
+    }
+
+
+def _update_database(path: str, df: pd.DataFrame) -> None:
+    """Crée le schéma si besoin et importe l'instantané dans la base située à path."""
+    conn = connect(path)
+
+    try:
+        create_schema(conn)
+        counts = ingest_snapshot(conn, df)
+        checkpoint(conn)
+        for table in ("etats", "disponibilites", "changements"):
+            DB_ROWS_INSERTED.inc(counts[table], table=table)
+
+        print(f"Base de données à jour : {db_path}")
+        print(f"Nombre de stations importées : {counts['stations']}")
+        print(f"Nombre de communes : {counts['communes']}")
+        print(f"Nouveaux relevés : {counts['releves']}, dont {counts['changements']} changement(s)")
+        print(f"Nouveaux états enregistrés : {counts['etats']}")
+        print(f"Nouvelles disponibilités enregistrées : {counts['disponibilites']}")
 
     except Exception as e:
         print(f"Erreur lors de la création de la base de données : {str(e)}")
@@ -148,5 +603,30 @@ def create_velib_database():
     finally:
         conn.close()
 
+
+def create_velib_database(incremental: bool = True):
+    """
+    Alimente la base SQLite à partir du fichier nettoyé.
+
+    Args:
+        incremental (bool): si True (par défaut), ajoute l'instantané à l'historique existant
+            dans une transaction ; si False, reconstruit la base dans un fichier temporaire
+            dont le contenu remplace l'ancienne une fois complet.
+    """
+    # Lecture du fichier nettoyé (CSV, Parquet ou Arrow selon clean_format)
+    cleandata_path = clean_output_path()
+    print(f"Lecture du fichier nettoyé : {cleandata_path}")
+    df = read_clean_data(cleandata_path)
+
+    if incremental:
+        print("Ouverture de la base de données...")
+        _update_database(db_path, df)
+    else:
+        print("Reconstruction complète de la base de données...")
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(db_path)) as tmp_dir:
+            tmp_path = os.path.join(tmp_dir, os.path.basename(db_path))
+            _update_database(tmp_path, df)
+            replace_database(tmp_path, db_path)
+
 if __name__ == "__main__":
     create_velib_database()
@@ -1,221 +1,513 @@
 import os
-import sqlite3
-from typing import Optional
+from typing import Dict, Optional
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from config import project_root, db_path
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from src.utils.atomic_write import atomic_path
+from src.utils.columnar import read_snapshot
+from src.utils.db import get_read_connection
+from src.utils.Create_DataBase import ROLLUP_METRICS, ROLLUPS, read_occupation_series
+from config import assets_dir, scatter_mode
 
+# Figures produites par build_figures (une page et un fichier HTML chacune)
+FIGURE_NAMES = [
+    "hist_capacite_station",
+    "hist_velos_disponibles",
+    "hist_velos_electriques",
+    "hist_velos_mecaniques",
+    "scatter_capacite_vs_velos_disponibles",
+    "hist_taux_occupation_moyen",
+    "bar_stations_non_fonctionnelles",
+    "line_occupation_horaire",
+    "line_stations_vides_pleines",
+]
+HISTOGRAM_FILES = [f"{name}.html" for name in FIGURE_NAMES]
 
+# Colonnes de disponibilites représentées en histogramme
+DISPONIBILITE_COLUMNS = ["velos_disponibles", "velos_electriques", "velos_mecaniques"]
+NBINS = 40
+# plotly.js copié dans assets/vendor (ignoré par l'injection automatique des assets par Dash)
+PLOTLYJS_NAME = "plotly-{version}.min.js"
+# Nuage de densité : nombre maximal de cases, et seuil de passage au rendu WebGL
+MAX_DENSITY_CELLS = 5000
+SCATTERGL_THRESHOLD = 1000
 
-    
-def create_histograms(output_dir: Optional[str] = None) -> None:
-    """
-    Génère les histogrammes  à partir des données de la base SQLite
-    et enregistre les graphiques au format HTML .
 
-    Args:
-        output_dir: Dossier pour les fichiers HTML. 
+def vendor_plotlyjs() -> str:
+    """
+    Copie une seule fois plotly.js (fourni par le paquet plotly, sans accès réseau) dans
+    assets/vendor, sous un nom contenant sa version, et renvoie l'URL à utiliser dans les graphiques.
     """
+    nom = PLOTLYJS_NAME.format(version=get_plotlyjs_version())
+    path = os.path.join(assets_dir, "vendor", nom)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with atomic_path(path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(get_plotlyjs())
+    return f"/assets/vendor/{nom}"
 
-    if not os.path.exists(db_path):
-        raise FileNotFoundError(
-            f"Base de données introuvable : {db_path}. "
-            "Exécutez d'abord le pipeline (main.py) pour la générer."
-        )
 
-    output_dir = output_dir or os.path.join(project_root, "assets")
-    os.makedirs(output_dir, exist_ok=True)
+def write_figure(fig, target_path: str, plotlyjs_url: str) -> None:
+    """
+    Écrit une figure Plotly en HTML de façon atomique (jamais de fichier partiel servi).
+    Le fichier ne contient que la figure ; plotly.js est chargé depuis plotlyjs_url, commun à tous les graphiques.
+    """
+    with atomic_path(target_path) as tmp_path:
+        fig.write_html(tmp_path, include_plotlyjs=plotlyjs_url)
 
-    with sqlite3.connect(db_path) as conn:
-        stations_df = pd.read_sql_query(
+
+def _load_aggregates_sqlite() -> Dict[str, pd.DataFrame]:
+    """
+    Agrégats des graphiques calculés dans SQLite : seuls les comptages par valeur
+    (quelques dizaines de lignes) sont lus, quelle que soit la taille de l'historique.
+    """
+    # Connexion de lecture partagée par le thread (base en WAL, lecture jamais bloquée)
+    conn = get_read_connection()
+    aggregats = {
+        "capacite_station": pd.read_sql_query(
             """
-            SELECT identifiant_station, nom_station, capacite_station
+            SELECT capacite_station AS valeur, COUNT(*) AS nombre
             FROM stations
             WHERE capacite_station IS NOT NULL
+            GROUP BY capacite_station
             """,
             conn,
-        )
-        disponibilites_df = pd.read_sql_query(
+        ),
+    }
+    # Comptages de tous les relevés (l'historique ne garde que les changements d'état)
+    for column in DISPONIBILITE_COLUMNS:
+        aggregats[column] = pd.read_sql_query(
             """
-            SELECT
-                identifiant_station,
-                velos_disponibles,
-                velos_mecaniques,
-                velos_electriques,
-                bornettes_libres
-            FROM disponibilites
-            """,
-            conn,
-        )
-        etats_df = pd.read_sql_query(
-            """
-            SELECT identifiant_station, station_en_fonctionnement
-            FROM etats
+            SELECT valeur, nb_releves AS nombre
+            FROM distribution_releves
+            WHERE colonne = ?
             """,
             conn,
+            params=(column,),
         )
+    aggregats["capacite_vs_velos"] = pd.read_sql_query(
+        """
+        SELECT capacite_station, velos_disponibles, nb_releves AS nombre
+        FROM distribution_capacite_velos
+        """,
+        conn,
+    )
+    # Moyenne de tous les relevés (l'historique ne garde que les changements d'état)
+    aggregats["taux_occupation_moyen"] = pd.read_sql_query(
+        """
+        SELECT
+            o.identifiant_station,
+            SUM(o.velos_disponibles_somme) * 100.0 / (SUM(o.nb_releves) * s.capacite_station) AS taux_occupation_pct
+        FROM occupation_journaliere AS o
+        JOIN stations AS s ON s.identifiant_station = o.identifiant_station
+        WHERE s.capacite_station > 0
+        GROUP BY o.identifiant_station
+        """,
+        conn,
+    )
+    # Statut courant : une ligne par station, quelle que soit la taille de l'historique
+    aggregats["statuts"] = pd.read_sql_query(
+        """
+        SELECT station_en_fonctionnement, COUNT(*) AS nombre
+        FROM latest_disponibilites
+        WHERE station_en_fonctionnement IS NOT NULL
+        GROUP BY station_en_fonctionnement
+        """,
+        conn,
+    )
+    # Évolutions lues dans les tables d'occupation horaire / journalière (une ligne par période)
+    aggregats["serie_horaire"] = read_occupation_series(conn, "occupation_horaire")
+    aggregats["serie_journaliere"] = read_occupation_series(conn, "occupation_journaliere")
+    return aggregats
+
 
-    stations_df["capacite_station"] = pd.to_numeric(
-        stations_df["capacite_station"], errors="coerce"
+def _occupation_series(disponibilites_df: pd.DataFrame, format_periode: str) -> pd.DataFrame:
+    """Équivalent pandas de read_occupation_series pour un instantané."""
+    df = disponibilites_df.assign(
+        periode=pd.to_datetime(disponibilites_df["actualisation_donnee"], utc=True).dt.strftime(format_periode),
+        part_vide=(disponibilites_df["velos_disponibles"] == 0) * 100.0,
+        part_pleine=(disponibilites_df["bornettes_libres"] == 0) * 100.0,
+    )
+    return (
+        df.groupby("periode", as_index=False)[ROLLUP_METRICS + ["part_vide", "part_pleine"]]
+        .mean()
+        .sort_values("periode")
     )
-    stations_df = stations_df.dropna(subset=["capacite_station"])
 
-    for column in [
-        "velos_disponibles",
-        "velos_mecaniques",
-        "velos_electriques",
-        "bornettes_libres",
-    ]:
-        disponibilites_df[column] = pd.to_numeric(
-            disponibilites_df[column], errors="coerce"
-        )
-    disponibilites_df.dropna(how="all", inplace=True)
-    etats_df["station_en_fonctionnement"] = pd.to_numeric(
-        etats_df["station_en_fonctionnement"], errors="coerce"
-    )
-
-    hist_specs = [
-        {
-            "df": stations_df,
-            "column": "capacite_station",
-            "title": "Distribution des capacités des stations",
-            "file": "hist_capacite_station.html",
-            "x_title": "Capacité de la station (nombre de bornettes)",
-            "y_title": "Nombre de stations",
-        },
-        {
-            "df": disponibilites_df,
-            "column": "velos_disponibles",
-            "title": "Distribution du total de vélos disponibles",
-            "file": "hist_velos_disponibles.html",
-            "x_title": "Nombre de vélos disponibles",
-            "y_title": "Nombre de velo dans une station",
-        },
-        {
-            "df": disponibilites_df,
-            "column": "velos_electriques",
-            "title": "Distribution des vélos électriques disponibles",
-            "file": "hist_velos_electriques.html",
-            "x_title": "Nombre de vélos électriques disponibles",
-            "y_title": "Nombre de velo dans une station",
-        },
-        {
-            "df": disponibilites_df,
-            "column": "velos_mecaniques",
-            "title": "Distribution des vélos mécaniques disponibles",
-            "file": "hist_velos_mecaniques.html",
-            "x_title": "Nombre de vélos mécaniques disponibles",
-            "y_title": "Nombre de velo dans une station",
-        },
-    ]
-
-    for spec in hist_specs:
-        clean_df = spec["df"].dropna(subset=[spec["column"]])
-        if clean_df.empty:
-            print(f"Aucune donnée disponible pour {spec['column']}, histogramme ignoré.")
-            continue
-
-        fig = px.histogram(
-            clean_df,
-            x=spec["column"],
-            nbins=40,
-            title=spec["title"],
+
+def _value_counts(series: pd.Series) -> pd.DataFrame:
+    """Comptage par valeur (colonnes valeur, nombre), comme un GROUP BY SQL."""
+    counts = pd.to_numeric(series, errors="coerce").dropna().value_counts(sort=False)
+    return counts.rename_axis("valeur").reset_index(name="nombre")
+
+
+def _load_aggregates_snapshot(snapshot_path: str) -> Dict[str, pd.DataFrame]:
+    """Mêmes agrégats, calculés depuis l'instantané Parquet/Arrow (projeté en mémoire, sans analyse de texte)."""
+    stations_df = read_snapshot(
+        ["identifiant_station", "capacite_station"], snapshot_path
+    )
+    disponibilites_df = read_snapshot(
+        ["identifiant_station", "actualisation_donnee", "bornettes_libres"] + DISPONIBILITE_COLUMNS,
+        snapshot_path,
+    )
+    etats_df = read_snapshot(
+        ["identifiant_station", "station_en_fonctionnement"], snapshot_path
+    )
+
+    aggregats = {"capacite_station": _value_counts(stations_df["capacite_station"])}
+    for column in DISPONIBILITE_COLUMNS:
+        aggregats[column] = _value_counts(disponibilites_df[column])
+
+    cap_df = disponibilites_df.dropna(subset=["velos_disponibles"]).merge(
+        stations_df[stations_df["capacite_station"] > 0], on="identifiant_station", how="inner"
+    )
+    aggregats["capacite_vs_velos"] = (
+        cap_df.groupby(["capacite_station", "velos_disponibles"])
+        .size()
+        .reset_index(name="nombre")
+    )
+    aggregats["taux_occupation_moyen"] = (
+        cap_df.assign(taux_occupation_pct=cap_df["velos_disponibles"] * 100.0 / cap_df["capacite_station"])
+        .groupby("identifiant_station", as_index=False)["taux_occupation_pct"]
+        .mean()
+    )
+    aggregats["statuts"] = (
+        etats_df["station_en_fonctionnement"].astype(int)
+        .value_counts(sort=False)
+        .rename_axis("station_en_fonctionnement")
+        .reset_index(name="nombre")
+    )
+    aggregats["serie_horaire"] = _occupation_series(disponibilites_df, ROLLUPS["occupation_horaire"])
+    aggregats["serie_journaliere"] = _occupation_series(disponibilites_df, ROLLUPS["occupation_journaliere"])
+    return aggregats
+
+
+def load_aggregates(snapshot_path: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Charge les agrégats utilisés par les graphiques (base SQLite ou instantané Parquet/Arrow)."""
+    if snapshot_path:
+        return _load_aggregates_snapshot(snapshot_path)
+    return _load_aggregates_sqlite()
+
+
+def _bin_counts(valeurs, nombres=None, nbins: int = NBINS, entier: bool = True):
+    """
+    Regroupe des comptages par valeur en nbins classes de même largeur.
+
+    Pour des valeurs entières (nombre de vélos, de bornettes), les classes ont une
+    largeur entière et sont centrées sur les valeurs, sans classe vide intercalée.
+
+    Returns:
+        tuple: centres, largeurs et effectifs des classes (tableaux NumPy)
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    if entier:
+        vmin, vmax = valeurs.min(), valeurs.max()
+        largeur = max(1.0, np.ceil((vmax - vmin + 1) / nbins))
+        n_classes = int(np.ceil((vmax - vmin + 1) / largeur))
+        bornes = vmin - 0.5 + largeur * np.arange(n_classes + 1)
+    else:
+        bornes = np.histogram_bin_edges(valeurs, bins=nbins)
+    effectifs, bornes = np.histogram(valeurs, bins=bornes, weights=nombres)
+    return (bornes[:-1] + bornes[1:]) / 2, np.diff(bornes), effectifs
+
+
+def _histogram_figure(centres, largeurs, effectifs, title: str, x_title: str, y_title: str) -> go.Figure:
+    """Histogramme Plotly à partir de classes déjà comptées (barres jointives, bargap 0.05)."""
+    fig = go.Figure(
+        go.Bar(
+            x=centres,
+            y=effectifs,
+            width=largeurs * 0.95,
             opacity=0.85,
-            template="plotly_white",
+            hovertemplate="%{x}<br>%{y}<extra></extra>",
         )
-        fig.update_layout(
-            bargap=0.05,
-            xaxis_title=spec["x_title"],
-            yaxis_title=spec["y_title"],
+    )
+    fig.update_layout(
+        title=title,
+        template="plotly_white",
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+    )
+    return fig
+
+
+def _coarsen_grid(pairs_df: pd.DataFrame, max_cells: int = MAX_DENSITY_CELLS) -> pd.DataFrame:
+    """
+    Regroupe la grille (capacité × vélos disponibles) en cases plus larges tant
+    qu'elle dépasse max_cells cases, pour borner la taille de la figure.
+    """
+    if len(pairs_df) <= max_cells:
+        return pairs_df
+    pas = int(np.ceil(np.sqrt(len(pairs_df) / max_cells)))
+    while True:
+        grossie = (
+            pairs_df.assign(
+                capacite_station=(pairs_df["capacite_station"] // pas) * pas + (pas - 1) / 2,
+                velos_disponibles=(pairs_df["velos_disponibles"] // pas) * pas + (pas - 1) / 2,
+            )
+            .groupby(["capacite_station", "velos_disponibles"], as_index=False)["nombre"]
+            .sum()
         )
-        target_path = os.path.join(output_dir, spec["file"])
-        fig.write_html(target_path, include_plotlyjs="cdn")
-        print(f"Histogramme sauvegardé : {target_path}")
-
-    disponibilites_cap_df = disponibilites_df.dropna(subset=["velos_disponibles"]).merge(
-        stations_df, on="identifiant_station", how="inner"
-    )
-    disponibilites_cap_df = disponibilites_cap_df[
-        disponibilites_cap_df["capacite_station"] > 0
-    ]
-
-    if not disponibilites_cap_df.empty:
-        scatter_fig = px.scatter(
-            disponibilites_cap_df,
-            x="capacite_station",
-            y="velos_disponibles",
-            opacity=0.7,
-            title="Capacité vs vélos disponibles",
-            labels={
-                "capacite_station": "Capacité de la station",
-                "velos_disponibles": "Vélos disponibles",
-            },
+        if len(grossie) <= max_cells:
+            return grossie
+        pas += 1
+
+
+def _density_figure(pairs_df: pd.DataFrame, mode: str = "marqueurs") -> go.Figure:
+    """
+    Nuage capacité vs vélos disponibles en densité : une case par couple de valeurs,
+    avec le nombre de relevés, au lieu d'un point par relevé.
+
+    Args:
+        pairs_df: Comptages (capacite_station, velos_disponibles, nombre)
+        mode: "heatmap", ou "marqueurs" dont la taille suit le nombre de relevés
+            (rendu WebGL au-delà de SCATTERGL_THRESHOLD cases)
+    """
+    grille = _coarsen_grid(pairs_df)
+    labels = {
+        "xaxis_title": "Capacité de la station",
+        "yaxis_title": "Vélos disponibles",
+    }
+
+    if mode == "heatmap":
+        matrice = grille.pivot(index="velos_disponibles", columns="capacite_station", values="nombre")
+        trace = go.Heatmap(
+            x=matrice.columns,
+            y=matrice.index,
+            z=matrice.to_numpy(),
+            colorscale="Viridis",
+            colorbar={"title": "Relevés"},
+            hovertemplate="Capacité : %{x}<br>Vélos disponibles : %{y}<br>Relevés : %{z}<extra></extra>",
         )
-        scatter_path = os.path.join(
-            output_dir, "scatter_capacite_vs_velos_disponibles.html"
+    elif mode == "marqueurs":
+        nombres = grille["nombre"].to_numpy(dtype=float)
+        tailles = 4 + 16 * np.sqrt(nombres / nombres.max())
+        scatter = go.Scattergl if len(grille) > SCATTERGL_THRESHOLD else go.Scatter
+        trace = scatter(
+            x=grille["capacite_station"],
+            y=grille["velos_disponibles"],
+            mode="markers",
+            marker={
+                "size": tailles,
+                "color": nombres,
+                "colorscale": "Viridis",
+                "colorbar": {"title": "Relevés"},
+                "opacity": 0.7,
+            },
+            customdata=nombres,
+            hovertemplate="Capacité : %{x}<br>Vélos disponibles : %{y}<br>Relevés : %{customdata}<extra></extra>",
         )
-        scatter_fig.write_html(scatter_path, include_plotlyjs="cdn")
-        print(f"Graphique sauvegardé : {scatter_path}")
+    else:
+        raise ValueError(f"Mode de nuage inconnu : {mode}")
+
+    fig = go.Figure(trace)
+    fig.update_layout(title="Capacité vs vélos disponibles", template="plotly_white", **labels)
+    return fig
+
+
+# Histogrammes des comptages par valeur (une figure par colonne agrégée)
+HIST_SPECS = {
+    "hist_capacite_station": {
+        "column": "capacite_station",
+        "title": "Distribution des capacités des stations",
+        "x_title": "Capacité de la station (nombre de bornettes)",
+        "y_title": "Nombre de stations",
+    },
+    "hist_velos_disponibles": {
+        "column": "velos_disponibles",
+        "title": "Distribution du total de vélos disponibles",
+        "x_title": "Nombre de vélos disponibles",
+        "y_title": "Nombre de velo dans une station",
+    },
+    "hist_velos_electriques": {
+        "column": "velos_electriques",
+        "title": "Distribution des vélos électriques disponibles",
+        "x_title": "Nombre de vélos électriques disponibles",
+        "y_title": "Nombre de velo dans une station",
+    },
+    "hist_velos_mecaniques": {
+        "column": "velos_mecaniques",
+        "title": "Distribution des vélos mécaniques disponibles",
+        "x_title": "Nombre de vélos mécaniques disponibles",
+        "y_title": "Nombre de velo dans une station",
+    },
+}
+
+
+def _build_count_histogram(aggregats, spec) -> Optional[go.Figure]:
+    counts_df = aggregats[spec["column"]]
+    if counts_df.empty:
+        print(f"Aucune donnée disponible pour {spec['column']}, histogramme ignoré.")
+        return None
+
+    centres, largeurs, effectifs = _bin_counts(counts_df["valeur"], counts_df["nombre"])
+    return _histogram_figure(centres, largeurs, effectifs, spec["title"], spec["x_title"], spec["y_title"])
+
+
+def _build_scatter(aggregats, scatter_mode) -> Optional[go.Figure]:
+    pairs_df = aggregats["capacite_vs_velos"]
+    if pairs_df.empty:
+        return None
+    return _density_figure(pairs_df, scatter_mode)
 
-        occupation_df = disponibilites_cap_df.copy()
-        occupation_df["taux_occupation"] = (
-            occupation_df["velos_disponibles"] / occupation_df["capacite_station"]
-        )
-        occupation_df = occupation_df.dropna(subset=["taux_occupation"])
-
-        if not occupation_df.empty:
-            occupation_mean = (
-                occupation_df.groupby(
-                    ["identifiant_station", "nom_station"], as_index=False
-                )["taux_occupation"]
-                .mean()
-                .assign(taux_occupation_pct=lambda df: df["taux_occupation"] * 100)
-            )
-            occupation_fig = px.histogram(
-                occupation_mean,
-                x="taux_occupation_pct",
-                nbins=40,
-                title="Distribution du taux d’occupation moyen",
-                labels={"taux_occupation_pct": "Taux d’occupation moyen (%)"},
-                template="plotly_white",
-            )
-            occupation_fig.update_layout(
-                bargap=0.05,
-                yaxis_title="Nombre de stations",
-            )
-            occupation_path = os.path.join(
-                output_dir, "hist_taux_occupation_moyen.html"
-            )
-            occupation_fig.write_html(occupation_path, include_plotlyjs="cdn")
-            print(f"Histogramme sauvegardé : {occupation_path}")
 
+def _build_occupation(aggregats) -> Optional[go.Figure]:
+    occupation_df = aggregats["taux_occupation_moyen"].dropna(subset=["taux_occupation_pct"])
+    if occupation_df.empty:
+        return None
+    centres, largeurs, effectifs = _bin_counts(occupation_df["taux_occupation_pct"], entier=False)
+    return _histogram_figure(
+        centres, largeurs, effectifs,
+        "Distribution du taux d’occupation moyen",
+        "Taux d’occupation moyen (%)",
+        "Nombre de stations",
+    )
+
+
+def _build_status(aggregats) -> Optional[go.Figure]:
     status_counts = (
-        etats_df.dropna(subset=["station_en_fonctionnement"])
+        aggregats["statuts"]
         .assign(
             statut=lambda df: df["station_en_fonctionnement"].map(
                 {1: "Stations en fonctionnement", 0: "Stations non fonctionnelles"}
             )
         )
         .dropna(subset=["statut"])
-        .groupby("statut")
-        .size()
-        .reset_index(name="nombre")
+    )
+    if status_counts.empty:
+        return None
+    return px.bar(
+        status_counts,
+        x="statut",
+        y="nombre",
+        title="Répartition des stations en fonctionnement",
+        labels={"statut": "Statut", "nombre": "Nombre de stations"},
+        text_auto=True,
     )
 
-    if not status_counts.empty:
-        status_fig = px.bar(
-            status_counts,
-            x="statut",
-            y="nombre",
-            title="Répartition des stations en fonctionnement",
-            labels={"statut": "Statut", "nombre": "Nombre d’observations"},
-            text_auto=True,
-        )
-        status_path = os.path.join(
-            output_dir, "bar_stations_non_fonctionnelles.html"
-        )
-        status_fig.write_html(status_path, include_plotlyjs="cdn")
-        print(f"Graphique sauvegardé : {status_path}")
+
+def _build_hourly(aggregats) -> Optional[go.Figure]:
+    serie_horaire = aggregats["serie_horaire"]
+    if serie_horaire.empty:
+        return None
+    return px.line(
+        serie_horaire,
+        x="periode",
+        y=ROLLUP_METRICS,
+        markers=True,
+        title="Évolution horaire du nombre moyen de vélos par station",
+        labels={"periode": "Heure (UTC)", "value": "Vélos par station", "variable": "Type"},
+        template="plotly_white",
+    )
+
+
+def _build_empty_full(aggregats) -> Optional[go.Figure]:
+    serie_journaliere = aggregats["serie_journaliere"]
+    if serie_journaliere.empty:
+        return None
+    return px.line(
+        serie_journaliere.rename(columns={"part_vide": "Station vide", "part_pleine": "Station pleine"}),
+        x="periode",
+        y=["Station vide", "Station pleine"],
+        markers=True,
+        title="Part des relevés où les stations sont vides ou pleines, par jour",
+        labels={"periode": "Jour", "value": "Part des relevés (%)", "variable": "État"},
+        template="plotly_white",
+    )
+
+
+# Agrégats utilisés par chaque figure (seuls ceux-ci sont transmis à un processus de génération)
+FIGURE_INPUTS = {
+    **{name: [spec["column"]] for name, spec in HIST_SPECS.items()},
+    "scatter_capacite_vs_velos_disponibles": ["capacite_vs_velos"],
+    "hist_taux_occupation_moyen": ["taux_occupation_moyen"],
+    "bar_stations_non_fonctionnelles": ["statuts"],
+    "line_occupation_horaire": ["serie_horaire"],
+    "line_stations_vides_pleines": ["serie_journaliere"],
+}
+
+
+def build_figure(name: str, aggregats: Dict[str, pd.DataFrame], scatter_mode: str = scatter_mode) -> Optional[go.Figure]:
+    """
+    Construit une figure du dashboard (voir FIGURE_NAMES) à partir des agrégats.
+
+    Returns:
+        go.Figure, ou None si la figure n'a aucune donnée
+    """
+    if name in HIST_SPECS:
+        return _build_count_histogram(aggregats, HIST_SPECS[name])
+    if name == "scatter_capacite_vs_velos_disponibles":
+        return _build_scatter(aggregats, scatter_mode)
+    if name == "hist_taux_occupation_moyen":
+        return _build_occupation(aggregats)
+    if name == "bar_stations_non_fonctionnelles":
+        return _build_status(aggregats)
+    if name == "line_occupation_horaire":
+        return _build_hourly(aggregats)
+    if name == "line_stations_vides_pleines":
+        return _build_empty_full(aggregats)
+    raise ValueError(f"Figure inconnue : {name}")
+
+
+def build_figures(aggregats: Dict[str, pd.DataFrame], scatter_mode: str = scatter_mode) -> Dict[str, go.Figure]:
+    """
+    Construit les figures Plotly du dashboard à partir des agrégats (voir load_aggregates).
+
+    Args:
+        aggregats: Comptages renvoyés par load_aggregates
+        scatter_mode: Rendu du nuage capacité vs vélos disponibles ("marqueurs" ou "heatmap")
+
+    Returns:
+        Dict[str, go.Figure]: figures indexées par nom (voir FIGURE_NAMES) ;
+        une figure sans donnée est absente du dictionnaire.
+    """
+    figures = {}
+    for name in FIGURE_NAMES:
+        fig = build_figure(name, aggregats, scatter_mode)
+        if fig is not None:
+            figures[name] = fig
+    return figures
+
+
+def write_named_figure(name: str, aggregats: Dict[str, pd.DataFrame], output_dir: str, plotlyjs_url: str) -> Optional[str]:
+    """
+    Construit une figure et l'enregistre en HTML (tâche unitaire, exécutable dans un autre processus).
+
+    Returns:
+        str: chemin du fichier écrit, ou None si la figure n'a aucune donnée
+    """
+    fig = build_figure(name, aggregats)
+    if fig is None:
+        return None
+    target_path = os.path.join(output_dir, f"{name}.html")
+    write_figure(fig, target_path, plotlyjs_url)
+    return target_path
+
+
+def create_histograms(output_dir: Optional[str] = None, snapshot_path: Optional[str] = None) -> None:
+    """
+    Génère les histogrammes  à partir des données de la base SQLite
+    et enregistre les graphiques au format HTML .
+
+    Args:
+        output_dir: Dossier pour les fichiers HTML. 
+        snapshot_path: Fichier nettoyé Parquet/Arrow à utiliser à la place de la base
+            (graphiques de l'instantané courant uniquement).
+    """
+
+    output_dir = output_dir or assets_dir
+    os.makedirs(output_dir, exist_ok=True)
+
+    aggregats = load_aggregates(snapshot_path)
+    plotlyjs_url = vendor_plotlyjs()
+
+    for name in FIGURE_NAMES:
+        target_path = write_named_figure(name, aggregats, output_dir, plotlyjs_url)
+        if target_path:
+            print(f"Graphique sauvegardé : {target_path}")
 
 
 if __name__ == "__main__":
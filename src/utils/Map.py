@@ -1,26 +1,25 @@
 import os
+from typing import Optional
 import folium
+import numpy as np
 import pandas as pd
 import branca.colormap as cm
+from branca.element import MacroElement
+from jinja2 import Template
 import sqlite3
-
-
-DB_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), 
-                                       "..", 
-                                       "..", 
-                                       "data", "database", "velib.db"))
-
-
+from src.utils.atomic_write import atomic_path
+from src.utils.columnar import read_snapshot
+from src.utils.Create_DataBase import read_latest_state
+from src.utils.db import get_read_connection
+from config import map_path
 
 
 def get_db_connection():
-    """Fonction utilitaire pour établir la connexion SQLite."""
+    """Fonction utilitaire pour obtenir la connexion SQLite de lecture du thread courant."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        return conn
-    except sqlite3.Error as e:
+        return get_read_connection()
+    except (sqlite3.Error, FileNotFoundError) as e:
         print(f"Erreur CRITIQUE de connexion à la base de données : {e}")
-        print(f"Vérifiez le chemin : {DB_PATH}")
         return None
     
 def delete_existing_map(path):
@@ -33,35 +32,201 @@ def delete_existing_map(path):
 
 
 
-def Map_Int():
-    """Crée une carte Folium interactive des stations Vélib' et l'enregistre en HTML."""
+# Nombre maximal de pas de temps du curseur historique (l'agrégation passe de l'heure au jour puis à la semaine)
+MAX_PAS_HISTORIQUE = 200
+# Granularité : (nom, durée en heures, table d'occupation lue, expression du pas de temps)
+GRANULARITES = [
+    ("heure", 1, "occupation_horaire", "o.periode"),
+    ("jour", 24, "occupation_journaliere", "o.periode"),
+    ("semaine", 24 * 7, "occupation_journaliere", "strftime('%Y-S%W', o.periode)"),
+]
+
+
+class StationLayer(MacroElement):
+    """
+    Couche Leaflet de toutes les stations générée à partir de tableaux de colonnes.
+
+    Les marqueurs sont créés côté navigateur sur un canvas et le contenu des popups
+    n'est construit qu'au clic : la taille du fichier ne dépend que des données.
+    Si un historique est fourni, un curseur permet de parcourir les pas de temps.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var carte = {{ this._parent.get_name() }};
+            var stations = {{ this.stations|tojson }};
+            var historique = {{ this.historique|tojson }};
+            var pas = historique ? historique.pas.length - 1 : -1;
+
+            // Même dégradé que la colormap branca : vert (0 %) -> jaune (50 %) -> rouge (100 %)
+            function couleur(taux) {
+                if (taux === null || taux < 0) { return "#808080"; }
+                var t = Math.min(Math.max(taux, 0), 100);
+                var r, g;
+                if (t <= 50) { r = Math.round(255 * t / 50); g = Math.round(128 + 127 * t / 50); }
+                else { r = 255; g = Math.round(255 * (100 - t) / 50); }
+                return "rgb(" + r + "," + g + ",0)";
+            }
+            function echapper(texte) {
+                var div = document.createElement("div");
+                div.textContent = texte;
+                return div.innerHTML;
+            }
+            // Le dernier pas du curseur correspond à l'état courant des stations
+            function taux(i) {
+                return pas >= 0 && pas < historique.pas.length - 1 ? historique.taux[pas][i] : stations.taux[i];
+            }
+            function popup(i) {
+                var t = taux(i);
+                var contenu = "<b>" + echapper(stations.nom[i]) + "</b><br>" +
+                    "Capacité : " + stations.capacite[i] + " bornettes<br>";
+                if (pas >= 0 && pas < historique.pas.length - 1) {
+                    contenu += "Période : " + historique.pas[pas] + "<br>";
+                } else {
+                    contenu += "Vélos dispo : " + stations.velos[i] + "<br>";
+                }
+                contenu += "Taux d’occupation : <b>" + (t === null || t < 0 ? "N/A" : t.toFixed(1) + " %") + "</b><br>" +
+                    "Dernière maj : " + stations.maj[i];
+                return contenu;
+            }
+
+            var marqueurs = stations.lat.map(function(lat, i) {
+                var c = couleur(taux(i));
+                var marqueur = L.circleMarker([lat, stations.lon[i]], {
+                    radius: 4, color: c, fillColor: c, fill: true, fillOpacity: 0.7
+                });
+                marqueur.bindPopup(function() { return popup(i); }, {maxWidth: 300});
+                return marqueur;
+            });
+            L.featureGroup(marqueurs).addTo(carte);
+
+            if (historique) {
+                var controle = L.control({position: "bottomleft"});
+                controle.onAdd = function() {
+                    var div = L.DomUtil.create("div", "leaflet-bar");
+                    div.style.background = "white";
+                    div.style.padding = "6px 10px";
+                    div.innerHTML = '<input type="range" min="0" max="' + (historique.pas.length - 1) +
+                        '" value="' + pas + '" style="width: 300px"><br><span></span>';
+                    var curseur = div.querySelector("input");
+                    var libelle = div.querySelector("span");
+                    libelle.textContent = historique.pas[pas];
+                    L.DomEvent.disableClickPropagation(div);
+                    curseur.addEventListener("input", function() {
+                        pas = parseInt(curseur.value, 10);
+                        libelle.textContent = historique.pas[pas];
+                        marqueurs.forEach(function(marqueur, i) {
+                            var c = couleur(taux(i));
+                            marqueur.setStyle({color: c, fillColor: c});
+                        });
+                    });
+                    return div;
+                };
+                controle.addTo(carte);
+            }
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, stations: dict, historique: Optional[dict] = None):
+        super().__init__()
+        self._name = "StationLayer"
+        self.stations = stations
+        self.historique = historique
+
+
+def _station_arrays(df_map: pd.DataFrame) -> dict:
+    """Colonnes de la couche stations (listes JSON), calculées sans boucle sur les lignes."""
+    # Extrait l'heure pour l'affichage dans le popup
+    maj = df_map["actualisation_donnee"].astype(str).str.split(" ").str[1].str.split("+").str[0]
+    return {
+        "lat": df_map["latitude"].round(6).tolist(),
+        "lon": df_map["longitude"].round(6).tolist(),
+        "nom": df_map["nom_station"].astype(str).tolist(),
+        "capacite": df_map["capacite_station"].astype(int).tolist(),
+        "velos": df_map["velos_disponibles"].astype(int).tolist(),
+        "taux": df_map["taux_occupation"].round(1).tolist(),
+        "maj": maj.fillna("N/A").tolist(),
+    }
+
+
+def _history_arrays(historique_df: Optional[pd.DataFrame]) -> Optional[dict]:
+    """Matrice pas de temps x stations des taux d'occupation (entiers, -1 si absent)."""
+    if historique_df is None or len(historique_df) < 2:
+        return None
+    taux = historique_df.to_numpy()
+    taux = np.where(np.isnan(taux), -1, np.clip(np.round(taux), 0, 100)).astype(int)
+    return {"pas": historique_df.index.tolist(), "taux": taux.tolist()}
+
+
+def _load_history(identifiants: pd.Series) -> Optional[pd.DataFrame]:
+    """
+    Taux d'occupation moyen par station et par pas de temps, lu dans les tables d'occupation
+    (alimentées par tous les relevés, alors que l'historique ne garde que les changements).
+
+    La granularité (heure, jour, semaine) est choisie pour ne pas dépasser MAX_PAS_HISTORIQUE pas.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        return None
+    duree_heures = conn.execute("""
+        SELECT (julianday(MAX(periode)) - julianday(MIN(periode))) * 24
+        FROM occupation_horaire
+    """).fetchone()[0] or 0
+    table, pas = next(
+        ((table, pas) for _, heures, table, pas in GRANULARITES if duree_heures / heures < MAX_PAS_HISTORIQUE),
+        GRANULARITES[-1][2:],
+    )
+    historique_df = pd.read_sql_query(f"""
+        SELECT
+            o.identifiant_station,
+            {pas} AS pas,
+            SUM(o.velos_disponibles_somme) * 100.0 / (SUM(o.nb_releves) * s.capacite_station) AS taux_occupation
+        FROM {table} AS o
+        JOIN stations AS s ON s.identifiant_station = o.identifiant_station
+        WHERE s.capacite_station > 0
+        GROUP BY o.identifiant_station, pas
+    """, conn)
+
+    if historique_df.empty:
+        return None
+    matrice = historique_df.pivot(index="pas", columns="identifiant_station", values="taux_occupation")
+    return matrice.sort_index().tail(MAX_PAS_HISTORIQUE).reindex(columns=identifiants.tolist())
+
+
+def _load_map_data_sqlite():
     conn = get_db_connection()
     if conn is None:
          print("Création de carte annulée : Connexion à la base de données impossible.")
-         return
+         return None
+
+    # Dernier état de chaque station (table maintenue à l'import, indépendante de l'historique)
+    df_map = read_latest_state(conn)
+    df_map = df_map[df_map["capacite_station"] > 0].copy()
+    return df_map
 
-    
 
-    # Requête pour récupérer les données de station avec la dernière disponibilité
-    query = """
-    SELECT 
-        s.nom_station,
-        s.latitude,
-        s.longitude,
-        s.capacite_station,
-        d.velos_disponibles,
-        d.actualisation_donnee
-    FROM stations AS s
-    JOIN disponibilites AS d 
-        ON s.identifiant_station = d.identifiant_station
-    WHERE
-        s.capacite_station IS NOT NULL AND 
-        d.velos_disponibles IS NOT NULL
-    ORDER BY d.actualisation_donnee DESC
-    LIMIT 1000 
+def Map_Int(snapshot_path=None, historique=True):
     """
-    df_map = pd.read_sql_query(query, conn)
-    conn.close()
+    Crée une carte Folium interactive des stations Vélib' et l'enregistre en HTML.
+
+    Args:
+        snapshot_path: Fichier nettoyé Parquet/Arrow à lire (projeté en mémoire) à la place de la base.
+        historique: Ajoute un curseur temporel sur l'historique de la base (si plusieurs pas de temps).
+    """
+    if snapshot_path:
+        df_map = read_snapshot([
+            "identifiant_station", "nom_station", "latitude", "longitude", "capacite_station",
+            "velos_disponibles", "actualisation_donnee",
+        ], snapshot_path)
+        df_map["actualisation_donnee"] = df_map["actualisation_donnee"].astype(str)
+        # Une station sans bornette n'a pas de taux d'occupation
+        df_map = df_map[df_map["capacite_station"] > 0].copy()
+    else:
+        df_map = _load_map_data_sqlite()
+        if df_map is None:
+            return
 
     if df_map.empty:
         print("Aucune donnée de station à afficher sur la carte. Carte non créée.")
@@ -73,47 +238,26 @@ def Map_Int():
     df_map['taux_occupation'] = (df_map['velos_disponibles'] / df_map['capacite_station']) * 100
     df_map["taux_occupation"] = df_map["taux_occupation"].clip(0, 100)
 
-    # Création de la carte Folium centrée sur Paris
-    m = folium.Map(location=[48.8566, 2.3522], zoom_start=12, tiles='OpenStreetMap')
+    # Création de la carte Folium centrée sur Paris (marqueurs dessinés sur un canvas)
+    m = folium.Map(location=[48.8566, 2.3522], zoom_start=12, tiles='OpenStreetMap', prefer_canvas=True)
     m.fit_bounds([[48.7, 2.0], [49.0, 2.7]])
 
     # Définition de la colormap (Vert=Disponible, Rouge=Occupé)
     colormap = cm.LinearColormap(colors=['green', 'yellow', 'red'], vmin=0, vmax=100, caption='Taux d\'occupation (%)')
     colormap.add_to(m)
 
-    # Ajout des marqueurs circulaires
-    for _, row in df_map.iterrows():
-        # Extrait l'heure pour l'affichage dans le popup
-        maj_time = row['actualisation_donnee'].split(' ')[1].split('+')[0] if pd.notna(row['actualisation_donnee']) else "N/A"
-        
-        popup_html = f"""
-        <b>{row['nom_station']}</b><br>
-        Capacité : {row['capacite_station']} bornettes<br>
-        Vélos dispo : {row['velos_disponibles']}<br>
-        Taux d’occupation : <b>{row['taux_occupation']:.1f} %</b><br>
-        Dernière maj : {maj_time}
-        """
-        
-        # Création du marqueur avec couleur basée sur le taux d'occupation
-        folium.CircleMarker(
-            location=[row["latitude"], row["longitude"]],
-            radius=4,
-            color=colormap(row['taux_occupation']),
-            fill=True,
-            fill_opacity=0.7,
-            popup=folium.Popup(popup_html, max_width=300)
-        ).add_to(m)
+    # Une seule couche pour toutes les stations, construite à partir de tableaux de colonnes
+    historique_df = _load_history(df_map["identifiant_station"]) if historique and not snapshot_path else None
+    StationLayer(_station_arrays(df_map), _history_arrays(historique_df)).add_to(m)
 
     # --- Enregistrement de la carte ---
     
     # Définition du chemin de sortie
-    output_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../assets/velib_occupation_map.html"))
-    
-    # Création des répertoires si nécessaire
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    output_path = map_path
     
-    # Enregistrement de la carte
-    m.save(output_path)
+    # Enregistrement de la carte (fichier temporaire renommé, les répertoires sont créés si nécessaire)
+    with atomic_path(output_path) as tmp_path:
+        m.save(tmp_path)
     print(f"Carte Folium interactive enregistrée dans : {output_path}")
 
 # Appel de la fonction pour exécuter la création de la carte
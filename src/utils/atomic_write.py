@@ -0,0 +1,30 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_path(dest_path: str):
+    """
+    Fournit un chemin temporaire à côté de dest_path, puis le renomme en dest_path
+    si le bloc se termine sans erreur (os.replace est atomique sur un même disque).
+
+    Les lecteurs (serveur Dash, requêtes en cours) voient donc soit l'ancien
+    fichier complet, soit le nouveau, jamais un fichier à moitié écrit.
+
+    Args:
+        dest_path (str): Chemin final du fichier
+    """
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    os.makedirs(dest_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(dest_path)}.", suffix=".tmp", dir=dest_dir
+    )
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,132 @@
+import os
+import ast
+import json
+import hashlib
+import importlib.util
+from typing import Iterable, List
+from src.utils.atomic_write import atomic_path
+from config import pipeline_state_path, project_root
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _project_source(module: str):
+    """Fichier source d'un module du projet, ou None pour un module externe (pandas, plotly...)."""
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        return None
+    origine = spec.origin if spec is not None else None
+    if not origine or not origine.endswith(".py"):
+        return None
+    origine = os.path.abspath(origine)
+    if not origine.startswith(project_root + os.sep) or "site-packages" in origine:
+        return None
+    return origine
+
+
+def project_sources(module: str) -> List[str]:
+    """
+    Fichiers source d'un module et de tous les modules du projet qu'il importe, directement
+    ou non (imports faits dans les fonctions compris) : le code dont dépend une étape du pipeline.
+    Les imports sont lus dans le code source, sans exécuter les modules.
+    """
+    a_visiter = [module]
+    sources = {}
+    while a_visiter:
+        nom = a_visiter.pop()
+        source = _project_source(nom)
+        if source is None or source in sources.values():
+            continue
+        sources[nom] = source
+        with open(source, encoding="utf-8") as f:
+            arbre = ast.parse(f.read(), filename=source)
+        for noeud in ast.walk(arbre):
+            if isinstance(noeud, ast.Import):
+                a_visiter.extend(alias.name for alias in noeud.names)
+            elif isinstance(noeud, ast.ImportFrom) and noeud.module and not noeud.level:
+                # from paquet import module : le nom importé peut être un sous-module
+                a_visiter.append(noeud.module)
+                a_visiter.extend(f"{noeud.module}.{alias.name}" for alias in noeud.names)
+    return sorted(sources.values())
+
+
+class BuildCache:
+    """
+    Mémorise, pour chaque étape du pipeline, l'empreinte (SHA-256) de ses entrées.
+
+    Une étape dont les entrées n'ont pas changé depuis sa dernière exécution réussie,
+    et dont les sorties existent toujours, peut être ignorée.
+
+    Args:
+        state_path (str): Fichier JSON où sont conservées les empreintes
+        force (bool): Si True, toutes les étapes sont considérées comme périmées
+    """
+
+    def __init__(self, state_path: str = pipeline_state_path, force: bool = False):
+        self.state_path = state_path
+        self.force = force
+        self._state = self._load()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {"steps": {}, "files": {}}
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {"steps": {}, "files": {}}
+        state.setdefault("steps", {})
+        state.setdefault("files", {})
+        return state
+
+    def _save(self) -> None:
+        with atomic_path(self.state_path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._state, f, indent=2)
+
+    def file_hash(self, path: str) -> str:
+        """
+        SHA-256 du contenu d'un fichier. Le résultat est réutilisé tant que
+        la taille et la date de modification du fichier sont inchangées.
+        """
+        if not os.path.exists(path):
+            return "absent"
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        connu = self._state["files"].get(path)
+        if connu and connu["signature"] == signature:
+            return connu["sha256"]
+
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        self._state["files"][path] = {"signature": signature, "sha256": digest}
+        return digest
+
+    def fingerprint(self, inputs: Iterable[str], versions: Iterable[str] = ()) -> str:
+        """
+        Empreinte combinée d'une liste de fichiers d'entrée (données et code de l'étape)
+        et de versions de données qui ne sont pas des fichiers (contenu de la base SQLite).
+        """
+        sha = hashlib.sha256()
+        for path in inputs:
+            sha.update(os.path.basename(path).encode("utf-8"))
+            sha.update(self.file_hash(path).encode("ascii"))
+        for version in versions:
+            sha.update(version.encode("utf-8"))
+        return sha.hexdigest()
+
+    def is_fresh(self, step: str, fingerprint: str, outputs: Iterable[str]) -> bool:
+        if self.force:
+            return False
+        if self._state["steps"].get(step) != fingerprint:
+            return False
+        return all(os.path.exists(path) for path in outputs)
+
+    def record(self, step: str, fingerprint: str) -> None:
+        """Enregistre l'empreinte des entrées d'une étape qui vient de réussir."""
+        self._state["steps"][step] = fingerprint
+        self._save()
@@ -0,0 +1,122 @@
+import os
+from typing import List, Optional
+import pandas as pd
+from src.utils.atomic_write import atomic_path
+from config import clean_format, cleandata_path, cleandata_parquet_path, cleandata_arrow_path
+
+# Fichier nettoyé correspondant à chaque format
+CLEAN_PATHS = {
+    "csv": cleandata_path,
+    "parquet": cleandata_parquet_path,
+    "arrow": cleandata_arrow_path,
+}
+
+# Colonnes de texte répétitives stockées en catégories (dictionnaire + indices)
+CATEGORY_COLUMNS = ["Nom station", "Nom communes équipées"]
+COUNT_COLUMNS = [
+    "Capacité de la station", "Nombre bornettes libres", "Nombre total vélos disponibles",
+    "Vélos mécaniques disponibles", "Vélos électriques disponibles",
+]
+
+# Correspondance colonnes du fichier nettoyé -> colonnes de la base
+DB_COLUMNS = {
+    "Identifiant station": "identifiant_station",
+    "Nom station": "nom_station",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "Capacité de la station": "capacite_station",
+    "Code INSEE communes équipées": "code_insee",
+    "Actualisation de la donnée": "actualisation_donnee",
+    "Station en fonctionnement": "station_en_fonctionnement",
+    "Borne de paiement disponible": "borne_paiement",
+    "Retour vélib possible": "retour_possible",
+    "Nombre bornettes libres": "bornettes_libres",
+    "Nombre total vélos disponibles": "velos_disponibles",
+    "Vélos mécaniques disponibles": "velos_mecaniques",
+    "Vélos électriques disponibles": "velos_electriques",
+}
+
+
+def clean_output_path(fmt: str = clean_format) -> str:
+    """Chemin du fichier nettoyé pour le format demandé ("csv", "parquet" ou "arrow")."""
+    if fmt not in CLEAN_PATHS:
+        raise ValueError(f"Format de fichier nettoyé inconnu : {fmt}")
+    return CLEAN_PATHS[fmt]
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "Le format Parquet/Arrow nécessite pyarrow (pip install pyarrow) "
+            "ou clean_format = \"csv\" dans config.py."
+        ) from e
+    return pyarrow
+
+
+def to_columnar_frame(clean_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Type le DataFrame nettoyé pour un stockage en colonnes : coordonnées séparées
+    en latitude/longitude, noms en catégories, compteurs en entiers et dates en timestamp UTC.
+    """
+    df = clean_df.copy()
+    coordonnees = df.pop("Coordonnées géographiques")
+    df[["latitude", "longitude"]] = coordonnees.astype(str).str.strip("()").str.split(",", expand=True).astype(float)
+    df["Actualisation de la donnée"] = pd.to_datetime(df["Actualisation de la donnée"], utc=True)
+    for col in COUNT_COLUMNS:
+        df[col] = df[col].astype("int32")
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def write_clean_columnar(clean_df: pd.DataFrame, path: str, fmt: str) -> None:
+    """
+    Écrit le DataFrame nettoyé en Parquet ou en Arrow IPC (non compressé,
+    pour pouvoir être relu en mémoire projetée sans copie).
+    """
+    _require_pyarrow()
+    df = to_columnar_frame(clean_df)
+    with atomic_path(path) as tmp_path:
+        if fmt == "parquet":
+            df.to_parquet(tmp_path, index=False)
+        elif fmt == "arrow":
+            df.to_feather(tmp_path, compression="uncompressed")
+        else:
+            raise ValueError(f"Format colonnes inconnu : {fmt}")
+
+
+def read_clean_columnar(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Relit un fichier nettoyé Parquet ou Arrow sans analyse de texte.
+
+    Le fichier Arrow est projeté en mémoire (memory_map) et les colonnes numériques
+    sans valeur manquante sont converties en pandas sans copie.
+    """
+    pa = _require_pyarrow()
+    if os.path.splitext(path)[1] == ".parquet":
+        return pd.read_parquet(path, columns=columns, memory_map=True)
+
+    import pyarrow.ipc
+    with pa.memory_map(path, "r") as source:
+        table = pyarrow.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def read_snapshot(columns: List[str], path: Optional[str] = None) -> pd.DataFrame:
+    """
+    Instantané courant lu depuis le fichier colonnes, avec les noms de colonnes de la base
+    (identifiant_station, velos_disponibles, ...).
+
+    Args:
+        columns (List[str]): Colonnes voulues (noms de la base)
+        path (str): Fichier Parquet/Arrow (par défaut celui de clean_format)
+    """
+    path = path or clean_output_path()
+    inverse = {db: source for source, db in DB_COLUMNS.items()}
+    df = read_clean_columnar(path, columns=[inverse[col] for col in columns])
+    return df.rename(columns=DB_COLUMNS)
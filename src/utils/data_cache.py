@@ -0,0 +1,113 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Callable, Optional
+from src.utils.db import database_files, get_read_connection
+from src.utils.snapshot_store import SnapshotStore, load_snapshot
+from config import db_path, cache_ttl
+
+
+def data_version() -> Optional[tuple]:
+    """
+    Version des données publiées : taille et date de modification de la base
+    et de son journal WAL (où sont écrits les nouveaux instantanés avant report).
+    """
+    if not os.path.exists(db_path):
+        return None
+    version = []
+    for path in database_files(db_path):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            version.extend((stat.st_size, stat.st_mtime_ns))
+    return tuple(version)
+
+
+class VersionedCache:
+    """
+    Valeur partagée par tout le processus, calculée une seule fois par version
+    de la base ; la version n'est revérifiée qu'après ttl secondes.
+
+    Args:
+        loader: Fonction calculant la valeur à partir de la base
+        ttl (float): Délai en secondes entre deux vérifications de la version
+    """
+
+    def __init__(self, loader: Callable[[], object], ttl: float = cache_ttl):
+        self.loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked_at = None
+        self._value = None
+
+    def _check_version(self) -> None:
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.ttl:
+            return
+        self._checked_at = now
+        version = data_version()
+        if version != self._version:
+            self._version = version
+            self._value = None
+
+    def invalidate(self) -> None:
+        """Force la relecture des données à la prochaine demande (après un rafraîchissement)."""
+        with self._lock:
+            self._checked_at = None
+
+    def get(self):
+        """Valeur pour la version courante de la base, ou None si la base n'existe pas encore."""
+        with self._lock:
+            self._check_version()
+            if self._version is None:
+                return None
+            if self._value is None:
+                try:
+                    self._value = self.loader()
+                except sqlite3.Error as e:
+                    # Base d'un ancien schéma (mode --serve-only) : rien jusqu'au prochain pipeline
+                    print(f"Lecture des données impossible : {e}")
+                    return None
+            return self._value
+
+
+def _load_figures() -> dict:
+    # Import différé : pandas et plotly ne sont chargés qu'à la première page de graphique
+    from pandas.errors import DatabaseError
+    from src.utils.Histogramme import load_aggregates, build_figures
+    try:
+        aggregats = load_aggregates()
+    except DatabaseError as e:
+        # pandas enveloppe les erreurs SQLite de read_sql_query
+        raise sqlite3.DatabaseError(str(e)) from e
+    return {key: fig.to_plotly_json() for key, fig in build_figures(aggregats).items()}
+
+
+class FigureCache(VersionedCache):
+    """Figures du dashboard, construites une seule fois par version de la base."""
+
+    def __init__(self, ttl: float = cache_ttl):
+        super().__init__(_load_figures, ttl)
+
+    def get_figure(self, name: str) -> Optional[dict]:
+        """
+        Figure sérialisée (dict JSON Plotly) prête pour dcc.Graph, ou None si
+        la base n'existe pas encore ou si la figure n'a aucune donnée.
+        """
+        figures = self.get()
+        return figures.get(name) if figures is not None else None
+
+
+class SnapshotCache(VersionedCache):
+    """État courant des stations (SnapshotStore), chargé une seule fois par version de la base."""
+
+    def __init__(self, ttl: float = cache_ttl):
+        super().__init__(lambda: load_snapshot(get_read_connection()), ttl)
+
+    def get_snapshot(self) -> Optional[SnapshotStore]:
+        return self.get()
+
+
+figure_cache = FigureCache()
+snapshot_cache = SnapshotCache()
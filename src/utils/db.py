@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+from config import db_path
+
+# Réglages appliqués à chaque connexion
+BUSY_TIMEOUT_MS = 5000                  # Attente maximale d'un verrou avant erreur
+CACHE_SIZE_KIB = 64 * 1024              # Cache de pages par connexion (64 Mio)
+MMAP_SIZE = 256 * 1024 * 1024           # Lecture de la base en mémoire projetée (256 Mio)
+
+_local = threading.local()
+
+
+def _apply_pragmas(conn: sqlite3.Connection) -> None:
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+
+def connect(path: str = db_path, readonly: bool = False) -> sqlite3.Connection:
+    """
+    Ouvre une connexion SQLite configurée.
+
+    La base est en mode WAL : les lecteurs ne sont jamais bloqués par l'écriture
+    d'un nouvel instantané et lisent le dernier état validé.
+
+    Args:
+        path (str): Chemin de la base
+        readonly (bool): Connexion de lecture (PRAGMA query_only) pour les pages et graphiques
+    """
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    if not readonly:
+        # Le mode WAL est enregistré dans le fichier : il suffit de le fixer côté écriture
+        conn.execute("PRAGMA journal_mode = WAL")
+    _apply_pragmas(conn)
+    if readonly:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def get_read_connection(path: str = db_path) -> sqlite3.Connection:
+    """
+    Connexion de lecture réutilisée par thread (un thread Dash = une connexion).
+
+    Si la base a été remplacée sur le disque (autre fichier), la connexion est rouverte.
+    Ne pas fermer la connexion renvoyée.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Base de données introuvable : {path}. "
+            "Exécutez d'abord le pipeline (main.py) pour la générer."
+        )
+    connexions = getattr(_local, "connexions", None)
+    if connexions is None:
+        connexions = _local.connexions = {}
+
+    inode = os.stat(path).st_ino
+    conn, inode_connu = connexions.get(path, (None, None))
+    if conn is not None and inode_connu != inode:
+        conn.close()
+        conn = None
+    if conn is None:
+        conn = connect(path, readonly=True)
+        connexions[path] = (conn, inode)
+    return conn
+
+
+def database_files(path: str = db_path) -> List[str]:
+    """Fichiers portant le contenu de la base : le fichier principal et le journal WAL."""
+    return [path, path + "-wal"]
+
+
+def database_version(path: str = db_path) -> str:
+    """
+    Version du contenu de la base, lue par requête : dernier changement enregistré, dates du
+    dernier état des stations (donc de tous les relevés agrégés) et référentiel des stations.
+
+    Contrairement à la taille ou au contenu des fichiers, elle ne varie pas quand un lecteur
+    recrée le journal WAL ou quand il est reporté dans la base : empreinte du pipeline.
+    """
+    if not os.path.exists(path):
+        return "absent"
+    conn = connect(path, readonly=True)
+    try:
+        version = conn.execute("""
+            SELECT (SELECT MAX(id) FROM changements),
+                   (SELECT COUNT(*) || ':' || SUM(julianday(actualisation_donnee)) FROM latest_disponibilites),
+                   (SELECT COUNT(*) || ':' || SUM(capacite_station) || ':' || SUM(latitude + longitude) FROM stations)
+        """).fetchone()
+    except sqlite3.Error:
+        return "absent"
+    finally:
+        conn.close()
+    return "|".join(str(valeur) for valeur in version)
+
+
+def database_mtime(path: str = db_path) -> Optional[float]:
+    """
+    Date (epoch) de la dernière écriture dans la base, ou None si elle n'existe pas encore.
+    Visible de tous les processus, contrairement à l'état du pipeline (voir scheduler.py).
+    """
+    dates = [os.path.getmtime(fichier) for fichier in database_files(path) if os.path.exists(fichier)]
+    return max(dates, default=None)
+
+
+def checkpoint(conn: sqlite3.Connection) -> None:
+    """Reporte le journal WAL dans la base sans attendre les lecteurs en cours."""
+    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+
+def replace_database(source_path: str, dest_path: str = db_path) -> None:
+    """
+    Remplace le contenu de dest_path par celui de source_path via l'API de sauvegarde SQLite.
+
+    Contrairement à un renommage de fichier, la copie est une transaction : les connexions
+    ouvertes sur dest_path (et ses fichiers -wal/-shm) restent valides.
+    """
+    source = sqlite3.connect(source_path)
+    dest = connect(dest_path)
+    try:
+        source.backup(dest)
+        checkpoint(dest)
+    finally:
+        source.close()
+        dest.close()
@@ -0,0 +1,68 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional
+from src.utils.Histogramme import FIGURE_INPUTS, FIGURE_NAMES, load_aggregates, vendor_plotlyjs, write_named_figure
+from src.utils.Map import Map_Int
+from config import assets_dir, asset_workers
+
+
+# Modules importés une seule fois par le serveur de processus (forkserver)
+PRELOAD_MODULES = ["__main__", "src.utils.Histogramme", "src.utils.Map"]
+
+
+def _pool_context():
+    """
+    Contexte des processus de génération : "forkserver" (POSIX) ou "spawn".
+
+    Dans les deux cas les processus ne sont pas copiés depuis le serveur Dash (threads,
+    connexions SQLite). Le forkserver, démarré une fois puis réutilisé à chaque
+    rafraîchissement, importe plotly et folium une seule fois ; les processus en sont des copies.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        contexte = multiprocessing.get_context("forkserver")
+        contexte.set_forkserver_preload(PRELOAD_MODULES)
+        return contexte
+    return multiprocessing.get_context("spawn")
+
+
+def generate_assets(max_workers: Optional[int] = asset_workers) -> None:
+    """
+    Génère la carte et chaque graphique HTML en parallèle, dans un pool de processus.
+
+    Les agrégats sont lus une seule fois dans SQLite puis chaque tâche ne reçoit que ceux
+    de sa figure (quelques centaines de lignes) ; la carte lit ses propres données.
+    La durée de l'étape est ainsi proche de celle de la figure la plus lente.
+
+    Args:
+        max_workers (int): Nombre de processus (par défaut le nombre de processeurs) ;
+            avec un seul processus, les figures sont générées à la suite sans pool.
+    """
+    os.makedirs(assets_dir, exist_ok=True)
+    aggregats = load_aggregates()
+    plotlyjs_url = vendor_plotlyjs()
+
+    taches = {"Carte": (Map_Int, ())}
+    for name in FIGURE_NAMES:
+        entrees = {cle: aggregats[cle] for cle in FIGURE_INPUTS[name]}
+        taches[name] = (write_named_figure, (name, entrees, assets_dir, plotlyjs_url))
+
+    workers = min(max_workers or os.cpu_count() or 1, len(taches))
+    if workers <= 1:
+        for nom, (fonction, args) in taches.items():
+            _report(nom, fonction(*args))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+        futures = {pool.submit(fonction, *args): nom for nom, (fonction, args) in taches.items()}
+        for future in as_completed(futures):
+            _report(futures[future], future.result())
+
+
+def _report(nom: str, resultat) -> None:
+    if nom != "Carte" and resultat:
+        print(f"Graphique sauvegardé : {resultat}")
+
+
+if __name__ == "__main__":
+    generate_assets()
@@ -1,29 +1,131 @@
 import os
+import json
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.utils.atomic_write import atomic_path
+from config import rawdata_path
 
-def download_velib_csv():
-    csv_url = "https://www.data.gouv.fr/api/1/datasets/r/0845c838-6f18-40c3-936f-da204107759a"
+CSV_URL = "https://www.data.gouv.fr/api/1/datasets/r/0845c838-6f18-40c3-936f-da204107759a"
 
-    # Chemin absolu basé sur la racine du projet
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-    rawdata_dir = os.path.join(project_root, "data", "rawdata")
-    os.makedirs(rawdata_dir, exist_ok=True)
+CHUNK_SIZE = 64 * 1024      # Taille des blocs écrits sur disque (octets)
+TIMEOUT = (10, 60)          # Délais de connexion / lecture (secondes)
+MAX_TENTATIVES = 3          # Tentatives si le flux est coupé pendant la lecture du corps
+BACKOFF = 2                 # Attente de base entre deux tentatives (secondes, doublée à chaque fois)
 
-    dest_path = os.path.join(rawdata_dir, "velib_disponibilite.csv")
+_session = None
+_session_lock = threading.Lock()
 
-    # Suppression de l'ancien fichier s'il existe
-    if os.path.exists(dest_path):
-        os.remove(dest_path)
-        print(f"Suppression de l'ancien fichier : {dest_path}")
 
-    print(f"Téléchargement du fichier depuis : {csv_url}")
-    resp = requests.get(csv_url)
-    resp.raise_for_status()
+def get_session() -> requests.Session:
+    """
+    Session HTTP partagée : connexions réutilisées (pool) et nouvelles tentatives
+    avec attente exponentielle sur les erreurs réseau et les réponses 429/5xx.
 
-    with open(dest_path, "wb") as f:
-        f.write(resp.content)
+    C'est la seule couche de nouvelles tentatives jusqu'à la réception des en-têtes ;
+    download_velib_csv ne relance que les flux coupés pendant la lecture du corps.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=5,
+                backoff_factor=1,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET", "HEAD"),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def _meta_path(dest_path: str) -> str:
+    return dest_path + ".meta.json"
+
+
+def _read_meta(dest_path: str) -> dict:
+    """En-têtes de validation (ETag, Last-Modified) du dernier téléchargement."""
+    # Sans fichier local, une réponse 304 ne servirait à rien
+    if not os.path.exists(dest_path) or not os.path.exists(_meta_path(dest_path)):
+        return {}
+    try:
+        with open(_meta_path(dest_path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(dest_path: str, resp: requests.Response) -> None:
+    meta = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    with atomic_path(_meta_path(dest_path)) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+
+def download_velib_csv(url: str = CSV_URL, dest_path: str = rawdata_path, session: requests.Session = None,
+                       conditional: bool = True) -> bool:
+    """
+    Télécharge le CSV Vélib si le serveur en publie une nouvelle version.
+
+    La requête est conditionnelle (If-None-Match / If-Modified-Since) ; le corps est écrit
+    par blocs dans un fichier temporaire renommé une fois complet, de sorte que
+    l'ancien fichier reste intact en cas d'échec.
+
+    Args:
+        url (str): Adresse du CSV
+        dest_path (str): Chemin du fichier brut
+        session (requests.Session): Session à utiliser (session partagée par défaut)
+        conditional (bool): Si False, le fichier est retéléchargé même s'il n'a pas changé
+
+    Returns:
+        bool: True si un nouveau fichier a été enregistré, False si le fichier local est à jour (HTTP 304)
+    """
+    session = session or get_session()
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+    meta = _read_meta(dest_path) if conditional else {}
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    print(f"Téléchargement du fichier depuis : {url}")
+    for tentative in range(1, MAX_TENTATIVES + 1):
+        reponse_recue = False
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as resp:
+                reponse_recue = True
+                if resp.status_code == 304:
+                    print(f"Fichier inchangé depuis le dernier téléchargement : {dest_path}")
+                    return False
+                resp.raise_for_status()
+
+                with atomic_path(dest_path) as tmp_path:
+                    with open(tmp_path, "wb") as f:
+                        for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                            f.write(chunk)
+                _write_meta(dest_path, resp)
+            break
+        except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+            # Serveur injoignable : les nouvelles tentatives sont celles de la session (urllib3)
+            if not reponse_recue or tentative == MAX_TENTATIVES:
+                raise
+            attente = BACKOFF * 2 ** (tentative - 1)
+            print(f"Téléchargement interrompu ({e}), nouvelle tentative dans {attente} s...")
+            time.sleep(attente)
 
     print(f"Fichier enregistré dans : {dest_path}")
+    return True
 
 if __name__ == "__main__":
-    download_velib_csv()
\ No newline at end of file
+    download_velib_csv()
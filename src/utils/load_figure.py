@@ -0,0 +1,16 @@
+from dash import dcc, html
+from src.utils.data_cache import figure_cache
+
+def load_figure(name: str, height="500px"):
+    """Graphique natif Dash alimenté par le cache de figures (voir Histogramme.FIGURE_NAMES)."""
+    figure = figure_cache.get_figure(name)
+
+    if figure is None:
+        # Si la figure n'existe pas (base absente ou aucune donnée), on affiche un message
+        return html.H3(f"Le graphique {name} n'a pas encore été généré.", style={"color": "red", "textAlign": "center"})
+
+    return dcc.Graph(
+        figure=figure,
+        style={"width": "100%", "height": height},
+        config={"displaylogo": False}
+    )
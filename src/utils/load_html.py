@@ -1,5 +1,6 @@
 from dash import html
 import os
+from src.utils.static_assets import static_url
 
 def load_html_asset(filename: str, width="100%", height="600px") -> html.Iframe:
 
@@ -13,8 +14,9 @@ def load_html_asset(filename: str, width="100%", height="600px") -> html.Iframe:
             style={"width": "100%", "height": "600px", "border": "none"}
         )
     
-    # Si le fichier existe, on le sert via src (Dash sert automatiquement le dossier assets)
+    # Version publiée (compressée, mise en cache par le navigateur) si elle existe,
+    # sinon le fichier du dossier assets servi par Dash
     return html.Iframe(
-        src=f"/assets/{filename}",
+        src=static_url(filename) or f"/assets/{filename}",
         style={"width": "100%", "height": "600px", "border": "none"}
     )
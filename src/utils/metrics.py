@@ -0,0 +1,209 @@
+import os
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from src.utils.db import database_files, database_mtime
+from config import metrics_enabled
+
+# Bornes par défaut des histogrammes de durée (secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    paires = [f'{nom}="{_escape(val)}"' for nom, val in zip(labelnames, values)]
+    if extra:
+        paires.append(extra)
+    return "{" + ",".join(paires) + "}" if paires else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels[nom]) for nom in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+
+class Counter(_Metric):
+    """Compteur croissant (lignes importées, rejets, exécutions...)."""
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not metrics_enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            valeurs = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {val}" for key, val in valeurs.items()
+        ]
+
+
+class Gauge(_Metric):
+    """
+    Valeur instantanée. Avec function, la valeur est calculée à chaque lecture de /metrics
+    (taille de la base...) et ne coûte rien entre deux lectures.
+    """
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 function: Optional[Callable[[], float]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value: float, **labels) -> None:
+        if not metrics_enabled:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def render(self) -> list:
+        if self.function is not None:
+            valeur = self.function()
+            return self.header() + ([f"{self.name} {valeur}"] if valeur is not None else [])
+        with self._lock:
+            valeurs = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {val}" for key, val in valeurs.items()
+        ]
+
+
+class Histogram(_Metric):
+    """Répartition de durées en classes cumulatives (format Prometheus)."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        if not metrics_enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            serie = self._values.get(key)
+            if serie is None:
+                # Effectifs par classe (la dernière pour +Inf), somme et nombre d'observations
+                serie = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][bisect.bisect_left(self.buckets, value)] += 1
+            serie[1] += value
+            serie[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Chronomètre le bloc et enregistre sa durée."""
+        if not metrics_enabled:
+            yield
+            return
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - debut, **labels)
+
+    def render(self) -> list:
+        with self._lock:
+            valeurs = {key: (list(serie[0]), serie[1], serie[2]) for key, serie in self._values.items()}
+        lignes = self.header()
+        for key, (effectifs, somme, nombre) in valeurs.items():
+            cumul = 0
+            for borne, effectif in zip(self.buckets + (float("inf"),), effectifs):
+                cumul += effectif
+                le = 'le="+Inf"' if borne == float("inf") else f'le="{borne}"'
+                lignes.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumul}")
+            lignes.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {somme}")
+            lignes.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {nombre}")
+        return lignes
+
+
+class MetricsRegistry:
+    """Ensemble des métriques exposées sur /metrics (format texte Prometheus 0.0.4)."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+              function: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lignes = []
+        for metric in metrics:
+            lignes.extend(metric.render())
+        return "\n".join(lignes) + "\n"
+
+
+registry = MetricsRegistry()
+
+# --- Métriques du pipeline et du serveur ---
+PIPELINE_STEP_SECONDS = registry.histogram(
+    "velib_pipeline_step_duration_seconds", "Durée des étapes du pipeline de données.", ["etape"])
+PIPELINE_STEPS_SKIPPED = registry.counter(
+    "velib_pipeline_steps_skipped_total", "Étapes ignorées car leurs entrées n'ont pas changé.", ["etape"])
+PIPELINE_RUNS = registry.counter(
+    "velib_pipeline_runs_total", "Exécutions du pipeline, par résultat.", ["resultat"])
+PIPELINE_LAST_SUCCESS = registry.gauge(
+    "velib_pipeline_last_success_timestamp_seconds", "Date (epoch) du dernier rafraîchissement réussi.")
+CLEAN_ROWS = registry.gauge(
+    "velib_clean_rows", "Lignes du dernier nettoyage (lues, conservées, rejetées).", ["etat"])
+CLEAN_REJECTS = registry.counter(
+    "velib_clean_rejects_total", "Erreurs de validation rencontrées, par champ.", ["champ"])
+DB_ROWS_INSERTED = registry.counter(
+    "velib_db_rows_inserted_total", "Lignes ajoutées à la base, par table.", ["table"])
+DB_SIZE = registry.gauge(
+    "velib_db_size_bytes", "Taille de la base SQLite (fichier principal et journal WAL).",
+    function=lambda: sum(os.path.getsize(path) for path in database_files() if os.path.exists(path)))
+DATA_LAST_UPDATE = registry.gauge(
+    "velib_data_last_update_timestamp_seconds", "Date (epoch) de la dernière écriture dans la base.",
+    function=database_mtime)
+CALLBACK_SECONDS = registry.histogram(
+    "velib_dash_callback_duration_seconds", "Durée des callbacks Dash.", ["callback"])
+
+
+def timed_callback(nom: str):
+    """Décorateur enregistrant la durée d'un callback Dash (aucun coût si les métriques sont désactivées)."""
+    def decorateur(fonction):
+        if not metrics_enabled:
+            return fonction
+
+        @wraps(fonction)
+        def wrapper(*args, **kwargs):
+            with CALLBACK_SECONDS.time(callback=nom):
+                return fonction(*args, **kwargs)
+        return wrapper
+    return decorateur
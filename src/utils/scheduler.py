@@ -0,0 +1,126 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional
+from src.utils.db import database_mtime
+from src.utils.metrics import PIPELINE_STEP_SECONDS, PIPELINE_RUNS, PIPELINE_LAST_SUCCESS
+
+
+class PipelineStatus:
+    """
+    État partagé du pipeline de données (dernier rafraîchissement, durée de chaque étape).
+
+    Écrit par le thread de rafraîchissement et lu par les callbacks Dash. Cet état est propre
+    au processus : un worker WSGI ou un serveur --serve-only ne voit pas les exécutions de
+    main.py --pipeline-only, et se fie alors à la date de dernière écriture dans la base.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._derniere_maj: Optional[datetime] = None
+        self._durees: dict = {}
+        self._durees_en_cours: dict = {}
+        self._erreur: Optional[str] = None
+        self._en_cours = False
+
+    def start_run(self) -> None:
+        with self._lock:
+            self._en_cours = True
+            self._durees_en_cours = {}
+
+    @contextmanager
+    def step(self, nom: str):
+        """Chronomètre une étape du pipeline."""
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree = time.perf_counter() - debut
+            PIPELINE_STEP_SECONDS.observe(duree, etape=nom)
+            with self._lock:
+                self._durees_en_cours[nom] = duree
+
+    def finish_run(self, erreur: Optional[str] = None) -> None:
+        with self._lock:
+            self._en_cours = False
+            self._erreur = erreur
+            if erreur is None:
+                self._derniere_maj = datetime.now()
+                self._durees = dict(self._durees_en_cours)
+        PIPELINE_RUNS.inc(resultat="echec" if erreur else "succes")
+        if erreur is None:
+            PIPELINE_LAST_SUCCESS.set(time.time())
+
+    def snapshot(self) -> dict:
+        """
+        Copie cohérente de l'état, utilisable sans verrou par l'interface. La dernière mise à jour
+        est la plus récente entre l'exécution de ce processus et la dernière écriture dans la base
+        (pipeline exécuté par un autre processus).
+        """
+        with self._lock:
+            status = {
+                "derniere_maj": self._derniere_maj,
+                "durees": dict(self._durees),
+                "erreur": self._erreur,
+                "en_cours": self._en_cours,
+            }
+        ecriture = database_mtime()
+        if ecriture is not None:
+            ecriture = datetime.fromtimestamp(ecriture)
+            if status["derniere_maj"] is None or ecriture > status["derniere_maj"]:
+                status["derniere_maj"] = ecriture
+        return status
+
+
+pipeline_status = PipelineStatus()
+
+
+class RefreshScheduler:
+    """
+    Relance périodiquement le pipeline (téléchargement → nettoyage → base → graphiques)
+    dans un thread d'arrière-plan pendant que le serveur Dash tourne.
+
+    Args:
+        job: Fonction exécutant le pipeline complet (init_data)
+        interval (int): Délai en secondes entre deux rafraîchissements
+    """
+
+    def __init__(self, job: Callable[[], None], interval: int):
+        self.job = job
+        self.interval = interval
+        self._arret = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_now(self) -> bool:
+        """Exécute le pipeline immédiatement ; ignoré si un rafraîchissement est déjà en cours."""
+        if not self._run_lock.acquire(blocking=False):
+            print("Rafraîchissement déjà en cours, exécution ignorée.")
+            return False
+        try:
+            self.job()
+            return True
+        except Exception as e:
+            # Le serveur continue de servir les dernières données publiées
+            print(f"Erreur lors du rafraîchissement des données : {e}")
+            return False
+        finally:
+            self._run_lock.release()
+
+    def _boucle(self) -> None:
+        while not self._arret.wait(self.interval):
+            self.run_now()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._arret.clear()
+        self._thread = threading.Thread(target=self._boucle, name="velib-refresh", daemon=True)
+        self._thread.start()
+        print(f"Rafraîchissement automatique des données toutes les {self.interval} s.")
+
+    def stop(self) -> None:
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Colonnes dont un changement est enregistré dans l'historique (etats, disponibilites)
+TRACKED_COLUMNS = [
+    "bornettes_libres", "velos_disponibles", "velos_mecaniques", "velos_electriques",
+    "station_en_fonctionnement", "borne_paiement", "retour_possible",
+]
+
+# Valeur de la colonne champs pour le premier relevé d'une station
+NOUVELLE_STATION = "nouvelle_station"
+
+
+def _dates(series: pd.Series) -> pd.Series:
+    return pd.to_datetime(series, utc=True, format="ISO8601")
+
+
+def diff_snapshot(releves: pd.DataFrame, precedents: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare de nouveaux relevés au dernier état connu de chaque station (capture des changements).
+
+    Seuls les relevés plus récents que l'état connu sont conservés (un relevé déjà importé ou
+    plus ancien est ignoré). Chaque relevé est comparé au précédent de la même station : le
+    dernier état connu, ou le relevé antérieur du même fichier (archives de plusieurs instantanés).
+
+    Args:
+        releves (pd.DataFrame): Relevés de l'instantané (identifiant_station, actualisation_donnee
+            et TRACKED_COLUMNS)
+        precedents (pd.DataFrame): Dernier état connu (table latest_disponibilites)
+
+    Returns:
+        pd.DataFrame: relevés nouveaux triés par station et par date, avec la colonne champs :
+            colonnes modifiées séparées par des virgules, NOUVELLE_STATION pour le premier
+            relevé d'une station, vide si rien n'a changé
+    """
+    releves = releves.assign(_date=_dates(releves["actualisation_donnee"]))
+    precedents = precedents.assign(_date=_dates(precedents["actualisation_donnee"]))
+
+    # Relevés postérieurs au dernier état connu, sans doublon (station, date)
+    date_connue = releves[["identifiant_station"]].merge(
+        precedents[["identifiant_station", "_date"]], on="identifiant_station", how="left")["_date"].to_numpy()
+    nouveaux = releves[pd.isna(date_connue) | (releves["_date"].to_numpy() > date_connue)]
+    nouveaux = nouveaux.drop_duplicates(subset=["identifiant_station", "_date"], keep="last")
+
+    # Le dernier état connu précède tous les nouveaux relevés de sa station
+    stations = precedents[precedents["identifiant_station"].isin(nouveaux["identifiant_station"])]
+    suite = pd.concat([stations.assign(_connu=True), nouveaux.assign(_connu=False)], ignore_index=True)
+    suite = suite.sort_values(["identifiant_station", "_date"], kind="stable")
+
+    precedent = suite.groupby("identifiant_station", sort=False)[TRACKED_COLUMNS].shift(1)
+    premier = precedent.isna().all(axis=1).to_numpy()
+    modifie = (suite[TRACKED_COLUMNS].to_numpy() != precedent.to_numpy()) & ~precedent.isna().to_numpy()
+
+    # Liste des colonnes modifiées, construite colonne par colonne (sans boucle sur les lignes)
+    champs = np.full(len(suite), "", dtype=object)
+    for j, col in enumerate(TRACKED_COLUMNS):
+        champs = np.where(modifie[:, j], np.where(champs == "", col, champs + "," + col), champs)
+    champs = np.where(premier, NOUVELLE_STATION, champs)
+
+    suite = suite.assign(champs=champs)
+    return suite[~suite["_connu"].astype(bool)].drop(columns=["_date", "_connu"]).reset_index(drop=True)
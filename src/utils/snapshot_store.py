@@ -0,0 +1,86 @@
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Une ligne par station, champs de taille fixe (31 octets par station) :
+# les filtres du dashboard sont des opérations vectorisées sur ce tableau.
+SNAPSHOT_DTYPE = np.dtype([
+    ("latitude", "f8"),
+    ("longitude", "f8"),
+    ("commune", "i2"),                  # indice dans SnapshotStore.communes (-1 : inconnue)
+    ("capacite_station", "i2"),
+    ("bornettes_libres", "i2"),
+    ("velos_disponibles", "i2"),
+    ("velos_mecaniques", "i2"),
+    ("velos_electriques", "i2"),
+    ("station_en_fonctionnement", "?"),
+    ("borne_paiement", "?"),
+    ("retour_possible", "?"),
+])
+
+SNAPSHOT_QUERY = """
+    SELECT s.identifiant_station, s.nom_station, s.code_insee, c.nom_commune,
+           s.latitude, s.longitude, s.capacite_station,
+           l.bornettes_libres, l.velos_disponibles, l.velos_mecaniques, l.velos_electriques,
+           l.station_en_fonctionnement, l.borne_paiement, l.retour_possible,
+           l.actualisation_donnee
+    FROM latest_disponibilites AS l
+    JOIN stations AS s ON s.identifiant_station = l.identifiant_station
+    LEFT JOIN communes AS c ON c.code_insee = s.code_insee
+    ORDER BY s.identifiant_station
+"""
+
+
+class SnapshotStore:
+    """
+    État courant du réseau en mémoire, en lecture seule, partagé par tous les callbacks.
+
+    Les identifiants de stations et les communes sont remplacés par des indices entiers :
+    la station i est data[i], identifiants[i] et noms[i] ; data["commune"] renvoie à communes.
+    """
+    __slots__ = ("data", "identifiants", "noms", "communes", "noms_communes", "actualisation")
+
+    def __init__(self, data: np.ndarray, identifiants: Tuple[str, ...], noms: Tuple[str, ...],
+                 communes: Tuple[str, ...], noms_communes: Tuple[str, ...], actualisation: Optional[str] = None):
+        data.flags.writeable = False
+        self.data = data
+        self.identifiants = identifiants
+        self.noms = noms
+        self.communes = communes
+        self.noms_communes = noms_communes
+        self.actualisation = actualisation
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def non_fonctionnelles(self) -> np.ndarray:
+        """Indices des stations hors service."""
+        return np.flatnonzero(~self.data["station_en_fonctionnement"])
+
+
+def load_snapshot(conn: sqlite3.Connection) -> SnapshotStore:
+    """Construit le store à partir du dernier état de chaque station (une seule requête)."""
+    rows = conn.execute(SNAPSHOT_QUERY).fetchall()
+
+    communes: List[str] = []
+    noms_communes: List[str] = []
+    indice_commune: Dict[str, int] = {}
+    for row in rows:
+        code = row[2]
+        if code is not None and code not in indice_commune:
+            indice_commune[code] = len(communes)
+            communes.append(code)
+            noms_communes.append(row[3] or code)
+
+    data = np.array(
+        [(row[4], row[5], indice_commune.get(row[2], -1)) + tuple(row[6:14]) for row in rows],
+        dtype=SNAPSHOT_DTYPE,
+    )
+    return SnapshotStore(
+        data,
+        identifiants=tuple(row[0] for row in rows),
+        noms=tuple(row[1] for row in rows),
+        communes=tuple(communes),
+        noms_communes=tuple(noms_communes),
+        actualisation=max((row[14] for row in rows), default=None),
+    )
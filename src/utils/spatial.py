@@ -0,0 +1,219 @@
+import math
+import sqlite3
+from typing import List, Optional
+from flask import Flask, jsonify, request
+from src.utils.db import get_read_connection
+
+# Routes JSON des requêtes spatiales
+API_ROUTE = "/api/stations"
+
+# Recherche des plus proches stations : rayon initial (en degrés de latitude, ~550 m),
+# doublé tant que le nombre de stations demandé n'est pas atteint, jusqu'au rayon maximal (~57 km)
+RAYON_INITIAL_DEG = 0.005
+RAYON_MAX_DEG = 0.5
+KM_PAR_DEGRE = 111.32
+RAYON_TERRE_KM = 6371.0
+
+# Nombre maximal de stations renvoyées par une requête sur une zone
+MAX_STATIONS_BBOX = 5000
+MAX_NEAREST = 50
+
+# Vue de carte : en dessous de ce niveau de zoom, les stations sont regroupées sur une grille
+# dont les cellules mesurent environ CLUSTER_PIXELS pixels à l'écran (tuiles de TILE_SIZE pixels).
+# Le nombre de points renvoyés dépend de la taille de la vue, pas de celle du réseau.
+CLUSTER_MAX_ZOOM = 15
+CLUSTER_PIXELS = 60
+TILE_SIZE = 256
+
+STATION_COLUMNS = [
+    "identifiant_station", "nom_station", "latitude", "longitude", "capacite_station",
+    "velos_disponibles", "velos_mecaniques", "velos_electriques", "bornettes_libres",
+    "station_en_fonctionnement",
+]
+
+# Stations dont la position (index R-tree, puis coordonnées exactes) est dans la zone,
+# avec leur dernier état connu
+BBOX_QUERY = """
+    SELECT s.identifiant_station, s.nom_station, s.latitude, s.longitude, s.capacite_station,
+           l.velos_disponibles, l.velos_mecaniques, l.velos_electriques, l.bornettes_libres,
+           l.station_en_fonctionnement
+    FROM stations_rtree AS r
+    JOIN stations AS s ON s.rowid = r.id
+    JOIN latest_disponibilites AS l ON l.identifiant_station = s.identifiant_station
+    WHERE r.max_lat >= :sud AND r.min_lat <= :nord AND r.max_lon >= :ouest AND r.min_lon <= :est
+      AND s.latitude BETWEEN :sud AND :nord AND s.longitude BETWEEN :ouest AND :est
+      AND l.velos_electriques >= :min_electriques
+"""
+
+
+def _to_dicts(rows: list) -> List[dict]:
+    return [dict(zip(STATION_COLUMNS, row)) for row in rows]
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance (en km) entre deux points sur la sphère terrestre."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi, dlambda = phi2 - phi1, math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RAYON_TERRE_KM * math.asin(math.sqrt(a))
+
+
+def stations_in_bbox(sud: float, ouest: float, nord: float, est: float, min_electriques: int = 0,
+                     limit: int = MAX_STATIONS_BBOX, conn: Optional[sqlite3.Connection] = None) -> List[dict]:
+    """
+    Stations situées dans une zone (emprise d'une vue de carte), avec leur dernier état.
+
+    Args:
+        sud, ouest, nord, est (float): Bornes de la zone en degrés
+        min_electriques (int): Nombre minimal de vélos électriques disponibles
+        limit (int): Nombre maximal de stations renvoyées
+    """
+    conn = conn or get_read_connection()
+    rows = conn.execute(
+        BBOX_QUERY + " LIMIT :limit",
+        {"sud": sud, "nord": nord, "ouest": ouest, "est": est, "min_electriques": min_electriques, "limit": limit},
+    ).fetchall()
+    return _to_dicts(rows)
+
+
+def nearest_stations(lat: float, lon: float, n: int = 5, min_electriques: int = 0,
+                     conn: Optional[sqlite3.Connection] = None) -> List[dict]:
+    """
+    Les n stations les plus proches d'un point ayant au moins min_electriques vélos électriques.
+
+    La zone interrogée dans l'index R-tree est un carré autour du point, agrandi tant qu'il
+    ne contient pas n stations plus proches que son rayon : seules quelques dizaines de
+    stations sont lues, quelle que soit la taille du réseau.
+
+    Returns:
+        List[dict]: stations triées par distance, avec leur distance en mètres (distance_m)
+    """
+    conn = conn or get_read_connection()
+    # Un degré de longitude est plus court qu'un degré de latitude hors de l'équateur
+    facteur_lon = 1 / max(math.cos(math.radians(lat)), 0.01)
+    rayon = RAYON_INITIAL_DEG
+    while True:
+        rows = conn.execute(BBOX_QUERY, {
+            "sud": lat - rayon, "nord": lat + rayon,
+            "ouest": lon - rayon * facteur_lon, "est": lon + rayon * facteur_lon,
+            "min_electriques": min_electriques,
+        }).fetchall()
+        stations = _to_dicts(rows)
+        for station in stations:
+            station["distance_m"] = round(haversine_km(lat, lon, station["latitude"], station["longitude"]) * 1000)
+        stations.sort(key=lambda station: station["distance_m"])
+
+        # Les stations hors du carré sont plus loin que son rayon : le résultat est complet
+        rayon_m = rayon * KM_PAR_DEGRE * 1000
+        if (len(stations) >= n and stations[n - 1]["distance_m"] <= rayon_m) or rayon >= RAYON_MAX_DEG:
+            return stations[:n]
+        rayon *= 2
+
+
+# Regroupement des stations de la zone par cellule de grille (origine fixe : les groupes
+# ne changent pas quand la vue est déplacée). Le taux d'occupation d'un groupe est celui
+# de l'ensemble de ses bornettes.
+CLUSTER_QUERY = """
+    SELECT AVG(s.latitude), AVG(s.longitude), COUNT(*),
+           SUM(l.velos_disponibles), SUM(s.capacite_station)
+    FROM stations_rtree AS r
+    JOIN stations AS s ON s.rowid = r.id
+    JOIN latest_disponibilites AS l ON l.identifiant_station = s.identifiant_station
+    WHERE r.max_lat >= :sud AND r.min_lat <= :nord AND r.max_lon >= :ouest AND r.min_lon <= :est
+      AND s.latitude BETWEEN :sud AND :nord AND s.longitude BETWEEN :ouest AND :est
+    GROUP BY CAST((s.latitude + 90) / :cellule_lat AS INTEGER), CAST((s.longitude + 180) / :cellule_lon AS INTEGER)
+    LIMIT :limit
+"""
+
+
+def _taux(velos, capacite):
+    return round(min(velos * 100 / capacite, 100), 1) if capacite else None
+
+
+def viewport_stations(sud: float, ouest: float, nord: float, est: float, zoom: float,
+                      conn: Optional[sqlite3.Connection] = None) -> dict:
+    """
+    Points à afficher dans une vue de carte, sous forme de tableaux de colonnes (JSON compact).
+
+    Jusqu'au zoom CLUSTER_MAX_ZOOM, les stations sont regroupées côté serveur sur une grille
+    d'environ CLUSTER_PIXELS pixels ; au-delà, chaque station est renvoyée.
+
+    Returns:
+        dict: mode ("groupes" ou "stations"), lat, lon, taux (occupation en %), nb (stations
+        par point), velos, capacite, et en mode "stations" : id et nom
+    """
+    conn = conn or get_read_connection()
+    if zoom >= CLUSTER_MAX_ZOOM:
+        stations = stations_in_bbox(sud, ouest, nord, est, conn=conn)
+        return {
+            "mode": "stations",
+            "lat": [st["latitude"] for st in stations],
+            "lon": [st["longitude"] for st in stations],
+            "taux": [_taux(st["velos_disponibles"], st["capacite_station"]) for st in stations],
+            "nb": [1] * len(stations),
+            "velos": [st["velos_disponibles"] for st in stations],
+            "capacite": [st["capacite_station"] for st in stations],
+            "id": [st["identifiant_station"] for st in stations],
+            "nom": [st["nom_station"] for st in stations],
+        }
+
+    # Taille d'une cellule au niveau de zoom entier (grille stable pendant un zoom continu)
+    cellule_lon = CLUSTER_PIXELS * 360 / (TILE_SIZE * 2 ** max(int(zoom), 0))
+    cellule_lat = cellule_lon * math.cos(math.radians((sud + nord) / 2))
+    rows = conn.execute(CLUSTER_QUERY, {
+        "sud": sud, "nord": nord, "ouest": ouest, "est": est,
+        "cellule_lat": cellule_lat, "cellule_lon": cellule_lon, "limit": MAX_STATIONS_BBOX,
+    }).fetchall()
+    return {
+        "mode": "groupes",
+        "lat": [round(row[0], 5) for row in rows],
+        "lon": [round(row[1], 5) for row in rows],
+        "taux": [_taux(row[3], row[4]) for row in rows],
+        "nb": [row[2] for row in rows],
+        "velos": [row[3] for row in rows],
+        "capacite": [row[4] for row in rows],
+    }
+
+
+def _float_arg(nom: str) -> float:
+    valeur = request.args.get(nom, type=float)
+    if valeur is None or not math.isfinite(valeur):
+        raise ValueError(f"Paramètre « {nom} » manquant ou invalide")
+    return valeur
+
+
+def register_spatial_routes(server: Flask) -> None:
+    """
+    Routes JSON des requêtes spatiales :
+      - /api/stations/bbox?sud=&ouest=&nord=&est=[&min_electriques=]
+      - /api/stations/nearest?lat=&lon=[&n=&min_electriques=]
+      - /api/stations/viewport?sud=&ouest=&nord=&est=&zoom= (stations ou groupes, en colonnes)
+    """
+    def _reponse(requete):
+        try:
+            return jsonify(requete())
+        except ValueError as e:
+            return jsonify({"erreur": str(e)}), 400
+        except (FileNotFoundError, sqlite3.Error) as e:
+            return jsonify({"erreur": f"Données indisponibles : {e}"}), 503
+
+    @server.route(f"{API_ROUTE}/bbox")
+    def stations_bbox():
+        return _reponse(lambda: stations_in_bbox(
+            _float_arg("sud"), _float_arg("ouest"), _float_arg("nord"), _float_arg("est"),
+            min_electriques=request.args.get("min_electriques", 0, type=int),
+        ))
+
+    @server.route(f"{API_ROUTE}/nearest")
+    def stations_nearest():
+        return _reponse(lambda: nearest_stations(
+            _float_arg("lat"), _float_arg("lon"),
+            n=min(max(request.args.get("n", 5, type=int), 1), MAX_NEAREST),
+            min_electriques=request.args.get("min_electriques", 0, type=int),
+        ))
+
+    @server.route(f"{API_ROUTE}/viewport")
+    def stations_viewport():
+        return _reponse(lambda: viewport_stations(
+            _float_arg("sud"), _float_arg("ouest"), _float_arg("nord"), _float_arg("est"), _float_arg("zoom"),
+        ))
@@ -0,0 +1,172 @@
+import os
+import glob
+import gzip
+import json
+import hashlib
+import threading
+from typing import Dict, Iterable, Optional
+from flask import Flask, Response, abort, request
+from src.utils.atomic_write import atomic_path
+from config import assets_dir, static_dir
+
+try:
+    import brotli
+except ImportError:  # Optionnel : seules les versions gzip sont produites
+    brotli = None
+
+# Route des fichiers publiés (noms contenant l'empreinte du contenu : cache navigateur d'un an)
+STATIC_ROUTE = "/static-velib"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+
+# Encodages proposés, par ordre de préférence, et suffixe du fichier précompressé
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+_manifest_cache = {"mtime": None, "manifest": {}}
+_manifest_lock = threading.Lock()
+
+
+def manifest_path(dest_dir: str = static_dir) -> str:
+    return os.path.join(dest_dir, MANIFEST_NAME)
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+
+def _read_manifest(dest_dir: str) -> dict:
+    try:
+        with open(manifest_path(dest_dir), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def publish_static(sources: Iterable[str], dest_dir: str = static_dir) -> Dict[str, str]:
+    """
+    Publie des fichiers générés sous un nom contenant l'empreinte de leur contenu
+    (velib_occupation_map.<sha256>.html), accompagnés de versions gzip (et brotli si disponible).
+
+    Le manifeste (nom d'origine -> nom publié) est remplacé en dernier ; les fichiers
+    qui ne figurent ni dans le nouveau manifeste ni dans le précédent sont supprimés.
+
+    Returns:
+        Dict[str, str]: le nouveau manifeste
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    precedent = _read_manifest(dest_dir)
+    manifest = {}
+
+    for source in sources:
+        with open(source, "rb") as f:
+            contenu = f.read()
+        nom, extension = os.path.splitext(os.path.basename(source))
+        publie = f"{nom}.{hashlib.sha256(contenu).hexdigest()[:HASH_LENGTH]}{extension}"
+        cible = os.path.join(dest_dir, publie)
+
+        # Contenu identique déjà publié : rien à réécrire ni à recompresser
+        if not os.path.exists(cible):
+            _write_bytes(cible + ".gz", gzip.compress(contenu, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _write_bytes(cible + ".br", brotli.compress(contenu, quality=11))
+            _write_bytes(cible, contenu)
+        manifest[os.path.basename(source)] = publie
+
+    with atomic_path(manifest_path(dest_dir)) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+    # Les pages déjà ouvertes peuvent encore référencer la version précédente
+    conserves = set(manifest.values()) | set(precedent.values()) | {MANIFEST_NAME}
+    for path in glob.glob(os.path.join(dest_dir, "*")):
+        base = os.path.basename(path)
+        for _, suffixe in ENCODINGS:
+            if base.endswith(suffixe):
+                base = base[: -len(suffixe)]
+        if base not in conserves:
+            os.remove(path)
+
+    return manifest
+
+
+def publish_assets() -> Dict[str, str]:
+    """Étape du pipeline : publie la carte et les graphiques HTML du dossier assets."""
+    sources = sorted(glob.glob(os.path.join(assets_dir, "*.html")))
+    manifest = publish_static(sources)
+    print(f"{len(manifest)} fichier(s) publié(s) dans : {static_dir}")
+    return manifest
+
+
+def get_manifest(dest_dir: str = static_dir) -> dict:
+    """Manifeste courant, relu uniquement quand le fichier change."""
+    path = manifest_path(dest_dir)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    with _manifest_lock:
+        if _manifest_cache["mtime"] != mtime:
+            _manifest_cache["manifest"] = _read_manifest(dest_dir)
+            _manifest_cache["mtime"] = mtime
+        return _manifest_cache["manifest"]
+
+
+def static_url(filename: str) -> Optional[str]:
+    """URL de la version publiée d'un fichier, ou None s'il n'a pas été publié."""
+    publie = get_manifest().get(filename)
+    return f"{STATIC_ROUTE}/{publie}" if publie else None
+
+
+def _accepted_encodings(entete: str) -> set:
+    """Encodages acceptés d'un en-tête Accept-Encoding : tous sauf ceux refusés par q=0."""
+    acceptes = set()
+    for partie in entete.split(","):
+        nom, *parametres = [morceau.strip() for morceau in partie.split(";")]
+        qualite = 1.0
+        for parametre in parametres:
+            cle, _, valeur = parametre.partition("=")
+            if cle.strip().lower() == "q":
+                try:
+                    qualite = float(valeur)
+                except ValueError:
+                    qualite = 0.0
+        if nom and qualite > 0:
+            acceptes.add(nom.lower())
+    return acceptes
+
+
+def register_static_route(server: Flask, dest_dir: str = static_dir) -> None:
+    """
+    Sert les fichiers publiés : version précompressée choisie selon Accept-Encoding,
+    en-têtes de cache longs (nom immuable) et ETag pour les revalidations.
+    """
+    @server.route(f"{STATIC_ROUTE}/<path:filename>")
+    def velib_static(filename):
+        if filename not in set(get_manifest(dest_dir).values()):
+            abort(404)
+        chemin = os.path.join(dest_dir, filename)
+        etag = filename.rsplit(".", 2)[-2]
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers={"ETag": f'"{etag}"', "Cache-Control": CACHE_CONTROL})
+
+        encodage = None
+        acceptes = _accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        for nom, suffixe in ENCODINGS:
+            if nom in acceptes and os.path.exists(chemin + suffixe):
+                encodage, chemin = nom, chemin + suffixe
+                break
+        if not os.path.exists(chemin):
+            abort(404)
+
+        with open(chemin, "rb") as f:
+            contenu = f.read()
+        response = Response(contenu, mimetype="text/html" if filename.endswith(".html") else None)
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        response.headers["ETag"] = f'"{etag}"'
+        response.headers["Vary"] = "Accept-Encoding"
+        if encodage:
+            response.headers["Content-Encoding"] = encodage
+        return response
@@ -2,15 +2,21 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Tuple
 from datetime import datetime
 
+# Valeurs textuelles interprétées comme "vrai" pour les champs booléens
+VALEURS_VRAIES = ("true", "1", "oui", "yes", "y")
+
+# Plus grand entier accepté : colonnes INTEGER de SQLite (64 bits signés)
+ENTIER_MAX = 2 ** 63 - 1
+
 class VelibStation(BaseModel):
     identifiant_station: str = Field(..., alias="Identifiant station")
     nom_station: str = Field(..., alias="Nom station")
     station_en_fonctionnement: bool = Field(..., alias="Station en fonctionnement")
-    capacite_station: int = Field(..., alias="Capacité de la station", ge=0)
-    bornettes_libres: int = Field(..., alias="Nombre bornettes libres", ge=0)
-    velos_disponibles: int = Field(..., alias="Nombre total vélos disponibles", ge=0)
-    velos_mecaniques: int = Field(..., alias="Vélos mécaniques disponibles", ge=0)
-    velos_electriques: int = Field(..., alias="Vélos électriques disponibles", ge=0)
+    capacite_station: int = Field(..., alias="Capacité de la station", ge=0, le=ENTIER_MAX)
+    bornettes_libres: int = Field(..., alias="Nombre bornettes libres", ge=0, le=ENTIER_MAX)
+    velos_disponibles: int = Field(..., alias="Nombre total vélos disponibles", ge=0, le=ENTIER_MAX)
+    velos_mecaniques: int = Field(..., alias="Vélos mécaniques disponibles", ge=0, le=ENTIER_MAX)
+    velos_electriques: int = Field(..., alias="Vélos électriques disponibles", ge=0, le=ENTIER_MAX)
     borne_paiement: bool = Field(..., alias="Borne de paiement disponible")
     retour_possible: bool = Field(..., alias="Retour vélib possible")
     actualisation_donnee: datetime = Field(..., alias="Actualisation de la donnée")
@@ -24,7 +30,7 @@ class VelibStation(BaseModel):
     def to_bool(cls, v):
         if isinstance(v, str):
             v = v.strip().lower()
-            return v in ["true", "1", "oui", "yes", "y"]
+            return v in VALEURS_VRAIES
         return bool(v)
 
     @field_validator("coordonnees_geographiques",mode="before")
@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple, get_args
+from datetime import datetime
+from pydantic import ValidationError
+from src.utils.velib_station import VelibStation, VALEURS_VRAIES
+
+# Entiers sous forme de texte acceptés par Pydantic ("4", " +4 ", "4.00", "1_000")
+ENTIER_TEXTE = r"^\s*[+-]?\d+(?:_\d+)*(?:\.0+)?\s*$"
+# Au-delà, un entier n'est plus représenté exactement en float64
+ENTIER_FLOAT_EXACT = 2 ** 53
+
+COLONNES_REJETS = ["ligne", "identifiant_station", "champ", "valeur", "erreur"]
+
+
+def _est_texte(serie: pd.Series) -> pd.Series:
+    """Masque des valeurs de type str (les seules que les validateurs "before" transforment)."""
+    if pd.api.types.is_object_dtype(serie.dtype):
+        return serie.map(lambda v: isinstance(v, str)).astype(bool)
+    if pd.api.types.is_string_dtype(serie.dtype):
+        return serie.notna()
+    return pd.Series(False, index=serie.index)
+
+
+def _erreurs(index, invalide, message) -> pd.Series:
+    """Série de messages d'erreur (None pour les valeurs valides)."""
+    invalide = np.broadcast_to(np.asarray(invalide, dtype=bool), (len(index),))
+    return pd.Series(np.where(invalide, message, None), index=index, dtype=object)
+
+
+def _valider_texte(serie: pd.Series, obligatoire: bool):
+    texte = _est_texte(serie)
+    absent = serie.isna()
+    if obligatoire:
+        message = np.where(absent, "Valeur manquante", "Doit être une chaîne de caractères")
+        return serie, _erreurs(serie.index, ~texte, message)
+    valeurs = serie.astype(object).where(~absent, None)
+    return valeurs, _erreurs(serie.index, ~texte & ~absent, "Doit être une chaîne de caractères")
+
+
+def _valider_booleen(serie: pd.Series):
+    """Équivalent vectorisé de VelibStation.to_bool (aucune valeur n'est rejetée)."""
+    texte = _est_texte(serie)
+    valeurs = pd.Series(False, index=serie.index)
+    if texte.any():
+        valeurs[texte] = serie[texte].astype(str).str.strip().str.lower().isin(VALEURS_VRAIES)
+    if (~texte).any():
+        # bool(v) : NaN est considéré comme vrai, None comme faux
+        valeurs[~texte] = serie[~texte].astype(object).map(bool).astype(bool)
+    return valeurs, _erreurs(serie.index, False, None)
+
+
+def _entier_exact(valeur) -> int:
+    """Valeur exacte d'un entier (texte conforme à ENTIER_TEXTE ou nombre sans partie décimale)."""
+    if isinstance(valeur, str):
+        return int(valeur.strip().replace("_", "").split(".")[0])
+    return int(valeur)
+
+
+def _valider_entier(serie: pd.Series, minimum: Optional[int], maximum: Optional[int]):
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        nombres = serie.astype("float64")
+    else:
+        texte = _est_texte(serie)
+        nombres = pd.to_numeric(serie.where(~texte), errors="coerce").astype("float64")
+        if texte.any():
+            chaines = serie[texte].astype(str)
+            format_ok = chaines.str.match(ENTIER_TEXTE)
+            nombres[texte] = pd.to_numeric(
+                chaines.where(format_ok).str.replace("_", "", regex=False).str.strip(),
+                errors="coerce",
+            )
+    entier = (np.isfinite(nombres) & (nombres == np.floor(nombres))).to_numpy()
+    bornes = nombres.to_numpy(dtype=object)
+    # Grands entiers : bornes comparées et valeurs conservées sur la valeur exacte, pas sur le float64
+    grands = entier & (np.abs(nombres.to_numpy()) >= ENTIER_FLOAT_EXACT)
+    bornes[grands] = [_entier_exact(valeur) for valeur in serie[grands]]
+
+    message = np.full(len(serie), None, dtype=object)
+    message[~entier] = "Doit être un entier"
+    trop_petit = np.zeros(len(serie), dtype=bool)
+    trop_grand = np.zeros(len(serie), dtype=bool)
+    if minimum is not None:
+        trop_petit[entier] = (bornes[entier] < minimum).astype(bool)
+        message[trop_petit] = f"Doit être supérieur ou égal à {minimum}"
+    if maximum is not None:
+        # Sans ce contrôle, le cast en int64 transformerait la valeur en INT64_MIN
+        trop_grand[entier] = (bornes[entier] > maximum).astype(bool)
+        message[trop_grand] = f"Doit être inférieur ou égal à {maximum}"
+    hors_bornes = trop_petit | trop_grand
+
+    valeurs = nombres.where(entier & ~grands, 0).astype("int64")
+    conserves = grands & ~hors_bornes
+    valeurs[conserves] = bornes[conserves].astype("int64")
+    return valeurs, pd.Series(message, index=serie.index, dtype=object)
+
+
+def _valider_date(serie: pd.Series):
+    """
+    Équivalent de VelibStation.parse_datetime : datetime.fromisoformat, appliqué une fois
+    par valeur distincte (une date d'actualisation par station), pour accepter exactement
+    les mêmes formats que Pydantic (semaines ISO, virgule décimale...).
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return serie, _erreurs(serie.index, serie.isna(), "Format de date invalide")
+    texte = _est_texte(serie)
+    chaines = serie.where(texte)
+    analysees = {valeur: _date_iso(valeur) for valeur in chaines.dropna().unique()}
+    dates = chaines.map(analysees).astype(object).where(texte, None)
+    try:
+        # Même décalage horaire partout : colonne datetime64
+        dates = pd.to_datetime(dates)
+    except (ValueError, TypeError):
+        # Décalages horaires différents dans le même fichier : chaque date garde le sien
+        dates = dates.where(dates.notna(), pd.NaT)
+    return dates, _erreurs(serie.index, dates.isna(), "Format de date invalide")
+
+
+def _date_iso(valeur: str):
+    try:
+        return datetime.fromisoformat(valeur)
+    except ValueError:
+        return None
+
+
+def _float(valeur) -> bool:
+    """Vrai si float() accepte la valeur (règle de VelibStation.parse_coords)."""
+    try:
+        float(valeur)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _valider_coordonnees(serie: pd.Series):
+    """Équivalent vectorisé de VelibStation.parse_coords, renvoie le texte "(lat, lon)"."""
+    texte = _est_texte(serie)
+    chaines = serie.where(texte).astype(object)
+    parties = chaines.str.replace(r"[()]", "", regex=True).str.split(",", n=2, expand=True)
+    parties = parties.reindex(columns=[0, 1])
+    nombres = []
+    for position in (0, 1):
+        partie = parties[position].astype(object).str.strip()
+        nombre = pd.to_numeric(partie, errors="coerce")
+        # Textes que float() accepte mais pas to_numeric ("nan", "1_0"...) : vérifiés un par un
+        valide = nombre.notna()
+        a_verifier = ~valide & partie.notna()
+        valide[a_verifier] = partie[a_verifier].map(_float).astype(bool)
+        # Conversion exacte comme float() (to_numeric arrondit parfois le dernier chiffre)
+        nombre[valide] = partie[valide].to_numpy(dtype=object).astype("float64")
+        nombres.append((nombre, valide))
+    (latitude, lat_ok), (longitude, lon_ok) = nombres
+    valide = texte & lat_ok & lon_ok
+    # str() de Python, comme le tuple de Pydantic ("nan" inclus : astype(str) le laisse manquant)
+    valeurs = "(" + latitude.astype(object).map(str) + ", " + longitude.astype(object).map(str) + ")"
+    return valeurs, _erreurs(serie.index, ~valide, "Coordonnées invalides")
+
+
+def _valider_colonne(serie: pd.Series, champ):
+    annotation = champ.annotation
+    if annotation is bool:
+        return _valider_booleen(serie)
+    if annotation is int:
+        minimum = next((m.ge for m in champ.metadata if hasattr(m, "ge")), None)
+        maximum = next((m.le for m in champ.metadata if hasattr(m, "le")), None)
+        return _valider_entier(serie, minimum, maximum)
+    if annotation is datetime:
+        return _valider_date(serie)
+    if annotation is str or str in get_args(annotation):
+        return _valider_texte(serie, champ.is_required())
+    return _valider_coordonnees(serie)
+
+
+def _frame_rejets(lignes: list) -> pd.DataFrame:
+    rejets = pd.DataFrame(lignes, columns=COLONNES_REJETS)
+    return rejets.sort_values(["ligne", "champ"], kind="stable").reset_index(drop=True)
+
+
+def validate_velib_frame(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Valide un DataFrame brut colonne par colonne avec les règles de VelibStation.
+
+    Les contraintes (ge=0, to_bool, parse_coords, dates ISO) sont appliquées
+    en opérations pandas/NumPy groupées au lieu d'un modèle Pydantic par ligne.
+
+    Args:
+        df (pd.DataFrame): Données brutes (colonnes nommées par les alias du modèle)
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: les lignes valides au format de
+        model_dump(by_alias=True), et une ligne de rejet par champ invalide.
+    """
+    colonnes = {}
+    invalides = pd.Series(False, index=df.index)
+    lignes_rejets = []
+    identifiants = df.get("Identifiant station", pd.Series(None, index=df.index, dtype=object))
+
+    for champ in VelibStation.model_fields.values():
+        alias = champ.alias
+        if alias in df.columns:
+            valeurs, erreurs = _valider_colonne(df[alias], champ)
+        else:
+            valeurs = pd.Series(None, index=df.index, dtype=object)
+            erreurs = _erreurs(df.index, champ.is_required(), "Champ manquant")
+        colonnes[alias] = valeurs
+
+        en_erreur = erreurs.notna()
+        if en_erreur.any():
+            invalides |= en_erreur
+            source = df[alias] if alias in df.columns else pd.Series(None, index=df.index, dtype=object)
+            lignes_rejets.extend(zip(
+                (df.index[en_erreur] + 1).tolist(),
+                identifiants[en_erreur].tolist(),
+                [alias] * int(en_erreur.sum()),
+                source[en_erreur].astype(str).tolist(),
+                erreurs[en_erreur].tolist(),
+            ))
+
+    valid_df = pd.DataFrame(colonnes, index=df.index)[~invalides].reset_index(drop=True)
+    return valid_df, _frame_rejets(lignes_rejets)
+
+
+def validate_velib_rows(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Validation ligne par ligne avec le modèle Pydantic VelibStation (chemin de référence).
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: même format que validate_velib_frame.
+    """
+    valid_rows = []
+    lignes_rejets = []
+
+    for idx, row in df.iterrows():
+        try:
+            record = VelibStation(**row.to_dict())
+            valid_rows.append(record.model_dump(by_alias=True))
+        except ValidationError as e:
+            for erreur in e.errors():
+                champ = erreur["loc"][0] if erreur["loc"] else None
+                lignes_rejets.append((
+                    idx + 1, row.get("Identifiant station"), champ,
+                    str(row.get(champ)), erreur["msg"],
+                ))
+        except Exception as e:
+            lignes_rejets.append((idx + 1, row.get("Identifiant station"), None, None, str(e)))
+
+    return pd.DataFrame(valid_rows), _frame_rejets(lignes_rejets)
@@ -0,0 +1,17 @@
+"""
+Configuration commune des tests : les données et fichiers générés sont redirigés vers un
+dossier temporaire (variables lues par config.py) avant tout import du projet.
+"""
+import os
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+_tmp_dir = tempfile.mkdtemp(prefix="velib_tests_")
+os.environ.setdefault("VELIB_DATA_DIR", os.path.join(_tmp_dir, "data"))
+os.environ.setdefault("VELIB_ASSETS_DIR", os.path.join(_tmp_dir, "assets"))
+
+# Fichier brut versionné avec le projet (jeu de données réel pour les tests de parité)
+RAW_FIXTURE_PATH = os.path.join(PROJECT_ROOT, "data", "rawdata", "velib_disponibilite.csv")
@@ -0,0 +1,31 @@
+import os
+from config import project_root
+from src.utils.build_cache import BuildCache, project_sources
+
+
+def _noms(module):
+    return {os.path.relpath(path, project_root) for path in project_sources(module)}
+
+
+def test_regles_de_validation_dans_le_code_du_nettoyage():
+    noms = _noms("src.utils.CleanData_CSV")
+    assert {"src/utils/CleanData_CSV.py", "src/utils/velib_validation.py", "src/utils/velib_station.py"} <= noms
+    assert all(not nom.startswith("..") for nom in noms)
+
+
+def test_capture_des_changements_dans_le_code_de_la_base():
+    assert "src/utils/snapshot_diff.py" in _noms("src.utils.Create_DataBase")
+
+
+def test_imports_dans_les_fonctions_suivis():
+    # generate_assets importe Histogramme et Map ; data_cache importe Histogramme dans une fonction
+    assert {"src/utils/Histogramme.py", "src/utils/Map.py"} <= _noms("src.utils.generate_assets")
+    assert "src/utils/Histogramme.py" in _noms("src.utils.data_cache")
+
+
+def test_empreinte_change_avec_une_version(tmp_path):
+    cache = BuildCache(state_path=str(tmp_path / "etat.json"))
+    fichier = tmp_path / "entree.csv"
+    fichier.write_text("a", encoding="utf-8")
+    assert cache.fingerprint([str(fichier)], ["1"]) == cache.fingerprint([str(fichier)], ["1"])
+    assert cache.fingerprint([str(fichier)], ["1"]) != cache.fingerprint([str(fichier)], ["2"])
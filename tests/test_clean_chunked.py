@@ -0,0 +1,22 @@
+import pandas as pd
+from config import cleandata_path, rejectdata_path
+from src.utils.CleanData_CSV import clean_velib_csv_chunked
+from tests.conftest import RAW_FIXTURE_PATH
+
+
+def test_en_tete_ecrit_si_premier_bloc_rejete(tmp_path):
+    # 20 lignes en blocs de 10 : toutes les lignes du premier bloc sont invalides
+    brut = pd.read_csv(RAW_FIXTURE_PATH, sep=";", dtype=str).head(20)
+    brut.loc[:9, "Capacité de la station"] = "-1"
+    source = tmp_path / "velib_brut.csv"
+    brut.to_csv(source, sep=";", index=False)
+
+    totaux = clean_velib_csv_chunked(str(source), chunksize=10, target="csv")
+
+    assert totaux == {"lues": 20, "conservees": 10, "rejetees": 10}
+    with open(cleandata_path, encoding="utf-8") as f:
+        assert f.readline().startswith("Identifiant station,")
+    nettoye = pd.read_csv(cleandata_path)
+    assert len(nettoye) == 10
+    assert nettoye["Identifiant station"].astype(str).tolist() == brut["Identifiant station"].iloc[10:].tolist()
+    assert len(pd.read_csv(rejectdata_path)) == 10
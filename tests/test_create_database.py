@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+from src.utils.CleanData_CSV import read_raw_velib_csv
+from src.utils.Create_DataBase import create_schema, ingest_snapshot, split_coordinates
+from src.utils.db import connect, database_version
+from src.utils.velib_validation import validate_velib_frame
+from tests.conftest import RAW_FIXTURE_PATH
+
+
+@pytest.fixture
+def instantanes():
+    """Deux instantanés successifs : le second ne modifie que trois stations."""
+    premier, _ = validate_velib_frame(read_raw_velib_csv(RAW_FIXTURE_PATH).head(50))
+    premier = split_coordinates(premier)
+    dates = pd.to_datetime(premier["Actualisation de la donnée"].astype(str), format="ISO8601")
+    second = premier.assign(**{"Actualisation de la donnée": (dates + pd.Timedelta(minutes=10)).astype(str)})
+    second.loc[second.index[:3], "Nombre total vélos disponibles"] += 1
+    second.loc[second.index[:3], "Vélos mécaniques disponibles"] += 1
+    return premier, second
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = connect(str(tmp_path / "velib.db"))
+    create_schema(conn)
+    yield conn
+    conn.close()
+
+
+def test_distributions_comptent_tous_les_releves(conn, instantanes):
+    for instantane in instantanes:
+        ingest_snapshot(conn, instantane)
+    releves = pd.concat(instantanes)
+
+    # L'historique ne garde que les changements...
+    assert conn.execute("SELECT COUNT(*) FROM disponibilites").fetchone()[0] == len(instantanes[0]) + 3
+    # ...mais les histogrammes comptent chaque relevé
+    for colonne, source in [("velos_disponibles", "Nombre total vélos disponibles"),
+                            ("velos_mecaniques", "Vélos mécaniques disponibles"),
+                            ("velos_electriques", "Vélos électriques disponibles")]:
+        comptes = dict(conn.execute(
+            "SELECT valeur, nb_releves FROM distribution_releves WHERE colonne = ?", (colonne,)).fetchall())
+        assert comptes == releves[source].astype(int).value_counts().to_dict()
+
+    grille = {(c, v): n for c, v, n in conn.execute(
+        "SELECT capacite_station, velos_disponibles, nb_releves FROM distribution_capacite_velos")}
+    attendu = releves[releves["Capacité de la station"] > 0].groupby(
+        ["Capacité de la station", "Nombre total vélos disponibles"]).size()
+    assert grille == {(int(c), int(v)): n for (c, v), n in attendu.items()}
+
+
+def test_distributions_reconstruites_depuis_l_historique(conn, instantanes):
+    ingest_snapshot(conn, instantanes[0])
+    avant = conn.execute("SELECT * FROM distribution_releves ORDER BY 1, 2").fetchall()
+    with conn:
+        conn.execute("DELETE FROM distribution_releves")
+        conn.execute("DELETE FROM distribution_capacite_velos")
+    create_schema(conn)
+    assert conn.execute("SELECT * FROM distribution_releves ORDER BY 1, 2").fetchall() == avant
+
+
+def test_version_de_la_base_independante_du_journal(tmp_path, instantanes):
+    path = str(tmp_path / "velib.db")
+    conn = connect(path)
+    create_schema(conn)
+    ingest_snapshot(conn, instantanes[0])
+    conn.close()
+    version = database_version(path)
+
+    # Un lecteur recrée le journal WAL, puis il est reporté dans la base : même version
+    lecteur = connect(path, readonly=True)
+    lecteur.execute("SELECT COUNT(*) FROM stations").fetchone()
+    lecteur.close()
+    assert database_version(path) == version
+
+    conn = connect(path)
+    ingest_snapshot(conn, instantanes[1])
+    conn.close()
+    assert database_version(path) != version
@@ -0,0 +1,135 @@
+import os
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from src.utils import get_data
+from src.utils.get_data import download_velib_csv
+
+CONTENU = "Identifiant station;Nom station\n" + "".join(f"{i};Station {i}\n" for i in range(5000))
+ETAG = '"v1"'
+LAST_MODIFIED = "Sat, 15 Nov 2025 09:00:00 GMT"
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serveur local remplaçant data.gouv.fr ; le comportement est choisi par le chemin demandé."""
+    requetes = []
+
+    def log_message(self, *args):
+        pass
+
+    def _envoyer(self, corps: bytes, longueur: int = None):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(longueur or len(corps)))
+        self.send_header("ETag", ETAG)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def do_GET(self):
+        StandIn.requetes.append((self.path, dict(self.headers)))
+        corps = CONTENU.encode("utf-8")
+        if self.path == "/csv":
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self._envoyer(corps)
+        elif self.path == "/absent":
+            self.send_error(404)
+        elif self.path == "/coupe":
+            # Premier appel : corps tronqué puis connexion fermée ; ensuite le fichier complet
+            if sum(path == "/coupe" for path, _ in StandIn.requetes) == 1:
+                self._envoyer(corps[: len(corps) // 2], longueur=len(corps))
+                self.close_connection = True
+            else:
+                self._envoyer(corps)
+
+
+@pytest.fixture(scope="module")
+def serveur():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def sans_attente(monkeypatch):
+    StandIn.requetes = []
+    monkeypatch.setattr(get_data, "BACKOFF", 0)
+
+
+def _lire(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def test_etag_last_modified_304(serveur, tmp_path):
+    dest = str(tmp_path / "velib.csv")
+    assert download_velib_csv(f"{serveur}/csv", dest, session=requests.Session()) is True
+    assert _lire(dest) == CONTENU
+    with open(dest + ".meta.json", encoding="utf-8") as f:
+        assert json.load(f) == {"etag": ETAG, "last_modified": LAST_MODIFIED}
+
+    # Second appel conditionnel : 304, fichier conservé
+    assert download_velib_csv(f"{serveur}/csv", dest, session=requests.Session()) is False
+    _, entetes = StandIn.requetes[-1]
+    assert entetes["If-None-Match"] == ETAG
+    assert entetes["If-Modified-Since"] == LAST_MODIFIED
+    assert _lire(dest) == CONTENU
+
+
+def test_404_conserve_le_fichier_precedent(serveur, tmp_path):
+    dest = str(tmp_path / "velib.csv")
+    download_velib_csv(f"{serveur}/csv", dest, session=requests.Session())
+    meta_avant = _lire(dest + ".meta.json")
+
+    with pytest.raises(requests.HTTPError):
+        download_velib_csv(f"{serveur}/absent", dest, session=requests.Session())
+    assert _lire(dest) == CONTENU
+    assert _lire(dest + ".meta.json") == meta_avant
+    assert sorted(os.listdir(tmp_path)) == ["velib.csv", "velib.csv.meta.json"]
+
+
+def test_flux_coupe_nouvelle_tentative_et_renommage_atomique(serveur, tmp_path):
+    dest = str(tmp_path / "velib.csv")
+    with open(dest, "w", encoding="utf-8") as f:
+        f.write("ancien contenu\n")
+
+    assert download_velib_csv(f"{serveur}/coupe", dest, session=requests.Session(), conditional=False) is True
+    # Deux requêtes : la coupure a été retentée
+    assert [path for path, _ in StandIn.requetes] == ["/coupe", "/coupe"]
+    # Fichier complet renommé en place, aucun fichier temporaire partiel laissé
+    assert _lire(dest) == CONTENU
+    assert sorted(os.listdir(tmp_path)) == ["velib.csv", "velib.csv.meta.json"]
+
+
+def test_flux_coupe_l_ancien_fichier_reste_intact_pendant_l_echec(serveur, tmp_path, monkeypatch):
+    dest = str(tmp_path / "velib.csv")
+    with open(dest, "w", encoding="utf-8") as f:
+        f.write("ancien contenu\n")
+    monkeypatch.setattr(get_data, "MAX_TENTATIVES", 1)
+
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        download_velib_csv(f"{serveur}/coupe", dest, session=requests.Session(), conditional=False)
+    assert _lire(dest) == "ancien contenu\n"
+    assert os.listdir(tmp_path) == ["velib.csv"]
+
+
+def test_serveur_injoignable_sans_nouvelle_tentative(tmp_path, monkeypatch):
+    attentes = []
+    monkeypatch.setattr(get_data.time, "sleep", attentes.append)
+    # Port libéré aussitôt réservé : connexion refusée
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/csv"
+    httpd.server_close()
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        download_velib_csv(url, str(tmp_path / "velib.csv"), session=requests.Session())
+    # Une seule couche de nouvelles tentatives (celle de get_session), pas la boucle du corps
+    assert attentes == []
@@ -0,0 +1,40 @@
+import os
+import time
+from datetime import datetime
+import pytest
+from config import db_path
+from src.utils.metrics import registry
+from src.utils.scheduler import PipelineStatus
+
+
+@pytest.fixture
+def base_ecrite():
+    """Base écrite par un autre processus (main.py --pipeline-only), il y a une minute."""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    with open(db_path, "wb"):
+        pass
+    ecriture = time.time() - 60
+    os.utime(db_path, (ecriture, ecriture))
+    yield ecriture
+    os.remove(db_path)
+
+
+def test_sans_base_ni_execution():
+    assert PipelineStatus().snapshot()["derniere_maj"] is None
+
+
+def test_derniere_maj_lue_sur_la_base(base_ecrite):
+    status = PipelineStatus().snapshot()
+    assert status["derniere_maj"] == datetime.fromtimestamp(base_ecrite)
+    assert status["durees"] == {}
+
+
+def test_execution_locale_plus_recente(base_ecrite):
+    status = PipelineStatus()
+    status.start_run()
+    status.finish_run()
+    assert status.snapshot()["derniere_maj"] > datetime.fromtimestamp(base_ecrite)
+
+
+def test_metrique_visible_par_chaque_processus(base_ecrite):
+    assert f"velib_data_last_update_timestamp_seconds {base_ecrite}" in registry.render()
@@ -0,0 +1,41 @@
+import gzip
+import pytest
+from flask import Flask
+from src.utils.static_assets import STATIC_ROUTE, _accepted_encodings, publish_static, register_static_route
+
+
+@pytest.mark.parametrize("entete, attendu", [
+    ("gzip, br", {"gzip", "br"}),
+    ("gzip;q=0.8, br;q=0.9", {"gzip", "br"}),
+    ("gzip; q=0.5, identity", {"gzip", "identity"}),
+    ("gzip;q=0, br", {"br"}),
+    ("gzip;q=0.0, br;q=0.000", set()),
+    ("", set()),
+])
+def test_encodages_acceptes(entete, attendu):
+    assert _accepted_encodings(entete) == attendu
+
+
+@pytest.fixture
+def client(tmp_path):
+    source = tmp_path / "carte.html"
+    source.write_text("<html>" + "vélib " * 5000 + "</html>", encoding="utf-8")
+    dest_dir = str(tmp_path / "static")
+    publie = publish_static([str(source)], dest_dir)["carte.html"]
+    app = Flask(__name__)
+    register_static_route(app, dest_dir)
+    return app.test_client(), f"{STATIC_ROUTE}/{publie}", source.read_bytes()
+
+
+def test_gzip_servi_avec_une_qualite_inferieure_a_1(client):
+    client, url, contenu = client
+    response = client.get(url, headers={"Accept-Encoding": "gzip;q=0.8, br;q=0.9"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data) == contenu
+
+
+def test_gzip_refuse(client):
+    client, url, contenu = client
+    response = client.get(url, headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data == contenu
@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+from src.utils.CleanData_CSV import read_raw_velib_csv
+from src.utils.velib_validation import validate_velib_frame, validate_velib_rows
+from tests.conftest import RAW_FIXTURE_PATH
+
+
+@pytest.fixture(scope="module")
+def brut():
+    return read_raw_velib_csv(RAW_FIXTURE_PATH)
+
+
+def assert_parity(df: pd.DataFrame) -> None:
+    """Mêmes lignes acceptées, mêmes champs rejetés et mêmes valeurs produites par les deux chemins."""
+    valid_vec, rejets_vec = validate_velib_frame(df)
+    valid_pyd, rejets_pyd = validate_velib_rows(df)
+
+    assert set(zip(rejets_vec["ligne"], rejets_vec["champ"])) == set(zip(rejets_pyd["ligne"], rejets_pyd["champ"]))
+    assert len(valid_vec) == len(valid_pyd)
+    if valid_pyd.empty:
+        return
+    valid_vec = valid_vec[valid_pyd.columns]
+    for colonne in valid_pyd.columns:
+        # Texte écrit dans le CSV nettoyé : dates avec leur décalage horaire, coordonnées "(lat, lon)"
+        attendu = valid_pyd[colonne].astype(object).where(valid_pyd[colonne].notna(), None).map(str)
+        obtenu = valid_vec[colonne].astype(object).where(valid_vec[colonne].notna(), None).map(str)
+        assert obtenu.tolist() == attendu.tolist(), colonne
+
+
+def test_parite_fichier_brut(brut):
+    assert_parity(brut.head(200))
+
+
+# Une valeur invalide (ou limite) par règle du modèle VelibStation
+PERTURBATIONS = [
+    ("Capacité de la station", -1),
+    ("Nombre bornettes libres", "4.5"),
+    ("Coordonnées géographiques", "48.85"),
+    ("Actualisation de la donnée", "15/11/2025 09:00"),
+    ("Nom station", None),
+    ("Vélos électriques disponibles", "1_000"),
+    ("Station en fonctionnement", None),
+    ("Nombre total vélos disponibles", float("nan")),
+    # Hors de la plage des entiers SQLite (64 bits), puis à sa limite exacte
+    ("Capacité de la station", "99999999999999999999"),
+    ("Capacité de la station", "9223372036854775808"),
+    ("Nombre bornettes libres", "9223372036854775807"),
+    ("Nombre bornettes libres", "9_007_199_254_740_993"),
+    # Formats acceptés par float() et datetime.fromisoformat mais pas par pandas, et inversement
+    ("Coordonnées géographiques", "(4_8.85, 2.35)"),
+    ("Coordonnées géographiques", "(nan, inf)"),
+    ("Actualisation de la donnée", "2025-W46-6"),
+    ("Actualisation de la donnée", "2025-11-15T09:00:00,5+01:00"),
+    ("Actualisation de la donnée", "2025-11"),
+    ("Actualisation de la donnée", " 2025-11-15T09:00:00+01:00"),
+]
+
+
+@pytest.mark.parametrize("colonne, valeur", PERTURBATIONS)
+def test_parite_valeur_perturbee(brut, colonne, valeur):
+    perturbe = brut.head(20).astype(object).copy()
+    perturbe.loc[3, colonne] = valeur
+    assert_parity(perturbe)
+
+
+def test_parite_jeu_perturbe(brut):
+    perturbe = brut.head(20).astype(object).copy()
+    for ligne, (colonne, valeur) in enumerate(PERTURBATIONS):
+        perturbe.loc[ligne, colonne] = valeur
+    assert_parity(perturbe)
+
+
+def test_parite_decalages_horaires_mixtes(brut):
+    """Dates avec des décalages différents dans le même fichier (changement d'heure, sources mêlées)."""
+    mixte = brut.head(20).astype(object).copy()
+    mixte.loc[0, "Actualisation de la donnée"] = "2025-11-15T10:04:57+01:00"
+    mixte.loc[1, "Actualisation de la donnée"] = "2025-03-30T03:00:00+02:00"
+    mixte.loc[2, "Actualisation de la donnée"] = "2025-11-15T09:04:57Z"
+    assert_parity(mixte)
+
+    # Une date invalide parmi des décalages mixtes est rejetée par les deux chemins
+    mixte.loc[3, "Actualisation de la donnée"] = "15/11/2025 09:00"
+    assert_parity(mixte)
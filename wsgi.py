@@ -0,0 +1,16 @@
+"""
+Point d'entrée de production pour un serveur WSGI multi-processus, par exemple :
+
+    gunicorn -w 4 -b 0.0.0.0:8050 wsgi:server
+
+Chaque worker sert les données déjà construites (comme main.py --serve-only), avec son propre
+cache de figures et ses propres connexions SQLite de lecture : rien n'est partagé entre processus.
+La date de dernière mise à jour affichée est celle de la dernière écriture dans la base ;
+les métriques du pipeline (/metrics) restent dans le processus qui l'exécute.
+Le pipeline s'exécute à part, par exemple toutes les heures depuis cron :
+
+    python main.py --pipeline-only
+"""
+from main import app
+
+server = app.server